@@ -1,9 +1,33 @@
 import logging
 from flask import Flask, jsonify
-from .extensions import mongo, cors
+from .extensions import mongo, mongo_reads, cors, product_cache, brand_cache, metrics, health_monitor, compression, admission
+from .db import client_options
 from dotenv import load_dotenv
 from .modules.brands.routes import brands_bp
 from .modules.products.routes import products_bp
+from .indexes import ensure_indexes, ensure_indexes_command, unique_indexes
+from .json_provider import FastJSONProvider
+from .serializers import check_serializers_command
+from .modules.products.stats import rebuild_stats_command, stats_rebuilder
+from .modules.products.recent import recent_feed
+from .modules.products.search_cache import search_cache
+from .logging_config import configure_logging, init_request_id
+
+
+def mongo_client_kwargs(app):
+    """MongoClient options for the app's client (create_app, prefork.after_fork)."""
+    listeners = [metrics.command_listener] if app.config["METRICS_ENABLED"] else []
+    return dict(event_listeners=listeners, **client_options(app.config))
+
+
+def ping_database():
+    """Health ping; also refreshes which unique indexes are missing."""
+    mongo.cx.admin.command("ping")
+    try:
+        unique_indexes.check(mongo.db)
+    except Exception as e:
+        logging.warning("Unique index check failed: %s", e)
+
 
 def create_app(config_name="development"):
     
@@ -13,22 +37,47 @@ def create_app(config_name="development"):
     app = Flask(__name__)
     app.config.from_object(config_by_name[config_name])
     
-    logging.basicConfig(
-        level=logging.INFO,  # or DEBUG for more detail
-        format='%(asctime)s [%(levelname)s] %(message)s',
-        handlers=[
-            logging.FileHandler("app.log"),   # logs to file
-            logging.StreamHandler()           # prints to console
-        ]
-    )
+    configure_logging(app)
+    init_request_id(app)
     try:
         cors.init_app(app)
-        mongo.init_app(app)
+        mongo.init_app(app, **mongo_client_kwargs(app))
+        mongo_reads.init_app(app)
+        health_monitor.init_app(app, ping=ping_database)
+        product_cache.init_app(app)
+        brand_cache.init_app(app)
+        recent_feed.init_app(app)
+        stats_rebuilder.init_app(app)
+        search_cache.init_app(app)
         logging.info("Db intialised")
         
     except Exception as e:
         logging.error("Connection Failed: %s",e)
 
+    # Replaces the BSONProvider that mongo.init_app installs
+    if app.config["JSON_PROVIDER"] == "fast":
+        app.json = FastJSONProvider(app)
+
+    if app.config["METRICS_ENABLED"]:
+        metrics.init_app(app, caches=(product_cache, brand_cache, search_cache), admission=admission)
+    # After metrics, so shed requests are still timed and counted
+    admission.init_app(app)
+    compression.init_app(app)
+
+    app.cli.add_command(ensure_indexes_command)
+    app.cli.add_command(check_serializers_command)
+    app.cli.add_command(rebuild_stats_command)
+    if app.config["ENSURE_INDEXES"]:
+        try:
+            ensure_indexes(mongo.db)
+        except Exception as e:
+            logging.error("Index reconciliation failed: %s", e)
+
+    # Loads the recent-products feed on the first request of each worker
+    app.before_request(recent_feed.ensure_started)
+    # Rebuilds stats queued by bulk writes, off the request path
+    app.before_request(stats_rebuilder.ensure_started)
+
     app.register_blueprint(brands_bp, url_prefix="/api/brands")
     app.register_blueprint(products_bp, url_prefix="/api/products")
     
@@ -37,14 +86,13 @@ def create_app(config_name="development"):
     def home():
         return {"message": "Flask is running successfully"}
     
-     # --- Health Check Route ---
+    # --- Health Check Route ---
+    # Served from the background pinger's last result, never a live DB call
     @app.route("/health")
     def health():
-        try:
-            mongo.cx.server_info()  # Test connection only here
-            return jsonify({"db_status": "connected"}), 200
-        except Exception as e:
-            logging.error("❌ Database connection failed during health check: %s", e)
-            return jsonify({"db_status": "failed", "error": str(e)}), 500
+        health_monitor.ensure_started()
+        body, status = health_monitor.status(wait=2)
+        body["indexes"] = unique_indexes.status()
+        return jsonify(body), status
     
     return app
\ No newline at end of file
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+
+
+# Admission control: per-client token buckets (429) and per-route concurrency
+# limits (503), both answered with Retry-After before the view runs, so an
+# overload turns into fast rejections instead of an unbounded queue.
+#
+# Routes fall into classes configured separately:
+#   expensive  ADMISSION_EXPENSIVE_ENDPOINTS (search, brand/category listings)
+#   default    every other endpoint
+#   exempt     ADMISSION_EXEMPT_ENDPOINTS (/health, /metrics, /)
+# For each class: ADMISSION_<CLASS>_CONCURRENCY requests in flight per route
+# and process, ADMISSION_<CLASS>_RATE tokens per second per client with
+# ADMISSION_<CLASS>_BURST capacity. 0 disables that limit. A request waits at
+# most ADMISSION_QUEUE_TIMEOUT seconds for a concurrency slot.
+
+CLASSES = ("expensive", "default")
+
+_held = ContextVar("admission_held", default=None)
+
+
+def _names(value):
+    return frozenset(name.strip() for name in (value or "").split(",") if name.strip())
+
+
+class TokenBuckets:
+    """Token bucket per client key, bounded to the `max_clients` most recent."""
+
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """0 when a token was taken, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class AdmissionControl:
+    def __init__(self):
+        self.enabled = False
+        self.expensive = frozenset()
+        self.exempt = frozenset()
+        self.limits = {}
+        self.buckets = {}
+        self.queue_timeout = 0.0
+        self.retry_after = 1
+        self.client_header = None
+        self.shed = {}
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _configure(self, app):
+        config = app.config
+        self.enabled = config.get("ADMISSION_ENABLED", True)
+        self.expensive = _names(config.get("ADMISSION_EXPENSIVE_ENDPOINTS"))
+        self.exempt = _names(config.get("ADMISSION_EXEMPT_ENDPOINTS"))
+        self.queue_timeout = config.get("ADMISSION_QUEUE_TIMEOUT", 0.0)
+        self.retry_after = config.get("ADMISSION_RETRY_AFTER", 1)
+        self.client_header = config.get("ADMISSION_CLIENT_HEADER") or None
+        self.limits = {}
+        self.buckets = {}
+        for name in CLASSES:
+            prefix = f"ADMISSION_{name.upper()}_"
+            self.limits[name] = config.get(prefix + "CONCURRENCY", 0)
+            rate = config.get(prefix + "RATE", 0)
+            if rate:
+                self.buckets[name] = TokenBuckets(
+                    rate, config.get(prefix + "BURST", 0) or math.ceil(rate),
+                    config.get("ADMISSION_MAX_CLIENTS", 10000)
+                )
+        if self.enabled and self.buckets and not self.client_header:
+            logging.warning(
+                "Admission rate limits are keyed on the connection address; behind a proxy "
+                "all clients share one bucket. Set ADMISSION_CLIENT_HEADER (e.g. X-Forwarded-For)."
+            )
+        self.shed = {}
+        self._semaphores = {}
+        return self.enabled
+
+    def route_class(self, endpoint):
+        if endpoint is None or endpoint in self.exempt:
+            return None
+        return "expensive" if endpoint in self.expensive else "default"
+
+    def _client(self, request):
+        if self.client_header:
+            value = request.headers.get(self.client_header)
+            if value:
+                return value.split(",")[0].strip()
+        return request.remote_addr or "-"
+
+    def _count(self, endpoint, reason):
+        with self._lock:
+            key = (endpoint, reason)
+            self.shed[key] = self.shed.get(key, 0) + 1
+
+    @staticmethod
+    def _rejection(status, error, retry_after):
+        return {"error": error}, status, {"Retry-After": str(max(1, math.ceil(retry_after)))}
+
+    def _rate_limited(self, request, route_class):
+        """Retry-After seconds if the client is over its rate, else 0."""
+        buckets = self.buckets.get(route_class)
+        if buckets is None:
+            return 0
+        return buckets.take((route_class, self._client(request)))
+
+    def _semaphore(self, endpoint, limit, factory):
+        sem = self._semaphores.get(endpoint)
+        if sem is None:
+            with self._lock:
+                sem = self._semaphores.setdefault(endpoint, factory(limit))
+        return sem
+
+    # --- Flask ---
+
+    def init_app(self, app):
+        from flask import request
+        if not self._configure(app):
+            return
+
+        def admit():
+            route_class = self.route_class(request.endpoint)
+            if route_class is None:
+                return None
+            wait = self._rate_limited(request, route_class)
+            if wait:
+                self._count(request.endpoint, "rate")
+                return self._rejection(429, "Too many requests", wait)
+            limit = self.limits[route_class]
+            if limit:
+                sem = self._semaphore(request.endpoint, limit, threading.BoundedSemaphore)
+                if self.queue_timeout:
+                    acquired = sem.acquire(timeout=self.queue_timeout)
+                else:
+                    acquired = sem.acquire(blocking=False)
+                if not acquired:
+                    self._count(request.endpoint, "concurrency")
+                    return self._rejection(503, "Server busy, try again shortly", self.retry_after)
+                _held.set(sem)
+            return None
+
+        def release(exc=None):
+            sem = _held.get()
+            if sem is not None:
+                _held.set(None)
+                sem.release()
+
+        app.before_request(admit)
+        app.teardown_request(release)
+
+    # --- Quart ---
+
+    def init_async_app(self, app):
+        from quart import request
+        if not self._configure(app):
+            return
+
+        async def admit():
+            route_class = self.route_class(request.endpoint)
+            if route_class is None:
+                return None
+            wait = self._rate_limited(request, route_class)
+            if wait:
+                self._count(request.endpoint, "rate")
+                return self._rejection(429, "Too many requests", wait)
+            limit = self.limits[route_class]
+            if limit:
+                sem = self._semaphore(request.endpoint, limit, asyncio.Semaphore)
+                try:
+                    if sem.locked() and not self.queue_timeout:
+                        raise asyncio.TimeoutError
+                    await asyncio.wait_for(sem.acquire(), timeout=self.queue_timeout or None)
+                except asyncio.TimeoutError:
+                    self._count(request.endpoint, "concurrency")
+                    return self._rejection(503, "Server busy, try again shortly", self.retry_after)
+                _held.set(sem)
+            return None
+
+        async def release(exc=None):
+            sem = _held.get()
+            if sem is not None:
+                _held.set(None)
+                sem.release()
+
+        app.before_request(admit)
+        app.teardown_request(release)
+
+    def stats(self):
+        """Rejections so far as {(endpoint, "rate" | "concurrency"): count}."""
+        with self._lock:
+            return dict(self.shed)
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from quart import Quart, jsonify
+from dotenv import load_dotenv
+from .extensions import async_mongo, async_reads, product_cache, brand_cache, metrics, async_health_monitor, compression, admission
+from .db import client_options
+from .indexes import ensure_indexes_at, unique_indexes
+from .modules.brands.async_routes import async_brands_bp
+from .modules.products.async_routes import async_products_bp
+from .modules.products.recent import recent_feed
+from .modules.products.stats import stats_writer
+from .modules.products.async_stats import AsyncProductStats
+from .modules.products.search_cache import search_cache
+from .logging_config import configure_logging, init_async_request_id
+
+
+# ASGI variant of create_app (app/__init__.py). Serves the same JSON API on
+# Quart with PyMongo's AsyncMongoClient, so a worker keeps handling requests
+# while queries are in flight. Run with e.g.
+#   hypercorn "app.asgi:create_async_app()"
+
+def create_async_app(config_name="development"):
+
+    load_dotenv()
+    from .config import config_by_name
+
+    app = Quart(__name__)
+    app.config.from_object(config_by_name[config_name])
+
+    configure_logging(app)
+    init_async_request_id(app)
+    try:
+        listeners = [metrics.command_listener] if app.config["METRICS_ENABLED"] else []
+        async_mongo.init_app(app, event_listeners=listeners, **client_options(app.config))
+        async_reads.init_app(app)
+        async_health_monitor.init_app(app)
+        product_cache.init_app(app)
+        brand_cache.init_app(app)
+        recent_feed.init_app(app)
+        search_cache.init_app(app)
+        logging.info("Async db intialised")
+
+    except Exception as e:
+        logging.error("Connection Failed: %s", e)
+
+    # Same startup reconciliation as create_app; it runs once, before serving,
+    # so a short-lived blocking client is fine here
+    if app.config["ENSURE_INDEXES"]:
+        try:
+            ensure_indexes_at(app.config["MONGO_URI"], **client_options(app.config))
+        except Exception as e:
+            logging.error("Index reconciliation failed: %s", e)
+
+    if app.config["METRICS_ENABLED"]:
+        metrics.init_async_app(app, caches=(product_cache, brand_cache, search_cache), admission=admission)
+    admission.init_async_app(app)
+    compression.init_async_app(app)
+
+    app.register_blueprint(async_brands_bp, url_prefix="/api/brands")
+    app.register_blueprint(async_products_bp, url_prefix="/api/products")
+
+    # flask-cors is WSGI-only; mirror its default allow-all policy
+    @app.after_request
+    async def cors_headers(response):
+        response.headers.setdefault("Access-Control-Allow-Origin", "*")
+        return response
+
+    # Background ping feeding /health; see HealthMonitor
+    async def ping_forever():
+        while True:
+            started = time.perf_counter()
+            try:
+                await async_mongo.cx.admin.command("ping")
+                async_health_monitor.record(True, time.perf_counter() - started)
+                try:
+                    await unique_indexes.check_async(async_mongo.db)
+                except Exception as e:
+                    logging.warning("Unique index check failed: %s", e)
+            except Exception as e:
+                logging.error("❌ Database ping failed: %s", e)
+                async_health_monitor.record(False, time.perf_counter() - started, str(e))
+            await asyncio.sleep(async_health_monitor.interval)
+
+    # Loads the recent-products feed, bumps its marker after local writes and
+    # follows writes from other workers; woken early by local writes
+    async def sync_recent_feed(wake):
+        while True:
+            wake.clear()
+            try:
+                await recent_feed.flush_bump_async()
+                await recent_feed.sync_async()
+            except Exception as e:
+                logging.warning("Recent feed sync failed: %s", e)
+            try:
+                await asyncio.wait_for(wake.wait(), recent_feed.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    # Rebuilds stats queued by bulk writes (see stats.py)
+    async def rebuild_dirty_stats():
+        interval = app.config.get("STATS_REBUILD_INTERVAL", 5)
+        while True:
+            try:
+                await AsyncProductStats.rebuild_dirty()
+            except Exception as e:
+                logging.warning("Stats rebuild failed: %s", e)
+            await asyncio.sleep(interval)
+
+    # Applies stats updates queued by single-product writes (see StatsWriter)
+    async def write_queued_stats(wake):
+        while True:
+            await wake.wait()
+            wake.clear()
+            try:
+                await AsyncProductStats.flush_queued()
+            except Exception as e:
+                logging.warning("Stats update failed: %s", e)
+
+    @app.before_serving
+    async def start_background_tasks():
+        app.extensions["health_task"] = asyncio.create_task(ping_forever())
+        stats_writer.async_wake = asyncio.Event()
+        app.extensions["stats_writer_task"] = asyncio.create_task(write_queued_stats(stats_writer.async_wake))
+        if recent_feed.enabled:
+            recent_feed.async_wake = asyncio.Event()
+            app.extensions["recent_feed_task"] = asyncio.create_task(sync_recent_feed(recent_feed.async_wake))
+        if app.config.get("STATS_REBUILD_INTERVAL", 5) > 0:
+            app.extensions["stats_task"] = asyncio.create_task(rebuild_dirty_stats())
+
+    @app.after_serving
+    async def close_db():
+        for name in ("health_task", "recent_feed_task", "stats_task", "stats_writer_task"):
+            task = app.extensions.pop(name, None)
+            if task is not None:
+                task.cancel()
+        stats_writer.async_wake = None
+        recent_feed.async_wake = None
+        try:
+            await AsyncProductStats.flush_queued()
+        except Exception as e:
+            logging.warning("Stats update failed: %s", e)
+        if async_mongo.cx is not None:
+            await async_mongo.cx.close()
+
+    @app.route("/")
+    async def home():
+        return {"message": "Quart is running successfully"}
+
+    # --- Health Check Route ---
+    # Served from the background pinger's last result, never a live DB call
+    @app.route("/health")
+    async def health():
+        body, status = async_health_monitor.status()
+        body["indexes"] = unique_indexes.status()
+        return jsonify(body), status
+
+    return app
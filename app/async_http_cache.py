@@ -0,0 +1,26 @@
+from quart import request, make_response
+from .http_cache import _not_modified, with_validators
+
+
+# Quart counterparts of http_cache.py for the ASGI app. Validators are built
+# with the same helpers (document_etag, last_modified, with_validators); only
+# the request object and Quart's awaited Response methods differ.
+
+def is_not_modified(etag, modified=None):
+    """http_cache.is_not_modified against Quart's request."""
+    return _not_modified(request, etag, modified)
+
+
+async def not_modified_response(etag, modified=None):
+    return with_validators(await make_response("", 304), etag, modified)
+
+
+async def conditional_list(response):
+    """Add a content-hash ETag to a rendered list and answer 304 on a match."""
+    await response.add_etag(weak=True)
+    return await response.make_conditional(request)
+
+
+async def conditional(response):
+    """Answer 304 when the response's ETag matches the request."""
+    return await response.make_conditional(request)
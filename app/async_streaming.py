@@ -0,0 +1,22 @@
+from quart import Response, current_app
+from .streaming import STREAM_FORMATS, _Encoder, aiter_stream
+
+
+# Quart counterpart of streaming.stream_response for the ASGI app: the same
+# encoders, driven by an async cursor. Request bodies are parsed with
+# streaming.aiter_json_records.
+
+async def _encoded(chunks):
+    async for chunk in chunks:
+        yield chunk.encode()
+
+
+def stream_response(docs, dump, fmt, columns=None, filename=None, batch_size=500):
+    """Chunked response for the async cursor `docs` in one of STREAM_FORMATS."""
+    encoder = _Encoder(fmt, dump, current_app.json.dumps, columns)
+    response = Response(_encoded(aiter_stream(docs, encoder, batch_size)), mimetype=STREAM_FORMATS[fmt])
+    # Exports can outlast RESPONSE_TIMEOUT; the WSGI app has no such limit
+    response.timeout = None
+    if filename:
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,27 @@
+# Multi-get (`/batch`) helpers shared by the product and brand controllers:
+# ids come from `?ids=a,b,c` or a JSON body {"ids": [...]}, are looked up in
+# one go and answered in the caller's order with the misses listed apart.
+
+def parse_ids(raw, body, max_ids):
+    """Requested ids in order, without duplicates.
+
+    `raw` is the `ids` query argument, `body` the parsed JSON body (or None).
+    Raises ValueError when there are none, too many, or they are not strings.
+    """
+    if raw is not None:
+        ids = raw.split(",")
+    else:
+        ids = body.get("ids") if isinstance(body, dict) else None
+        if not isinstance(ids, list) or not all(isinstance(i, str) for i in ids):
+            raise ValueError("Provide ids as ?ids=a,b,c or a JSON body {\"ids\": [...]}")
+    ids = list(dict.fromkeys(i.strip() for i in ids if i.strip()))
+    if not ids:
+        raise ValueError("ids must name at least one id")
+    if len(ids) > max_ids:
+        raise ValueError(f"At most {max_ids} ids per request")
+    return ids
+
+
+def in_order(ids, found):
+    """(documents in the order of `ids`, ids that were not found)."""
+    return [found[i] for i in ids if i in found], [i for i in ids if i not in found]
@@ -0,0 +1,253 @@
+import asyncio
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+import bson
+
+
+# Read-through cache for single document lookups (see DetailCache below).
+#
+# Backends share a small interface: get(key), get_many(keys), set(key, value,
+# ttl), delete(*keys) and clear(prefix). MemoryBackend is the per-process
+# default; RedisBackend works with any client exposing get/mget/set(ex=)/
+# delete/scan_iter,
+# so redis-py or a local stand-in can be plugged in.
+
+class MemoryBackend:
+    """Bounded LRU with per-entry expiry, safe to share between threads."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Callers may mutate what they get back, so hand out a copy
+        return copy.deepcopy(value)
+
+    def get_many(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ttl):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self, prefix=""):
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Stores documents as BSON so datetimes and ObjectIds survive the trip."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key):
+        raw = self.client.get(key)
+        return bson.decode(raw)["v"] if raw else None
+
+    def get_many(self, keys):
+        # One MGET round trip for the whole batch
+        return [bson.decode(raw)["v"] if raw else None for raw in self.client.mget(keys)]
+
+    def set(self, key, value, ttl):
+        self.client.set(key, bson.encode({"v": value}), ex=max(1, int(ttl)))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*keys)
+
+    def clear(self, prefix=""):
+        keys = list(self.client.scan_iter(match=f"{prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class DetailCache:
+    """Read-through cache of documents by id, keyed under `namespace`.
+
+    Configured from the app in `init_app` (CACHE_BACKEND, CACHE_TTL,
+    CACHE_MAX_ENTRIES, CACHE_REDIS_URL). Until then, or with
+    CACHE_BACKEND = "none", every lookup goes straight to the loader.
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.backend = None
+        self.ttl = 60
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        kind = app.config.get("CACHE_BACKEND", "memory")
+        self.ttl = app.config.get("CACHE_TTL", 60)
+        if kind == "redis":
+            client = app.config.get("CACHE_REDIS_CLIENT")
+            if client is None:
+                import redis
+                client = redis.Redis.from_url(app.config["CACHE_REDIS_URL"])
+            self.backend = RedisBackend(client)
+        elif kind == "memory":
+            self.backend = MemoryBackend(app.config.get("CACHE_MAX_ENTRIES", 10000))
+        else:
+            self.backend = None
+
+    @property
+    def shared(self):
+        """Whether other processes read what this one caches (redis)."""
+        return isinstance(self.backend, RedisBackend)
+
+    def _key(self, doc_id):
+        return f"{self.namespace}:{doc_id}"
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_or_load(self, doc_id, loader):
+        """Return the cached document, or call `loader()` and cache its result.
+
+        Missing documents (None) are not cached. Backend errors are logged
+        and fall back to the loader so the cache can never take reads down.
+        """
+        found, value = self._lookup(doc_id)
+        if found:
+            return value
+        value = loader()
+        self._store(doc_id, value)
+        return value
+
+    async def run_async(self, fn, *args):
+        """Call `fn(*args)` from the event loop without blocking it.
+
+        The in-process MemoryBackend is called directly; network backends
+        (Redis) use blocking clients, so their calls go to a worker thread.
+        """
+        if self.backend is None or isinstance(self.backend, MemoryBackend):
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def get_or_load_async(self, doc_id, loader):
+        """get_or_load for the ASGI app: `loader` is a coroutine function."""
+        found, value = await self.run_async(self._lookup, doc_id)
+        if found:
+            return value
+        value = await loader()
+        await self.run_async(self._store, doc_id, value)
+        return value
+
+    def get_or_load_many(self, doc_ids, loader):
+        """{doc_id: document} for `doc_ids`, cached ones first.
+
+        `loader(missing_ids)` fetches the rest in one go and returns them as
+        {doc_id: document}; those are cached like get_or_load results. Ids
+        that are neither cached nor loaded are absent from the result.
+        """
+        found, missing = self._lookup_many(doc_ids)
+        if missing:
+            loaded = loader(missing)
+            self._store_many(loaded)
+            found.update(loaded)
+        return found
+
+    async def get_or_load_many_async(self, doc_ids, loader):
+        """get_or_load_many for the ASGI app: `loader` is a coroutine function."""
+        found, missing = await self.run_async(self._lookup_many, doc_ids)
+        if missing:
+            loaded = await loader(missing)
+            await self.run_async(self._store_many, loaded)
+            found.update(loaded)
+        return found
+
+    def _lookup_many(self, doc_ids):
+        if self.backend is None:
+            return {}, list(doc_ids)
+        try:
+            values = self.backend.get_many([self._key(doc_id) for doc_id in doc_ids])
+        except Exception as e:
+            logging.warning("Cache read failed (%s, %s keys): %s", self.namespace, len(doc_ids), e)
+            return {}, list(doc_ids)
+        found = {doc_id: value for doc_id, value in zip(doc_ids, values) if value is not None}
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(doc_ids) - len(found)
+        return found, [doc_id for doc_id in doc_ids if doc_id not in found]
+
+    def _lookup(self, doc_id):
+        if self.backend is None:
+            return False, None
+        key = self._key(doc_id)
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logging.warning("Cache read failed (%s): %s", key, e)
+            return False, None
+        self._count(value is not None)
+        return value is not None, value
+
+    def _store_many(self, docs):
+        for doc_id, value in docs.items():
+            self._store(doc_id, value)
+
+    def _store(self, doc_id, value):
+        if self.backend is None or value is None:
+            return
+        key = self._key(doc_id)
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logging.warning("Cache write failed (%s): %s", key, e)
+
+    def invalidate(self, *doc_ids):
+        if self.backend is None:
+            return
+        try:
+            self.backend.delete(*(self._key(doc_id) for doc_id in doc_ids))
+        except Exception as e:
+            logging.warning("Cache invalidation failed (%s): %s", self.namespace, e)
+
+    async def invalidate_async(self, *doc_ids):
+        await self.run_async(self.invalidate, *doc_ids)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear(f"{self.namespace}:")
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,211 @@
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+
+# Negotiated response compression (Content-Encoding) for create_app and
+# create_async_app.
+#
+#   COMPRESS_ENABLED      on by default
+#   COMPRESS_ALGORITHMS   server preference among what the client accepts,
+#                         default "zstd,br,gzip"; zstd needs the zstandard
+#                         package and br the brotli package, gzip is built in
+#   COMPRESS_MIN_SIZE     smaller buffered bodies go out as they are (bytes)
+#   COMPRESS_LEVEL        gzip level (1-9); COMPRESS_ZSTD_LEVEL and
+#                         COMPRESS_BROTLI_QUALITY for the others
+#   COMPRESS_MIMETYPES    content types worth compressing
+#
+# Buffered bodies are compressed in one go. Streamed bodies (?stream= exports)
+# are compressed chunk by chunk and flushed after every chunk, so the client
+# still receives data as it is produced. Responses that already have a
+# Content-Encoding, carry Cache-Control: no-transform or have no body are left
+# alone.
+
+DEFAULT_MIMETYPES = (
+    "application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html",
+)
+
+
+class _Gzip:
+    name = "gzip"
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        c = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return c.compress(data) + c.flush()
+
+    def stream(self):
+        c = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return (lambda chunk: c.compress(chunk) + c.flush(zlib.Z_SYNC_FLUSH)), c.flush
+
+
+class _Zstd:
+    name = "zstd"
+
+    def __init__(self, level):
+        self.compressor = zstandard.ZstdCompressor(level=level)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def stream(self):
+        c = self.compressor.compressobj()
+        return (lambda chunk: c.compress(chunk) + c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)), c.flush
+
+
+class _Brotli:
+    name = "br"
+
+    def __init__(self, quality):
+        self.quality = quality
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.quality)
+
+    def stream(self):
+        c = brotli.Compressor(quality=self.quality)
+        return (lambda chunk: c.process(chunk) + c.flush()), c.finish
+
+
+def _compressed_stream(chunks, encoder):
+    process, finish = encoder.stream()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            out = process(chunk)
+            if out:
+                yield out
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+async def _acompressed_stream(body, encoder):
+    """_compressed_stream for a Quart ResponseBody."""
+    process, finish = encoder.stream()
+    async with body as chunks:
+        async for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            out = process(chunk)
+            if out:
+                yield out
+    yield finish()
+
+
+class Compression:
+    def __init__(self):
+        self.enabled = False
+        self.min_size = 1024
+        self.mimetypes = frozenset(DEFAULT_MIMETYPES)
+        self.encoders = {}
+        self.preference = ()
+
+    def init_app(self, app):
+        """Compress Flask responses in an after_request hook."""
+        from flask import request
+        if not self._configure(app):
+            return
+
+        def compress(response):
+            return self._compress(request, response)
+
+        app.after_request(compress)
+
+    def init_async_app(self, app):
+        """Same for the Quart app (file bodies are left alone)."""
+        from quart import request
+        from quart.wrappers.response import DataBody, IterableBody
+        if not self._configure(app):
+            return
+
+        async def compress(response):
+            encoder = self._candidate(request, response)
+            if encoder is None:
+                return response
+            if isinstance(response.response, IterableBody):
+                response.response = IterableBody(_acompressed_stream(response.response, encoder))
+                response.headers.pop("Content-Length", None)
+            elif isinstance(response.response, DataBody):
+                data = await response.get_data()
+                if len(data) < self.min_size:
+                    return response
+                response.set_data(encoder.compress(data))
+            else:
+                return response
+            response.headers["Content-Encoding"] = encoder.name
+            return response
+
+        app.after_request(compress)
+
+    def _configure(self, app):
+        config = app.config
+        self.enabled = config.get("COMPRESS_ENABLED", True)
+        self.min_size = config.get("COMPRESS_MIN_SIZE", 1024)
+        self.mimetypes = frozenset(config.get("COMPRESS_MIMETYPES") or DEFAULT_MIMETYPES)
+
+        available = {"gzip": lambda: _Gzip(config.get("COMPRESS_LEVEL", 6))}
+        if zstandard is not None:
+            available["zstd"] = lambda: _Zstd(config.get("COMPRESS_ZSTD_LEVEL", 3))
+        if brotli is not None:
+            available["br"] = lambda: _Brotli(config.get("COMPRESS_BROTLI_QUALITY", 4))
+        names = [n.strip() for n in config.get("COMPRESS_ALGORITHMS", "zstd,br,gzip").split(",") if n.strip()]
+        self.encoders = {name: available[name]() for name in names if name in available}
+        self.preference = tuple(self.encoders)
+        return self.enabled and bool(self.encoders)
+
+    def choose(self, accept_encodings):
+        """Best encoder for an Accept-Encoding header (werkzeug Accept), or None.
+
+        Highest client quality wins; ties go to COMPRESS_ALGORITHMS order.
+        """
+        best, best_q = None, 0
+        for name in self.preference:
+            q = accept_encodings.quality(name)
+            if q > best_q:
+                best, best_q = self.encoders[name], q
+        return best
+
+    def _candidate(self, request, response):
+        """The encoder to use for `response`, or None to leave it as it is."""
+        if response.mimetype not in self.mimetypes:
+            return None
+        response.vary.add("Accept-Encoding")
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or request.method == "HEAD"
+            or "Content-Encoding" in response.headers
+            or "no-transform" in response.headers.get("Cache-Control", "")
+        ):
+            return None
+        return self.choose(request.accept_encodings)
+
+    def _compress(self, request, response):
+        encoder = self._candidate(request, response)
+        if encoder is None or response.direct_passthrough:
+            return response
+
+        if response.is_streamed:
+            response.response = _compressed_stream(response.response, encoder)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(encoder.compress(data))
+        response.headers["Content-Encoding"] = encoder.name
+        return response
@@ -1,14 +1,128 @@
 import os
 
+
+def _optional_int(name):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else None
+
+
 class BaseConfig:
     MONGO_URI = os.getenv("MONGO_URI")
+    # Connection pool, timeouts and wire compression (app/db.py). Unset values
+    # fall back to MONGO_URI options / driver defaults.
+    MONGO_MAX_POOL_SIZE = _optional_int("MONGO_MAX_POOL_SIZE")
+    MONGO_MIN_POOL_SIZE = _optional_int("MONGO_MIN_POOL_SIZE")
+    MONGO_MAX_IDLE_TIME_MS = _optional_int("MONGO_MAX_IDLE_TIME_MS")
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = _optional_int("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+    MONGO_CONNECT_TIMEOUT_MS = _optional_int("MONGO_CONNECT_TIMEOUT_MS")
+    MONGO_SOCKET_TIMEOUT_MS = _optional_int("MONGO_SOCKET_TIMEOUT_MS")
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = _optional_int("MONGO_SERVER_SELECTION_TIMEOUT_MS")
+    # e.g. "zstd,zlib" (zstd needs the zstandard package)
+    MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS")
+    MONGO_ZLIB_LEVEL = _optional_int("MONGO_ZLIB_LEVEL")
+    # Read preference for read-only routes (listings, search, details), e.g.
+    # "secondaryPreferred"; unset keeps them on the primary
+    MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE")
+    MONGO_MAX_STALENESS_SECONDS = _optional_int("MONGO_MAX_STALENESS_SECONDS")
+    # /health serves the last background ping; older than HEALTH_MAX_AGE is unhealthy
+    HEALTH_CHECK_INTERVAL = int(os.getenv("HEALTH_CHECK_INTERVAL", 10))
+    HEALTH_MAX_AGE = int(os.getenv("HEALTH_MAX_AGE", 30))
     CORS_HEADERS = "Content-Type"
+    # Logging (app/logging_config.py): records go through a queue to a
+    # background thread that writes the console and a size-rotated file
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    LOG_FILE = os.getenv("LOG_FILE", "app.log")
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+    # "size" or "external" (logrotate; needed when several processes share LOG_FILE)
+    LOG_ROTATION = os.getenv("LOG_ROTATION", "size")
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    # Create missing indexes from the registry in create_app
+    ENSURE_INDEXES = os.getenv("ENSURE_INDEXES", "true").lower() == "true"
+    # Bulk import: documents per insert_many, rejected lines listed in the report
+    BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", 500))
+    BULK_MAX_REPORTED_ERRORS = int(os.getenv("BULK_MAX_REPORTED_ERRORS", 1000))
+    # Request body cap in bytes; unset means none (Flask's default). Quart would
+    # otherwise cap bodies, and so bulk imports, at 16 MB
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH")) if os.getenv("MAX_CONTENT_LENGTH") else None
+    # Write concern for bulk imports (app/db.py), e.g. "1" for faster ingest on
+    # a replica set whose default is majority; unset keeps the client default
+    INGEST_WRITE_CONCERN = os.getenv("INGEST_WRITE_CONCERN")
+    INGEST_JOURNAL = {"true": True, "false": False}.get(os.getenv("INGEST_JOURNAL", "").lower())
+    # Bulk update/delete: operations accepted per request
+    BULK_MAX_OPERATIONS = int(os.getenv("BULK_MAX_OPERATIONS", 1000))
+    # Seconds between background rebuilds of stats queued by bulk writes (or
+    # failed stats updates); 0 stops this process from running them
+    STATS_REBUILD_INTERVAL = float(os.getenv("STATS_REBUILD_INTERVAL", 5))
+    # In-memory /api/products/recent feed: products kept per worker (0 turns it
+    # off) and how often workers check for writes made by other processes
+    RECENT_FEED_SIZE = int(os.getenv("RECENT_FEED_SIZE", 50))
+    RECENT_FEED_SYNC_INTERVAL = float(os.getenv("RECENT_FEED_SYNC_INTERVAL", 2))
+    # Streamed listings (?stream=): documents per cursor batch and per chunk
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 500))
+    # Multi-get (/api/products/batch, /api/brands/batch): ids per request
+    BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", 100))
+    # Product/brand detail cache: "memory" (per process), "redis" or "none"
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_TTL = int(os.getenv("CACHE_TTL", 60))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    # Search result cache (products/search_cache.py): seconds an entry lives
+    # (0 turns it off), entries per process, and how long concurrent identical
+    # searches wait for the one running query before querying themselves
+    SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 5))
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 1000))
+    SEARCH_CACHE_WAIT_TIMEOUT = float(os.getenv("SEARCH_CACHE_WAIT_TIMEOUT", 5))
+    # Faceted search stops counting matches at this many (0 = exact count)
+    SEARCH_TOTAL_CAP = int(os.getenv("SEARCH_TOTAL_CAP", 10000))
+    # Per-route request and Mongo command metrics on /metrics
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Admission control (app/admission.py): per-route concurrency and
+    # per-client rate limits, separately for expensive and other routes.
+    # 0 turns a limit off. Rate limits are off by default: behind a proxy
+    # every client has the proxy's address, so set ADMISSION_CLIENT_HEADER
+    # (e.g. X-Forwarded-For) before enabling them.
+    ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_EXPENSIVE_ENDPOINTS = os.getenv(
+        "ADMISSION_EXPENSIVE_ENDPOINTS", "products.search,products.brand_products,products.product_by_category"
+    )
+    ADMISSION_EXEMPT_ENDPOINTS = os.getenv("ADMISSION_EXEMPT_ENDPOINTS", "health,metrics,home")
+    # Per route and process, so it must stay below the worker's threads
+    # (GUNICORN_THREADS, same default as gunicorn.conf.py) to ever apply:
+    # half of them, leaving the rest for cheap routes
+    ADMISSION_EXPENSIVE_CONCURRENCY = int(os.getenv(
+        "ADMISSION_EXPENSIVE_CONCURRENCY", max(1, int(os.getenv("GUNICORN_THREADS", 4)) // 2)
+    ))
+    ADMISSION_EXPENSIVE_RATE = float(os.getenv("ADMISSION_EXPENSIVE_RATE", 0))
+    ADMISSION_EXPENSIVE_BURST = int(os.getenv("ADMISSION_EXPENSIVE_BURST", 20))
+    ADMISSION_DEFAULT_CONCURRENCY = int(os.getenv("ADMISSION_DEFAULT_CONCURRENCY", 0))
+    ADMISSION_DEFAULT_RATE = float(os.getenv("ADMISSION_DEFAULT_RATE", 0))
+    ADMISSION_DEFAULT_BURST = int(os.getenv("ADMISSION_DEFAULT_BURST", 0))
+    # Seconds a request may wait for a concurrency slot before a 503
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 0.05))
+    ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 1))
+    # Header identifying the client for rate limits (e.g. X-Forwarded-For
+    # behind a proxy); empty uses the connection's address
+    ADMISSION_CLIENT_HEADER = os.getenv("ADMISSION_CLIENT_HEADER", "")
+    # Response compression (app/compression.py); zstd/br need the zstandard /
+    # brotli packages and are skipped without them
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "true").lower() == "true"
+    COMPRESS_ALGORITHMS = os.getenv("COMPRESS_ALGORITHMS", "zstd,br,gzip")
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+    COMPRESS_ZSTD_LEVEL = int(os.getenv("COMPRESS_ZSTD_LEVEL", 3))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))
+    # JSON encoding: "fast" (orjson when installed) or "bson" (Flask-PyMongo's json_util)
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "fast")
 
 class DevelopmentConfig(BaseConfig):
     DEBUG = True
 
 class ProductionConfig(BaseConfig):
     DEBUG = False
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
 
 config_by_name = {
     "development": DevelopmentConfig,
@@ -0,0 +1,91 @@
+from pymongo import WriteConcern
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+
+
+# Connection tuning and read routing for both Mongo clients (mongo and
+# async_mongo). Unset options are left out so the driver defaults, or options
+# given in MONGO_URI, still apply.
+
+# config key -> MongoClient keyword
+CLIENT_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+    "MONGO_COMPRESSORS": "compressors",
+    "MONGO_ZLIB_LEVEL": "zlibCompressionLevel",
+}
+
+
+def client_options(config):
+    """MongoClient keyword arguments from the MONGO_* settings that are set."""
+    return {
+        option: config[key]
+        for key, option in CLIENT_OPTIONS.items()
+        if config.get(key) not in (None, "")
+    }
+
+
+def read_preference(config):
+    """Read preference for read-only routes, or None to use the client's."""
+    name = config.get("MONGO_READ_PREFERENCE")
+    if not name:
+        return None
+    staleness = config.get("MONGO_MAX_STALENESS_SECONDS")
+    return make_read_preference(
+        read_pref_mode_from_name(name), None,
+        staleness if staleness is not None else -1
+    )
+
+
+def ingest_write_concern(config):
+    """Write concern for bulk imports, or None to keep the client's.
+
+    INGEST_WRITE_CONCERN is a `w` value ("majority", "1", "0", ...);
+    INGEST_JOURNAL sets `j` when given. w=0 is fire-and-forget: the import
+    report can then no longer list documents the server rejected.
+    """
+    w = config.get("INGEST_WRITE_CONCERN")
+    journal = config.get("INGEST_JOURNAL")
+    if not w and journal is None:
+        return None
+    options = {}
+    if w:
+        options["w"] = int(w) if str(w).isdigit() else w
+    if journal is not None:
+        options["j"] = journal
+    return WriteConcern(**options)
+
+
+class ReadDatabase:
+    """The database returned by `source()` with the read-route preference applied.
+
+    Models use `.db` for queries that may be served by a secondary (listings,
+    search, details); writes and read-after-write lookups stay on the client
+    database. The handle is rebuilt whenever `source()` returns a different
+    database object.
+    """
+
+    def __init__(self, source):
+        self._source = source
+        self._built_for = None
+        self._db = None
+        self.read_preference = None
+
+    def init_app(self, app):
+        self.read_preference = read_preference(app.config)
+        self._built_for = None
+
+    @property
+    def db(self):
+        db = self._source()
+        if db is not self._built_for:
+            if db is None or self.read_preference is None:
+                self._db = db
+            else:
+                self._db = db.with_options(read_preference=self.read_preference)
+            self._built_for = db
+        return self._db
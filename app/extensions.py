@@ -1,5 +1,46 @@
 from flask_pymongo import PyMongo
 from flask_cors import CORS
+from .cache import DetailCache
+from .metrics import Metrics
+from .db import ReadDatabase
+from .health import HealthMonitor
+from .compression import Compression
+from .admission import AdmissionControl
+
+
+class AsyncMongo:
+    """PyMongo's AsyncMongoClient wired up like Flask-PyMongo, for the ASGI app."""
+
+    def __init__(self):
+        self.cx = None
+        self.db = None
+
+    def init_app(self, app, **kwargs):
+        from pymongo import AsyncMongoClient
+        self.cx = AsyncMongoClient(app.config["MONGO_URI"], **kwargs)
+        self.db = self.cx.get_default_database()
+
 
 mongo = PyMongo()
-cors = CORS()
\ No newline at end of file
+async_mongo = AsyncMongo()
+# Handles for read-only queries, routed by MONGO_READ_PREFERENCE
+mongo_reads = ReadDatabase(lambda: mongo.db)
+async_reads = ReadDatabase(lambda: async_mongo.db)
+cors = CORS()
+
+# Read-through caches for detail lookups
+product_cache = DetailCache("product")
+brand_cache = DetailCache("brand")
+
+# Request / Mongo command instrumentation, served on /metrics
+metrics = Metrics()
+
+# Per-route concurrency and per-client rate limits
+admission = AdmissionControl()
+
+# Content-Encoding negotiation for responses
+compression = Compression()
+
+# Cached database pings behind /health
+health_monitor = HealthMonitor()
+async_health_monitor = HealthMonitor()
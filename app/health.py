@@ -0,0 +1,86 @@
+import logging
+import os
+import threading
+import time
+
+
+class HealthMonitor:
+    """Caches the result of a periodic database ping.
+
+    /health reads the cached result, so probes never wait on (or take a pool
+    connection from) the database. The ping runs in a daemon thread started on
+    first use in each process, which keeps it fork-safe under pre-forking
+    servers; the ASGI app feeds `record` from an asyncio task instead.
+    """
+
+    def __init__(self):
+        self.interval = 10
+        self.max_age = 30
+        self._ping = None
+        self._result = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._pid = None
+
+    def init_app(self, app, ping=None):
+        self.interval = app.config.get("HEALTH_CHECK_INTERVAL", 10)
+        self.max_age = app.config.get("HEALTH_MAX_AGE", 3 * self.interval)
+        self._ping = ping
+
+    def record(self, ok, latency, error=None):
+        with self._lock:
+            self._result = {
+                "ok": ok,
+                "latency_ms": round(latency * 1000, 2),
+                "checked_at": time.time(),
+                "error": error,
+            }
+        self._ready.set()
+
+    def check_once(self):
+        started = time.perf_counter()
+        try:
+            self._ping()
+            self.record(True, time.perf_counter() - started)
+        except Exception as e:
+            logging.error("❌ Database ping failed: %s", e)
+            self.record(False, time.perf_counter() - started, str(e))
+
+    def _run(self):
+        while True:
+            self.check_once()
+            time.sleep(self.interval)
+
+    def ensure_started(self):
+        """Start the ping thread in this process if it is not running yet."""
+        if self._ping is None or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._run, name="mongo-health", daemon=True).start()
+
+    def status(self, wait=0):
+        """(body, http status) for the health endpoint.
+
+        `wait` is how long to block for the very first result after startup.
+        """
+        if wait and not self._ready.is_set():
+            self._ready.wait(wait)
+        with self._lock:
+            result = dict(self._result) if self._result else None
+        if result is None:
+            return {"db_status": "unknown", "error": "No health check has completed yet"}, 503
+        age = time.time() - result["checked_at"]
+        body = {
+            "db_status": "connected" if result["ok"] else "failed",
+            "latency_ms": result["latency_ms"],
+            "checked_seconds_ago": round(age, 1),
+        }
+        if result["error"]:
+            body["error"] = result["error"]
+        if age > self.max_age:
+            body["db_status"] = "stale"
+            return body, 503
+        return body, 200 if result["ok"] else 500
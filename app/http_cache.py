@@ -0,0 +1,62 @@
+import hashlib
+from datetime import timezone
+from flask import request, make_response
+
+
+# Conditional GET helpers (ETag / Last-Modified / 304).
+#
+# Single documents get validators from `updated_at` before anything is
+# serialized, so a 304 skips the schema dump entirely. Lists are hashed after
+# rendering with `conditional_list`.
+
+def document_etag(doc, id_field, *variant):
+    """Weak ETag from a document's id and `updated_at`.
+
+    `variant` covers anything else that changes the representation, such as
+    query parameters.
+    """
+    updated = doc.get("updated_at")
+    stamp = updated.isoformat() if updated else ""
+    raw = "|".join([str(doc.get(id_field)), stamp] + [str(v) for v in variant])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def last_modified(doc):
+    """`updated_at` as an aware UTC datetime (stored values are naive UTC)."""
+    updated = doc.get("updated_at")
+    if updated is None:
+        return None
+    return updated.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def is_not_modified(etag, modified=None):
+    """True when the client's cached copy is still current.
+
+    If-None-Match wins over If-Modified-Since, as RFC 9110 requires.
+    """
+    return _not_modified(request, etag, modified)
+
+
+def _not_modified(req, etag, modified):
+    if req.if_none_match:
+        return req.if_none_match.contains_weak(etag)
+    if modified is not None and req.if_modified_since is not None:
+        return modified <= req.if_modified_since
+    return False
+
+
+def with_validators(response, etag, modified=None):
+    response.set_etag(etag, weak=True)
+    if modified is not None:
+        response.last_modified = modified
+    return response
+
+
+def not_modified_response(etag, modified=None):
+    return with_validators(make_response("", 304), etag, modified)
+
+
+def conditional_list(response):
+    """Add a content-hash ETag to a rendered list and answer 304 on a match."""
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
@@ -0,0 +1,191 @@
+import json
+import logging
+import click
+from flask.cli import with_appcontext
+from pymongo import MongoClient
+from pymongo.errors import OperationFailure
+from .extensions import mongo
+from .modules.products.indexes import PRODUCT_INDEXES, STATS_INDEXES
+from .modules.brands.indexes import BRAND_INDEXES
+
+# Collection name -> indexes it should have. Modules register their list here.
+INDEX_REGISTRY = {
+    "products": PRODUCT_INDEXES,
+    "brands": BRAND_INDEXES,
+    "catalog_stats": STATS_INDEXES,
+}
+
+# Options that change an index's behaviour; differences here are conflicts
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+def _key_of(spec):
+    return [(field, direction) for field, direction in spec["key"].items()]
+
+
+def _conflicts(expected, existing):
+    """Describe how an existing index differs from its registry entry."""
+    if "weights" in expected:
+        # Text index keys are stored as _fts/_ftsx, compare the weights instead
+        if existing.get("weights") != expected["weights"]:
+            return "weights differ"
+    elif _key_of(expected) != [tuple(k) for k in existing["key"]]:
+        return "keys differ"
+    for option in _COMPARED_OPTIONS:
+        if expected.get(option) != existing.get(option):
+            return f"{option} differs"
+    return None
+
+
+def _unused(coll):
+    """Names of indexes with no recorded accesses since the server started."""
+    try:
+        stats = coll.aggregate([{"$indexStats": {}}])
+        return sorted(s["name"] for s in stats if s["accesses"]["ops"] == 0 and s["name"] != "_id_")
+    except OperationFailure as e:
+        logging.warning("Index usage stats unavailable for %s: %s", coll.name, e)
+        return []
+
+
+def reconcile_indexes(db, dry_run=False):
+    """Compare the registry with the server and create what is missing.
+
+    Extra or conflicting indexes are only reported, never dropped. With
+    `dry_run` nothing is created. Returns a report keyed by collection.
+    """
+    report = {}
+    for name, indexes in INDEX_REGISTRY.items():
+        coll = db[name]
+        existing = coll.index_information()
+        expected = {index.document["name"]: index for index in indexes}
+
+        missing = [index for n, index in expected.items() if n not in existing]
+        conflicting = {}
+        for n, index in expected.items():
+            if n in existing:
+                reason = _conflicts(index.document, existing[n])
+                if reason:
+                    conflicting[n] = reason
+
+        created = []
+        errors = {}
+        if not dry_run:
+            for index in missing:
+                # One at a time so a bad index (e.g. duplicates under a unique
+                # key) doesn't stop the others from being built
+                try:
+                    coll.create_indexes([index])
+                    created.append(index.document["name"])
+                except OperationFailure as e:
+                    errors[index.document["name"]] = str(e)
+
+        report[name] = {
+            "missing": [index.document["name"] for index in missing],
+            "created": created,
+            "errors": errors,
+            "conflicting": conflicting,
+            "extra": sorted(n for n in existing if n not in expected and n != "_id_"),
+            "unused": _unused(coll),
+        }
+    return report
+
+
+def _missing_unique(name, existing):
+    """Unique registry indexes of collection `name` absent from `existing`."""
+    return [
+        f"{name}.{index.document['name']}"
+        for index in INDEX_REGISTRY[name]
+        if index.document.get("unique")
+        and not existing.get(index.document["name"], {}).get("unique")
+    ]
+
+
+class UniqueIndexes:
+    """Which unique indexes from the registry are missing in this process.
+
+    Some invariants (one brand per email) rely on these indexes. Until one is
+    known to exist, models keep checking for duplicates with a query (see
+    BrandModel.email_taken), and /health reports the gap next to, not as, the
+    database status: existing duplicates can stop an index from ever building.
+    Refreshed at startup and by every health ping.
+    """
+
+    def __init__(self):
+        self.missing = None  # unknown until the first check
+
+    def check(self, db):
+        missing = []
+        for name in INDEX_REGISTRY:
+            missing += _missing_unique(name, db[name].index_information())
+        self.missing = missing
+        return missing
+
+    async def check_async(self, db):
+        """check for the AsyncMongoClient."""
+        missing = []
+        for name in INDEX_REGISTRY:
+            missing += _missing_unique(name, await db[name].index_information())
+        self.missing = missing
+        return missing
+
+    def exists(self, collection, index_name):
+        return self.missing is not None and f"{collection}.{index_name}" not in self.missing
+
+    def status(self):
+        if self.missing is None:
+            return {"unique": "unknown"}
+        if self.missing:
+            return {"unique": "missing", "missing": self.missing}
+        return {"unique": "ok"}
+
+
+unique_indexes = UniqueIndexes()
+
+
+def log_missing_unique(missing):
+    if missing:
+        logging.error(
+            "Unique indexes missing: %s. Duplicates are checked by query until they "
+            "exist; fix the data and run `flask ensure-indexes`.", ", ".join(missing)
+        )
+
+
+def log_report(report):
+    for name, entry in report.items():
+        for index in entry["created"]:
+            logging.info("Created index %s.%s", name, index)
+        for index, error in entry["errors"].items():
+            logging.error("Failed to create index %s.%s: %s", name, index, error)
+        for index, reason in entry["conflicting"].items():
+            logging.warning("Index %s.%s does not match the registry (%s)", name, index, reason)
+        if entry["extra"]:
+            logging.warning("Indexes on %s not in the registry: %s", name, ", ".join(entry["extra"]))
+        if entry["unused"]:
+            logging.info("Unused indexes on %s: %s", name, ", ".join(entry["unused"]))
+
+
+def ensure_indexes(db):
+    """Startup reconciliation (ENSURE_INDEXES) shared by both apps."""
+    log_report(reconcile_indexes(db))
+    log_missing_unique(unique_indexes.check(db))
+
+
+def ensure_indexes_at(uri, **client_options):
+    """ensure_indexes through a short-lived synchronous client.
+
+    For create_async_app, whose own client is an AsyncMongoClient.
+    """
+    client = MongoClient(uri, **client_options)
+    try:
+        ensure_indexes(client.get_default_database())
+    finally:
+        client.close()
+
+
+@click.command("ensure-indexes")
+@click.option("--dry-run", is_flag=True, help="Report what would change without creating anything.")
+@with_appcontext
+def ensure_indexes_command(dry_run):
+    """Reconcile MongoDB indexes with the registry."""
+    report = reconcile_indexes(mongo.db, dry_run=dry_run)
+    click.echo(json.dumps(report, indent=2))
@@ -0,0 +1,63 @@
+from bson import json_util
+from bson.json_util import RELAXED_JSON_OPTIONS
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to bson.json_util
+    orjson = None
+
+
+# Faster stand-in for Flask-PyMongo's BSONProvider (JSON_PROVIDER = "fast").
+# Output is the same relaxed Extended JSON ({"$oid": ...}, {"$date": ...});
+# only the encoder changes. Without orjson installed this behaves exactly like
+# BSONProvider.
+
+def _default(o):
+    return json_util.default(o, RELAXED_JSON_OPTIONS)
+
+
+def _object_hook(obj):
+    """Apply json_util's Extended JSON decoding to an already parsed value."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if isinstance(value, (dict, list)):
+                obj[key] = _object_hook(value)
+        return json_util.object_hook(obj, RELAXED_JSON_OPTIONS)
+    if isinstance(obj, list):
+        return [_object_hook(v) if isinstance(v, (dict, list)) else v for v in obj]
+    return obj
+
+
+class FastJSONProvider(JSONProvider):
+    mimetype = "application/json"
+
+    def _encode(self, obj):
+        if orjson is not None:
+            try:
+                return orjson.dumps(
+                    obj, default=_default,
+                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                )
+            except orjson.JSONEncodeError:
+                pass  # e.g. ints over 64 bits; json_util handles those
+        return json_util.dumps(obj, json_options=RELAXED_JSON_OPTIONS).encode()
+
+    def dumps(self, obj, **kwargs):
+        return self._encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return json_util.loads(s)
+        try:
+            data = orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # Let the stdlib decide (it accepts NaN, big ints, ...)
+            return json_util.loads(s)
+        # Extended JSON keys all start with "$"; skip the walk when there are none
+        marker = b'"$' if isinstance(s, (bytes, bytearray)) else '"$'
+        return _object_hook(data) if marker in s else data
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj), mimetype=self.mimetype)
@@ -0,0 +1,194 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
+
+
+# Logging for create_app / create_async_app. Request threads only put records
+# on a bounded in-memory queue; a QueueListener thread does the formatting and
+# the file/console writes, so a slow disk never stalls a request. When the
+# queue is full records are dropped (and counted) instead of blocking.
+#
+#   LOG_FORMAT       "text" (default) or "json" (one JSON object per line)
+#   LOG_LEVEL        root level, default INFO
+#   LOG_FILE         rotating log file, default app.log ("" for console only)
+#   LOG_MAX_BYTES / LOG_BACKUP_COUNT   size-based rotation
+#   LOG_ROTATION     "size" (default) rotates in-process; "external" only
+#                    reopens the file after an outside logrotate moved it,
+#                    which is what several processes sharing LOG_FILE need
+#   LOG_SAMPLE_RATE  share of INFO-and-below records kept (warnings always are)
+#   LOG_QUEUE_SIZE   records buffered before dropping
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] [%(request_id)s] %(message)s"
+
+_request_id = ContextVar("request_id", default="-")
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_listener = None
+_handler = None
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+def dropped_records():
+    """Records discarded because the log queue was full."""
+    return _handler.dropped if _handler is not None else 0
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep `rate` of the records at or below INFO; pass `extra={"sample": False}` to always keep one."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if self.rate >= 1 or record.levelno > logging.INFO or not getattr(record, "sample", True):
+            return True
+        return random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Merge args and render the traceback here, but keep them apart so the
+        # JSON formatter can emit the exception as its own field
+        record = logging.makeLogRecord(vars(record))
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and key != "sample":
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def _stop():
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        logging.getLogger().removeHandler(_handler)
+        _listener = _handler = None
+
+
+def configure_logging(app):
+    """(Re)build the root logger's queue handler and listener from app.config."""
+    global _listener, _handler
+    _stop()
+    config = app.config
+
+    if config.get("LOG_FORMAT", "text") == "json":
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if config.get("LOG_FILE") and config.get("LOG_ROTATION", "size") == "external":
+        handlers.append(WatchedFileHandler(config["LOG_FILE"], encoding="utf-8"))
+    elif config.get("LOG_FILE"):
+        handlers.append(RotatingFileHandler(
+            config["LOG_FILE"],
+            maxBytes=config.get("LOG_MAX_BYTES", 10 * 1024 * 1024),
+            backupCount=config.get("LOG_BACKUP_COUNT", 5),
+            encoding="utf-8",
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    _handler = NonBlockingQueueHandler(queue.Queue(config.get("LOG_QUEUE_SIZE", 10000)))
+    _handler.addFilter(SamplingFilter(config.get("LOG_SAMPLE_RATE", 1.0)))
+    _handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.setLevel(config.get("LOG_LEVEL", "INFO"))
+    root.addHandler(_handler)
+
+    _listener = QueueListener(_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _handler
+
+
+atexit.register(_stop)
+
+
+def _new_request_id(header):
+    return header if header and _VALID_REQUEST_ID.match(header) else uuid.uuid4().hex
+
+
+def init_request_id(app):
+    """Tag every log record of a request with its X-Request-ID (incoming or generated)."""
+    from flask import request
+
+    def start():
+        _request_id.set(_new_request_id(request.headers.get("X-Request-ID")))
+
+    def finish(response):
+        response.headers["X-Request-ID"] = _request_id.get()
+        return response
+
+    def reset(exc=None):
+        _request_id.set("-")
+
+    app.before_request(start)
+    app.after_request(finish)
+    app.teardown_request(reset)
+
+
+def init_async_request_id(app):
+    """init_request_id for the Quart app."""
+    from quart import request
+
+    async def start():
+        _request_id.set(_new_request_id(request.headers.get("X-Request-ID")))
+
+    async def finish(response):
+        response.headers["X-Request-ID"] = _request_id.get()
+        return response
+
+    app.before_request(start)
+    app.after_request(finish)
@@ -0,0 +1,266 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from pymongo import monitoring
+from .logging_config import dropped_records
+
+
+# In-process metrics in Prometheus text format (GET /metrics):
+#
+#   http_request_duration_seconds{endpoint,method,status}    histogram
+#   mongodb_command_duration_seconds{route,collection,command} histogram
+#   mongodb_command_failures_total{route,collection,command}
+#   mongodb_documents_returned_total{route,collection,command}
+#   cache_hits_total / cache_misses_total{cache}
+#   cache_coalesced_total{cache}  (misses that waited for a running query)
+#   admission_rejected_total{endpoint,reason}
+#
+# Mongo commands are attributed to the route that issued them through a
+# context variable set when the request starts. Values are per process.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cache hits (sub-millisecond) up to slow aggregations
+HTTP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_route = ContextVar("metrics_route", default="none")
+_started = ContextVar("metrics_started", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by a tuple of label values.
+
+    `observe` is a bisect and three increments under a lock; cumulative
+    bucket counts are only computed when rendering.
+    """
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # per-bucket counts (+Inf last), sum, count
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.label_names, labels)} {value}" for labels, value in snapshot]
+        return lines
+
+
+def _is_count(command):
+    """True for the aggregate that Collection.count_documents sends."""
+    pipeline = command.get("pipeline") or []
+    return bool(pipeline) and pipeline[-1] == {"$group": {"_id": 1, "n": {"$sum": 1}}}
+
+
+def _returned(command_name, reply):
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") else 0
+    return 0
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Times every command and counts the documents it returned."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self._pending = {}
+
+    def started(self, event):
+        command = event.command
+        name = event.command_name
+        if name == "getMore":
+            collection = command.get("collection", "none")
+        else:
+            collection = command.get(name)
+            if not isinstance(collection, str):
+                collection = "none"
+        if name == "aggregate" and _is_count(command):
+            name = "count_documents"
+        self._pending[(event.connection_id, event.request_id)] = (_route.get(), collection, name)
+
+    def _finish(self, event):
+        return self._pending.pop((event.connection_id, event.request_id), None)
+
+    def succeeded(self, event):
+        labels = self._finish(event)
+        if labels is None:
+            return
+        self.metrics.mongo_duration.observe(labels, event.duration_micros / 1e6)
+        returned = _returned(event.command_name, event.reply or {})
+        if returned:
+            self.metrics.mongo_documents.inc(labels, returned)
+
+    def failed(self, event):
+        labels = self._finish(event)
+        if labels is None:
+            return
+        self.metrics.mongo_duration.observe(labels, event.duration_micros / 1e6)
+        self.metrics.mongo_failures.inc(labels)
+
+
+class Metrics:
+    def __init__(self):
+        self.http_duration = Histogram(
+            "http_request_duration_seconds", "Request latency by endpoint.",
+            ("endpoint", "method", "status"), HTTP_BUCKETS
+        )
+        self.mongo_duration = Histogram(
+            "mongodb_command_duration_seconds", "MongoDB command latency by originating route.",
+            ("route", "collection", "command"), MONGO_BUCKETS
+        )
+        self.mongo_failures = Counter(
+            "mongodb_command_failures_total", "MongoDB commands that failed.",
+            ("route", "collection", "command")
+        )
+        self.mongo_documents = Counter(
+            "mongodb_documents_returned_total", "Documents returned by MongoDB commands.",
+            ("route", "collection", "command")
+        )
+        self.command_listener = MongoCommandListener(self)
+        self.caches = ()
+        self.admission = None
+
+    def init_app(self, app, caches=(), admission=None):
+        """Time requests and serve /metrics on a Flask app."""
+        from flask import request
+        self.caches = caches
+        self.admission = admission
+
+        def start():
+            self._start(request)
+
+        def record(response):
+            return self._record(request, response)
+
+        app.before_request(start)
+        app.after_request(record)
+        app.teardown_request(self._reset)
+        app.add_url_rule("/metrics", "metrics", self._view)
+
+    def init_async_app(self, app, caches=(), admission=None):
+        """Same as init_app for the Quart app (hooks must be coroutines there)."""
+        from quart import request
+        self.caches = caches
+        self.admission = admission
+
+        async def start():
+            self._start(request)
+
+        async def record(response):
+            return self._record(request, response)
+
+        async def reset(exc=None):
+            self._reset(exc)
+
+        async def view():
+            return self._view()
+
+        app.before_request(start)
+        app.after_request(record)
+        app.teardown_request(reset)
+        app.add_url_rule("/metrics", "metrics", view)
+
+    def _start(self, request):
+        _route.set(request.endpoint or "unmatched")
+        _started.set(time.perf_counter())
+
+    def _record(self, request, response):
+        started = _started.get()
+        if started is not None:
+            self.http_duration.observe(
+                (request.endpoint or "unmatched", request.method, str(response.status_code)),
+                time.perf_counter() - started
+            )
+            _started.set(None)
+        return response
+
+    def _reset(self, exc=None):
+        _route.set("none")
+
+    def _view(self):
+        return self.render(), 200, {"Content-Type": CONTENT_TYPE}
+
+    def render(self):
+        lines = []
+        for metric in (self.http_duration, self.mongo_duration, self.mongo_failures, self.mongo_documents):
+            lines += metric.render()
+        lines += ["# HELP cache_hits_total Detail cache hits.", "# TYPE cache_hits_total counter"]
+        lines += [f'cache_hits_total{{cache="{c.namespace}"}} {c.stats()["hits"]}' for c in self.caches]
+        lines += ["# HELP cache_misses_total Detail cache misses.", "# TYPE cache_misses_total counter"]
+        lines += [f'cache_misses_total{{cache="{c.namespace}"}} {c.stats()["misses"]}' for c in self.caches]
+        coalesced = [(c.namespace, c.stats()["coalesced"]) for c in self.caches if "coalesced" in c.stats()]
+        if coalesced:
+            lines += ["# HELP cache_coalesced_total Misses served by another request's query.",
+                      "# TYPE cache_coalesced_total counter"]
+            lines += [f'cache_coalesced_total{{cache="{name}"}} {value}' for name, value in coalesced]
+        lines += ["# HELP log_records_dropped_total Log records dropped on a full log queue.",
+                  "# TYPE log_records_dropped_total counter",
+                  f"log_records_dropped_total {dropped_records()}"]
+        if self.admission is not None:
+            lines += ["# HELP admission_rejected_total Requests shed by admission control.",
+                      "# TYPE admission_rejected_total counter"]
+            lines += [f"admission_rejected_total{_labels(('endpoint', 'reason'), key)} {value}"
+                      for key, value in sorted(self.admission.stats().items())]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,141 @@
+import logging
+from quart import request, jsonify, current_app
+from marshmallow import ValidationError
+from pymongo.errors import DuplicateKeyError
+from .schema import BrandSchema
+from ...projection import parse_fields, projection_for
+from ...serializers import serializer_for
+from ...batch import parse_ids, in_order
+from ...http_cache import document_etag, last_modified, with_validators
+from ...async_http_cache import is_not_modified, not_modified_response, conditional_list
+from .async_model import AsyncBrandModel
+from ..products.async_stats import AsyncProductStats
+from ..products.stats import stats_view
+from .model import SUMMARY_PROJECTION
+from .controller import brand_schema, brand_summary, is_email_conflict
+
+# Async counterparts of controller.py for the ASGI app.
+
+
+async def add_brand():
+    try:
+        data = await request.get_json(silent=True)
+        if not data:
+            return jsonify({"error": "Missing request body"}), 400
+
+        validated = brand_schema.load(data)
+
+        # Until the email_unique index exists, look for a duplicate first
+        if await AsyncBrandModel.email_taken(validated["email"]):
+            return jsonify({"error": "Email already registered"}), 400
+
+        brand = await AsyncBrandModel.create(validated)
+        logging.info("Brand created: %s (ID: %s)", brand.get("brand_name"), brand.get("brand_id"))
+        return jsonify({
+            "message": "Brand created successfully",
+            "brand": serializer_for(BrandSchema).dump(brand)
+        }), 201
+
+    except ValidationError as err:
+        return jsonify({"error": err.messages}), 400
+    except DuplicateKeyError as e:
+        # Enforced by the email_unique index (brands/indexes.py), so two
+        # concurrent sign-ups with the same email can't both succeed. Any
+        # other duplicate key is a server error, not the caller's email.
+        if is_email_conflict(e):
+            return jsonify({"error": "Email already registered"}), 400
+        logging.error("Error creating brand: %s", e, exc_info=True)
+        return jsonify({"error": "Something went wrong"}), 500
+    except Exception as e:
+        logging.error("Error creating brand: %s", e, exc_info=True)
+        return jsonify({"error": "Something went wrong"}), 500
+
+
+async def get_brands():
+    try:
+        fields = parse_fields(request.args.get("fields"), BrandSchema)
+        brands = await AsyncBrandModel.get_all(projection=projection_for(fields) if fields else SUMMARY_PROJECTION)
+        if not brands:
+            return jsonify({"error": "No brands available yet"}), 404
+        if fields:
+            return await conditional_list(jsonify(serializer_for(BrandSchema, fields).dump(brands, many=True)))
+        return await conditional_list(jsonify([brand_summary(b) for b in brands]))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    except Exception as e:
+        logging.error("Error fetching brands: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to fetch brands"}), 500
+
+
+async def get_brand_by_id(brand_id):
+    try:
+        fields = parse_fields(request.args.get("fields"), BrandSchema)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    brand = await AsyncBrandModel.get_by_id(brand_id)
+    if not brand:
+        return jsonify({"error": "Brand not found"}), 404
+
+    etag = document_etag(brand, "brand_id", fields)
+    modified = last_modified(brand)
+    if is_not_modified(etag, modified):
+        return await not_modified_response(etag, modified)
+    return with_validators(jsonify(serializer_for(BrandSchema, fields).dump(brand)), etag, modified)
+
+
+async def get_brands_batch():
+    try:
+        fields = parse_fields(request.args.get("fields"), BrandSchema)
+        body = await request.get_json(silent=True) if request.method == "POST" else None
+        ids = parse_ids(request.args.get("ids"), body, current_app.config["BATCH_MAX_IDS"])
+        brands, missing = in_order(ids, await AsyncBrandModel.get_by_ids(ids))
+        return await conditional_list(jsonify({
+            "brands": serializer_for(BrandSchema, fields).dump(brands, many=True),
+            "missing": missing
+        }))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    except Exception as e:
+        logging.error("Error fetching brands by ID: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to fetch brands"}), 500
+
+
+async def get_brand_stats(brand_id):
+    try:
+        stats = await AsyncProductStats.get("brand", brand_id)
+        if stats is None and not await AsyncBrandModel.get_by_id(brand_id):
+            return jsonify({"error": "Brand not found"}), 404
+        return jsonify({"brand_id": brand_id, **stats_view(stats)}), 200
+    except Exception as e:
+        logging.error("Error fetching brand stats (ID: %s): %s", brand_id, e, exc_info=True)
+        return jsonify({"error": "Failed to fetch brand stats"}), 500
+
+
+async def update_brand(brand_id):
+    try:
+        data = await request.get_json(silent=True)
+        if not data:
+            return jsonify({"error": "Missing request body"}), 400
+
+        if "email" in data and await AsyncBrandModel.email_taken(data["email"], brand_id):
+            return jsonify({"error": "Email already registered"}), 400
+
+        updated = await AsyncBrandModel.update(brand_id, data)
+        if not updated:
+            return jsonify({"error": "Brand not found"}), 404
+
+        return jsonify({
+            "message": "Brand updated successfully",
+            "brand": serializer_for(BrandSchema).dump(updated)
+        }), 200
+
+    except DuplicateKeyError as e:
+        # email_unique rejects taking another brand's email (see add_brand)
+        if is_email_conflict(e):
+            return jsonify({"error": "Email already registered"}), 400
+        logging.error("Error updating brand (ID: %s): %s", brand_id, e, exc_info=True)
+        return jsonify({"error": "Update failed"}), 500
+    except Exception as e:
+        logging.error("Error updating brand (ID: %s): %s", brand_id, e, exc_info=True)
+        return jsonify({"error": "Update failed"}), 500
@@ -0,0 +1,88 @@
+from ...extensions import async_mongo, async_reads, brand_cache
+from ...indexes import unique_indexes
+from pymongo import ReturnDocument
+from datetime import datetime
+from uuid import uuid4
+
+# Async mirror of BrandModel for the ASGI app (app/asgi.py).
+
+class AsyncBrandModel:
+    collection = lambda: async_mongo.db.brands
+    read_collection = lambda: async_reads.db.brands
+    # See BrandModel.detail_collection
+    detail_collection = lambda: AsyncBrandModel.collection() if brand_cache.shared else AsyncBrandModel.read_collection()
+
+    @staticmethod
+    async def get_all(projection=None):
+        brands = await AsyncBrandModel.read_collection().find({}, projection).to_list()
+        for b in brands:
+            if "_id" in b:
+                b["_id"] = str(b["_id"])
+        return brands
+
+    @staticmethod
+    async def get_many(brand_ids, projection=None):
+        return await AsyncBrandModel.read_collection().find({"brand_id": {"$in": list(brand_ids)}}, projection).to_list()
+
+    @staticmethod
+    async def get_by_id(brand_id):
+        return await brand_cache.get_or_load_async(brand_id, lambda: AsyncBrandModel._load(brand_id))
+
+    @staticmethod
+    async def get_by_ids(brand_ids):
+        return await brand_cache.get_or_load_many_async(brand_ids, AsyncBrandModel._load_many)
+
+    @staticmethod
+    async def _load_many(brand_ids):
+        brands = {}
+        async for brand in AsyncBrandModel.detail_collection().find({"brand_id": {"$in": list(brand_ids)}}):
+            brand["_id"] = str(brand["_id"])
+            brands[brand["brand_id"]] = brand
+        return brands
+
+    @staticmethod
+    async def _load(brand_id):
+        brand = await AsyncBrandModel.detail_collection().find_one({"brand_id": brand_id})
+        if brand:
+            brand["_id"] = str(brand["_id"])
+        return brand
+
+    @staticmethod
+    async def email_taken(email, brand_id=None):
+        """See BrandModel.email_taken."""
+        if unique_indexes.exists("brands", "email_unique"):
+            return False
+        query = {"email": email}
+        if brand_id is not None:
+            query["brand_id"] = {"$ne": brand_id}
+        return await AsyncBrandModel.collection().find_one(query, {"_id": 1}) is not None
+
+    @staticmethod
+    async def create(data):
+        # Add default fields
+        data["brand_id"] = str(uuid4())
+        data["created_at"] = datetime.utcnow()
+        data["updated_at"] = datetime.utcnow()
+        data.setdefault("verification_status", "Pending")
+
+        await AsyncBrandModel.collection().insert_one(data)
+        return data
+
+    @staticmethod
+    async def update(brand_id, update_data):
+        update_data["updated_at"] = datetime.utcnow()
+        brand = await AsyncBrandModel.collection().find_one_and_update(
+            {"brand_id": brand_id},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+        await brand_cache.invalidate_async(brand_id)
+        if brand:
+            brand["_id"] = str(brand["_id"])
+        return brand
+
+    @staticmethod
+    async def delete(brand_id):
+        result = await AsyncBrandModel.collection().delete_one({"brand_id": brand_id})
+        await brand_cache.invalidate_async(brand_id)
+        return result.deleted_count > 0
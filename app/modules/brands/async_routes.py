@@ -0,0 +1,35 @@
+from quart import Blueprint
+from .async_controller import add_brand, get_brands, get_brand_by_id, get_brands_batch, update_brand, get_brand_stats
+
+# Same URLs as routes.py, served by the ASGI app (app/asgi.py)
+async_brands_bp = Blueprint("brands_bp", __name__)
+
+# POST: Add new brand
+@async_brands_bp.route("/", methods=["POST"])
+async def new_brand():
+    return await add_brand()
+
+# GET: List all brands
+@async_brands_bp.route("/", methods=["GET"])
+async def list_brands():
+    return await get_brands()
+
+# GET/POST: Details of several brands
+@async_brands_bp.route("/batch", methods=["GET", "POST"])
+async def batch():
+    return await get_brands_batch()
+
+# GET: Details of a brand by id
+@async_brands_bp.route("/<id>", methods=["GET"])
+async def get_by_id(id):
+    return await get_brand_by_id(id)
+
+# GET: Product stats of a brand
+@async_brands_bp.route("/<id>/stats", methods=["GET"])
+async def brand_stats(id):
+    return await get_brand_stats(id)
+
+# POST: Update brand details
+@async_brands_bp.route("/<id>/update", methods=["POST"])
+async def update_details(id):
+    return await update_brand(id)
@@ -1,10 +1,36 @@
-from flask import request, jsonify
+import logging
+from flask import request, jsonify, current_app
 from marshmallow import ValidationError
+from pymongo.errors import DuplicateKeyError
 from .schema import BrandSchema
-from .model import BrandModel
+from ...projection import parse_fields, projection_for
+from ...serializers import serializer_for
+from ...batch import parse_ids, in_order
+from ...http_cache import document_etag, last_modified, is_not_modified, not_modified_response, with_validators, conditional_list
+from .model import BrandModel, SUMMARY_PROJECTION
+from ..products.stats import ProductStats, stats_view
 
 brand_schema = BrandSchema()
 
+
+def brand_summary(b):
+    """Listing view of a brand (also embedded by product ?expand=brand)."""
+    return {
+        "brand_id": b.get("brand_id"),
+        "name": b.get("brand_name"),
+        "logo": b.get("brand_logo")
+    }
+
+
+def is_email_conflict(err):
+    """Whether a DuplicateKeyError came from the email_unique index."""
+    details = err.details or {}
+    if "keyPattern" in details:
+        return "email" in details["keyPattern"]
+    # Servers that don't report keyPattern name the index in the message
+    return "email_unique" in str(err)
+
+
 def add_brand():
     try:
         data = request.get_json()
@@ -15,51 +41,98 @@ def add_brand():
         # Validate input using Marshmallow
         validated = brand_schema.load(data)
     
-        # Optional: check duplicate email
-        existing = BrandModel.collection().find_one({"email": validated["email"]})
-        if existing:
+        # Until the email_unique index exists, look for a duplicate first
+        if BrandModel.email_taken(validated["email"]):
             return jsonify({"error": "Email already registered"}), 400
 
         # Create new brand
         brand = BrandModel.create(validated)
-        print(brand)
+        logging.info("Brand created: %s (ID: %s)", brand.get("brand_name"), brand.get("brand_id"))
         return jsonify({
             "message": "Brand created successfully",
-            "brand": brand_schema.dump(brand)
+            "brand": serializer_for(BrandSchema).dump(brand)
         }), 201
 
     except ValidationError as err:
         return jsonify({"error": err.messages}), 400
+    except DuplicateKeyError as e:
+        # Enforced by the email_unique index (brands/indexes.py), so two
+        # concurrent sign-ups with the same email can't both succeed. Any
+        # other duplicate key is a server error, not the caller's email.
+        if is_email_conflict(e):
+            return jsonify({"error": "Email already registered"}), 400
+        logging.error("Error creating brand: %s", e, exc_info=True)
+        return jsonify({"error": "Something went wrong"}), 500
     except Exception as e:
-        print("Error:", e)
+        logging.error("Error creating brand: %s", e, exc_info=True)
         return jsonify({"error": "Something went wrong"}), 500
 
 
 def get_brands():
     try:
-        brands = BrandModel.get_all()
+        fields = parse_fields(request.args.get("fields"), BrandSchema)
+        brands = BrandModel.get_all(projection=projection_for(fields) if fields else SUMMARY_PROJECTION)
         if not brands:
             return jsonify({"error":"No brands available yet"}), 404    
+        if fields:
+            return conditional_list(jsonify(serializer_for(BrandSchema, fields).dump(brands, many=True)))
         # ✅ build a new filtered list
-        simplified_brands = [
-            {
-                "brand_id": b.get("brand_id"),
-                "name": b.get("brand_name"),
-                "logo": b.get("brand_logo")
-            }
-            for b in brands
-        ]
-        return jsonify(simplified_brands), 200
+        simplified_brands = [brand_summary(b) for b in brands]
+        return conditional_list(jsonify(simplified_brands))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
     except Exception as e:
-        print("Error:", e)
+        logging.error("Error fetching brands: %s", e, exc_info=True)
         return jsonify({"error": "Failed to fetch brands"}), 500
 
 
 def get_brand_by_id(brand_id):
+    try:
+        fields = parse_fields(request.args.get("fields"), BrandSchema)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
     brand = BrandModel.get_by_id(brand_id)
     if not brand:
         return jsonify({"error": "Brand not found"}), 404
-    return jsonify(brand_schema.dump(brand)), 200
+
+    # Validators come from updated_at, so a 304 skips the dump
+    etag = document_etag(brand, "brand_id", fields)
+    modified = last_modified(brand)
+    if is_not_modified(etag, modified):
+        return not_modified_response(etag, modified)
+    return with_validators(jsonify(serializer_for(BrandSchema, fields).dump(brand)), etag, modified)
+
+
+# Several brands by id (?ids=a,b,c or POST {"ids": [...]}), detail view
+def get_brands_batch():
+    try:
+        fields = parse_fields(request.args.get("fields"), BrandSchema)
+        body = request.get_json(silent=True) if request.method == "POST" else None
+        ids = parse_ids(request.args.get("ids"), body, current_app.config["BATCH_MAX_IDS"])
+        brands, missing = in_order(ids, BrandModel.get_by_ids(ids))
+        return conditional_list(jsonify({
+            "brands": serializer_for(BrandSchema, fields).dump(brands, many=True),
+            "missing": missing
+        }))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    except Exception as e:
+        logging.error("Error fetching brands by ID: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to fetch brands"}), 500
+
+
+# 📊 Product stats for a brand (maintained on every product write)
+def get_brand_stats(brand_id):
+    try:
+        stats = ProductStats.get("brand", brand_id)
+        # No stats document: either no products yet or no such brand
+        if stats is None and not BrandModel.get_by_id(brand_id):
+            return jsonify({"error": "Brand not found"}), 404
+        return jsonify({"brand_id": brand_id, **stats_view(stats)}), 200
+    except Exception as e:
+        logging.error("Error fetching brand stats (ID: %s): %s", brand_id, e, exc_info=True)
+        return jsonify({"error": "Failed to fetch brand stats"}), 500
 
 
 def update_brand(brand_id):
@@ -68,17 +141,26 @@ def update_brand(brand_id):
         if not data:
             return jsonify({"error": "Missing request body"}), 400
 
+        if "email" in data and BrandModel.email_taken(data["email"], brand_id):
+            return jsonify({"error": "Email already registered"}), 400
+
         updated = BrandModel.update(brand_id, data)
         if not updated:
             return jsonify({"error": "Brand not found"}), 404
 
         return jsonify({
             "message": "Brand updated successfully",
-            "brand": brand_schema.dump(updated)
+            "brand": serializer_for(BrandSchema).dump(updated)
         }), 200
 
+    except DuplicateKeyError as e:
+        # email_unique rejects taking another brand's email (see add_brand)
+        if is_email_conflict(e):
+            return jsonify({"error": "Email already registered"}), 400
+        logging.error("Error updating brand (ID: %s): %s", brand_id, e, exc_info=True)
+        return jsonify({"error": "Update failed"}), 500
     except Exception as e:
-        print("Error:", e)
+        logging.error("Error updating brand (ID: %s): %s", brand_id, e, exc_info=True)
         return jsonify({"error": "Update failed"}), 500
 
 
@@ -0,0 +1,10 @@
+from pymongo import IndexModel, ASCENDING
+
+# Indexes the brands collection is expected to have (reconciled on startup).
+BRAND_INDEXES = [
+    # get_by_id / update / delete
+    IndexModel([("brand_id", ASCENDING)], name="brand_id_unique", unique=True),
+
+    # One brand per email address
+    IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+]
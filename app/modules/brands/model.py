@@ -1,24 +1,72 @@
-from ...extensions import mongo
+from ...extensions import mongo, mongo_reads, brand_cache
+from ...indexes import unique_indexes
+from pymongo import ReturnDocument
 from datetime import datetime
 from uuid import uuid4
 
+# Fields of the brand summary (brand listing, product ?expand=brand)
+SUMMARY_PROJECTION = {"_id": 0, "brand_id": 1, "brand_name": 1, "brand_logo": 1}
+
 class BrandModel:
     collection = lambda: mongo.db.brands
+    # Read-only queries; may be served by a secondary
+    read_collection = lambda: mongo_reads.db.brands
+    # Detail lookups: the primary when they fill a shared cache, where a
+    # lagging secondary could re-cache the pre-update brand for every worker
+    # for CACHE_TTL right after a write
+    detail_collection = lambda: BrandModel.collection() if brand_cache.shared else BrandModel.read_collection()
 
     @staticmethod
-    def get_all():
-        brands = list(BrandModel.collection().find())
+    def get_all(projection=None):
+        brands = list(BrandModel.read_collection().find({}, projection))
         for b in brands:
-            b["_id"] = str(b["_id"])
+            if "_id" in b:
+                b["_id"] = str(b["_id"])
         return brands
 
+    @staticmethod
+    def get_many(brand_ids, projection=None):
+        """Brands with any of the given ids, in one $in query."""
+        return list(BrandModel.read_collection().find({"brand_id": {"$in": list(brand_ids)}}, projection))
+
     @staticmethod
     def get_by_id(brand_id):
-        brand = BrandModel.collection().find_one({"brand_id": brand_id})
+        return brand_cache.get_or_load(brand_id, lambda: BrandModel._load(brand_id))
+
+    @staticmethod
+    def get_by_ids(brand_ids):
+        """Full brands by id (cached like get_by_id), missing ones left out."""
+        return brand_cache.get_or_load_many(brand_ids, BrandModel._load_many)
+
+    @staticmethod
+    def _load_many(brand_ids):
+        brands = {}
+        for brand in BrandModel.detail_collection().find({"brand_id": {"$in": list(brand_ids)}}):
+            brand["_id"] = str(brand["_id"])
+            brands[brand["brand_id"]] = brand
+        return brands
+
+    @staticmethod
+    def _load(brand_id):
+        brand = BrandModel.detail_collection().find_one({"brand_id": brand_id})
         if brand:
             brand["_id"] = str(brand["_id"])
         return brand
 
+    @staticmethod
+    def email_taken(email, brand_id=None):
+        """Whether another brand already uses `email`.
+
+        Only queried while the email_unique index is not known to exist; once
+        it does, the insert/update itself rejects duplicates (DuplicateKeyError).
+        """
+        if unique_indexes.exists("brands", "email_unique"):
+            return False
+        query = {"email": email}
+        if brand_id is not None:
+            query["brand_id"] = {"$ne": brand_id}
+        return BrandModel.collection().find_one(query, {"_id": 1}) is not None
+
     @staticmethod
     def create(data):
         # Add default fields
@@ -27,19 +75,25 @@ class BrandModel:
         data["updated_at"] = datetime.utcnow()
         data.setdefault("verification_status", "Pending")
 
-        res = BrandModel.collection().insert_one(data)
+        BrandModel.collection().insert_one(data)
         return data
 
     @staticmethod
     def update(brand_id, update_data):
         update_data["updated_at"] = datetime.utcnow()
-        BrandModel.collection().update_one(
+        # One round-trip: the primary applies the update and returns the result
+        brand = BrandModel.collection().find_one_and_update(
             {"brand_id": brand_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-        return BrandModel.get_by_id(brand_id)
+        brand_cache.invalidate(brand_id)
+        if brand:
+            brand["_id"] = str(brand["_id"])
+        return brand
 
     @staticmethod
     def delete(brand_id):
         result = BrandModel.collection().delete_one({"brand_id": brand_id})
+        brand_cache.invalidate(brand_id)
         return result.deleted_count > 0
@@ -1,5 +1,5 @@
 from flask import Blueprint
-from .controller import add_brand, get_brands,get_brand_by_id,update_brand
+from .controller import add_brand, get_brands,get_brand_by_id,get_brands_batch,update_brand,get_brand_stats
 
 brands_bp = Blueprint("brands_bp", __name__)
 
@@ -17,11 +17,21 @@ def new_brand():
 def list_brands():
     return get_brands()
 
+# GET/POST: Details of several brands (?ids=a,b,c or JSON {"ids": [...]})
+@brands_bp.route("/batch", methods=["GET", "POST"])
+def batch():
+    return get_brands_batch()
+
 # GET: Details of a brand by id
 @brands_bp.route("/<id>", methods=["GET"])
 def get_by_id(id):
    return get_brand_by_id(id)
 
+# GET: Product stats of a brand
+@brands_bp.route("/<id>/stats", methods=["GET"])
+def brand_stats(id):
+    return get_brand_stats(id)
+
 @brands_bp.route("/<id>/update", methods=["POST"])
 def update_details(id):
     return update_brand(id)
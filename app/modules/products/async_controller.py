@@ -0,0 +1,420 @@
+import logging
+from quart import request, jsonify, current_app, g
+from marshmallow import ValidationError
+from pymongo.errors import OperationFailure
+from datetime import datetime
+from .schema import ProductSchema
+from ...pagination import with_tiebreaker
+from ...projection import parse_fields, projection_for
+from ...serializers import serializer_for
+from ...batch import parse_ids, in_order
+from ...streaming import aiter_json_records, STREAM_FORMATS
+from ...async_streaming import stream_response
+from ...db import ingest_write_concern
+from ...http_cache import document_etag, last_modified, with_validators
+from ...async_http_cache import is_not_modified, not_modified_response, conditional_list, conditional
+from .model import resolve_sort, DEFAULT_SORT, missing_text_index
+from .async_model import AsyncProductModel
+from .async_stats import AsyncProductStats
+from .recent import recent_feed
+from .search_cache import search_cache
+from .stats import stats_view, totals_view
+from .expand import parse_expand, expansion_fields, expansion_projection, missing_brand_ids, remember, embed_brands
+from ..brands.model import SUMMARY_PROJECTION
+from ..brands.async_model import AsyncBrandModel
+from .controller import (
+    product_schema, LIST_PROJECTION, _simplify, search_params, search_payload,
+    bulk_operations, parse_bulk_updates, parse_bulk_deletes, TEXT_INDEX_MISSING, CSV_COLUMNS
+)
+
+# Async counterparts of controller.py for the ASGI app. Request parsing and
+# response shaping are shared with the WSGI controllers; only I/O differs.
+
+
+def _stream_listing(filters, fields, fmt, name):
+    """Chunked JSON array / NDJSON / CSV response for a product listing."""
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"stream must be one of: {', '.join(STREAM_FORMATS)}")
+    batch_size = current_app.config["STREAM_BATCH_SIZE"]
+    projection = projection_for(fields) if fields else None
+    docs = AsyncProductModel.iter_products(filters, projection, batch_size=batch_size)
+    dump = serializer_for(ProductSchema, fields).dump
+    return stream_response(
+        docs,
+        dump,
+        fmt,
+        columns=fields or CSV_COLUMNS,
+        filename=f"products-{name}.csv" if fmt == "csv" else None,
+        batch_size=batch_size
+    )
+
+
+def _requested_fields():
+    return parse_fields(request.args.get("fields"), ProductSchema)
+
+
+def _requested_expand():
+    return parse_expand(request.args.get("expand"))
+
+
+async def _expand_brands(products, rendered):
+    """expand.expand_brands with the awaited brand lookup."""
+    memo = g.setdefault("brand_summaries", {})
+    missing = missing_brand_ids(products, memo)
+    if missing:
+        remember(memo, missing, await AsyncBrandModel.get_many(missing, SUMMARY_PROJECTION))
+    return embed_brands(rendered, products, memo)
+
+
+# ➕ Create new product
+async def create_product():
+    try:
+        data = await request.get_json(silent=True)
+        if not data:
+            logging.warning("Create Product: No input data received.")
+            return jsonify({"error": "No details entered"}), 400
+
+        validated_data = product_schema.load(data)
+        product = await AsyncProductModel.create(validated_data)
+
+        logging.info("Product created successfully: %s (ID: %s)", product.get('product_name'), product.get('product_id'))
+        return jsonify({
+            "message": "Product created successfully",
+            "product": serializer_for(ProductSchema).dump(product)
+        }), 201
+
+    except ValidationError as err:
+        logging.warning("Validation error while creating product: %s", err.messages)
+        return jsonify({"errors": err.messages}), 400
+    except Exception as e:
+        logging.error("Error creating product: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to create product"}), 500
+
+
+# 📦 Bulk import (NDJSON or JSON array body, streamed)
+async def bulk_import_products():
+    batch_size = current_app.config["BULK_BATCH_SIZE"]
+    max_reported = current_app.config["BULK_MAX_REPORTED_ERRORS"]
+    write_concern = ingest_write_concern(current_app.config)
+    report = {"received": 0, "inserted": 0, "rejected_count": 0, "rejected": []}
+
+    def reject(line, errors):
+        report["rejected_count"] += 1
+        if len(report["rejected"]) < max_reported:
+            report["rejected"].append({"line": line, "errors": errors})
+
+    async def flush(batch):
+        inserted, failed = await AsyncProductModel.bulk_create([doc for _, doc in batch], write_concern)
+        report["inserted"] += inserted
+        for index, message in sorted(failed.items()):
+            reject(batch[index][0], message)
+
+    try:
+        batch = []
+        # request.body yields chunks as they arrive; nothing is buffered whole
+        async for line, record, error in aiter_json_records(request.body):
+            report["received"] += 1
+            if error:
+                reject(line, error)
+                continue
+            if not isinstance(record, dict):
+                reject(line, "Expected a JSON object")
+                continue
+            try:
+                batch.append((line, product_schema.load(record)))
+            except ValidationError as err:
+                reject(line, err.messages)
+                continue
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+        report["truncated"] = report["rejected_count"] > len(report["rejected"])
+        logging.info("Bulk import finished: %s inserted, %s rejected", report['inserted'], report['rejected_count'])
+        return jsonify(report), 200
+
+    except Exception as e:
+        logging.error("Error during bulk import: %s", e, exc_info=True)
+        report["error"] = "Bulk import aborted"
+        return jsonify(report), 500
+
+
+# 🔁 Bulk update
+async def bulk_update_products():
+    try:
+        operations = bulk_operations(await request.get_json(silent=True), current_app.config["BULK_MAX_OPERATIONS"])
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    parsed, errors = parse_bulk_updates(operations)
+    if errors:
+        return jsonify({"errors": errors}), 400
+
+    try:
+        return jsonify(await AsyncProductModel.bulk_update(parsed)), 200
+    except Exception as e:
+        logging.error("Error during bulk update: %s", e, exc_info=True)
+        return jsonify({"error": "Bulk update failed"}), 500
+
+
+# 🗑️ Bulk delete
+async def bulk_delete_products():
+    try:
+        operations = bulk_operations(await request.get_json(silent=True), current_app.config["BULK_MAX_OPERATIONS"])
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    filters_list, errors = parse_bulk_deletes(operations)
+    if errors:
+        return jsonify({"errors": errors}), 400
+
+    try:
+        return jsonify(await AsyncProductModel.bulk_delete(filters_list)), 200
+    except Exception as e:
+        logging.error("Error during bulk delete: %s", e, exc_info=True)
+        return jsonify({"error": "Bulk delete failed"}), 500
+
+
+# 📜 Get all products
+async def get_all_products():
+    try:
+        page = int(request.args.get("page", 1))
+        limit = int(request.args.get("limit", 10))
+        sort = request.args.get("sort")
+        skip = (page - 1) * limit
+        fields = _requested_fields()
+        expand = _requested_expand()
+
+        async def render(products):
+            if fields:
+                rendered = serializer_for(ProductSchema, fields).dump(products, many=True)
+            else:
+                rendered = [_simplify(p) for p in products]
+            if "brand" in expand:
+                await _expand_brands(products, rendered)
+            return rendered
+
+        cursor = request.args.get("cursor")
+        if cursor is not None:
+            sort_spec = with_tiebreaker(resolve_sort(sort, DEFAULT_SORT), "product_id")
+            if fields:
+                projection = projection_for(fields, sort_spec)
+            else:
+                projection = {**LIST_PROJECTION, **{key: 1 for key, _ in sort_spec}}
+            projection = expansion_projection(projection, expand)
+            products, next_cursor = await AsyncProductModel.keyset_page({}, sort_spec, max(1, min(100, limit)), cursor, projection)
+            return await conditional_list(jsonify({"products": await render(products), "next_cursor": next_cursor}))
+
+        projection = expansion_projection(projection_for(fields) if fields else LIST_PROJECTION, expand)
+        products = await AsyncProductModel.get_all(skip=skip, limit=limit, sort=sort, projection=projection)
+        if not products:
+            return jsonify({"total": 0, "products": []}), 200
+        return await conditional_list(jsonify(await render(products)))
+
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    except Exception as e:
+        logging.error("Error fetching all products: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to fetch products"}), 500
+
+
+# 🔍 Get product by ID
+async def get_product_by_id(product_id):
+    try:
+        fields = _requested_fields()
+        expand = _requested_expand()
+        product = await AsyncProductModel.get_by_id(product_id)
+        if not product:
+            logging.warning("Product not found (ID: %s)", product_id)
+            return jsonify({"error": "Product not found"}), 404
+
+        # Validators come from updated_at, so a 304 skips the dump
+        etag = document_etag(product, "product_id", fields)
+        modified = last_modified(product)
+        brand = None
+        if "brand" in expand:
+            # The brand can change without the product's updated_at moving
+            brand = (await _expand_brands([product], [{}]))[0]["brand"]
+            etag = document_etag(product, "product_id", fields, "brand", brand)
+            modified = None
+        if is_not_modified(etag, modified):
+            return await not_modified_response(etag, modified)
+
+        body = serializer_for(ProductSchema, fields).dump(product)
+        if "brand" in expand:
+            body["brand"] = brand
+        return with_validators(jsonify(body), etag, modified)
+
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    except Exception as e:
+        logging.error("Error fetching product by ID (%s): %s", product_id, e, exc_info=True)
+        return jsonify({"error": "Failed to fetch product"}), 500
+
+
+async def get_products_batch():
+    try:
+        fields = _requested_fields()
+        expand = _requested_expand()
+        body = await request.get_json(silent=True) if request.method == "POST" else None
+        ids = parse_ids(request.args.get("ids"), body, current_app.config["BATCH_MAX_IDS"])
+        products, missing = in_order(ids, await AsyncProductModel.get_by_ids(ids))
+        rendered = serializer_for(ProductSchema, fields).dump(products, many=True)
+        if "brand" in expand:
+            await _expand_brands(products, rendered)
+        return await conditional_list(jsonify({"products": rendered, "missing": missing}))
+
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    except Exception as e:
+        logging.error("Error fetching products by ID: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to fetch products"}), 500
+
+
+# ✏️ Update product
+async def update_product(product_id):
+    try:
+        data = await request.get_json(silent=True)
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+
+        validated_data = product_schema.load(data, partial=True)
+        validated_data["updated_at"] = datetime.utcnow()
+
+        updated = await AsyncProductModel.update(product_id, validated_data)
+        if updated == 0:
+            return jsonify({"error": "Product not found"}), 404
+        return jsonify({"message": "Product updated successfully"}), 200
+
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+    except Exception as e:
+        logging.error("Error updating product (ID: %s): %s", product_id, e, exc_info=True)
+        return jsonify({"error": "Failed to update product"}), 500
+
+
+# ❌ Delete product
+async def delete_product(product_id):
+    try:
+        deleted = await AsyncProductModel.delete(product_id)
+        if deleted == 0:
+            return jsonify({"error": "Product not found"}), 404
+        return jsonify({"message": "Product deleted successfully"}), 200
+    except Exception as e:
+        logging.error("Error deleting product (ID: %s): %s", product_id, e, exc_info=True)
+        return jsonify({"error": "Failed to delete product"}), 500
+
+
+# 📊 Catalog stats
+async def get_catalog_stats():
+    try:
+        categories = await AsyncProductStats.get_scope("category")
+        return jsonify({
+            "totals": totals_view(categories),
+            "categories": {doc["key"]: stats_view(doc) for doc in sorted(categories, key=lambda d: d["key"])}
+        }), 200
+    except Exception as e:
+        logging.error("Error fetching catalog stats: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to fetch catalog stats"}), 500
+
+
+# 🕒 Get recent products
+async def get_recent_products():
+    try:
+        limit = int(request.args.get("limit", 5))
+        fields = _requested_fields()
+        expand = _requested_expand()
+        if not fields and not expand:
+            cached = recent_feed.page(limit, lambda value: current_app.json.dumps(value).encode())
+            if cached is not None:
+                body, etag = cached
+                response = current_app.response_class(body, mimetype="application/json")
+                response.set_etag(etag, weak=True)
+                return await conditional(response)
+        projection = projection_for(expansion_fields(fields, expand)) if fields else None
+        products = await AsyncProductModel.get_recent(limit=limit, projection=projection)
+        if not products:
+            return jsonify({"total": 0, "products": []}), 200
+        rendered = serializer_for(ProductSchema, fields).dump(products, many=True)
+        if "brand" in expand:
+            await _expand_brands(products, rendered)
+        return await conditional_list(jsonify(rendered))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    except Exception as e:
+        logging.error("Error fetching recent products: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to fetch recent products"}), 500
+
+
+# 🔎 Search products
+async def search_products():
+    try:
+        params = search_params(request.args)
+        expand = _requested_expand()
+        query_params = {**params, "fields": expansion_fields(params["fields"], expand)}
+        if request.args.get("facets", "").lower() == "true":
+            total_cap = current_app.config.get("SEARCH_TOTAL_CAP")
+            data = await search_cache.get_or_compute_async(
+                {**query_params, "facets": True, "total_cap": total_cap},
+                lambda: AsyncProductModel.faceted_search(total_cap=total_cap, **query_params)
+            )
+        else:
+            data = await search_cache.get_or_compute_async(query_params, lambda: AsyncProductModel.search(**query_params))
+        payload = search_payload(data, params["fields"])
+        if "brand" in expand:
+            await _expand_brands(data["products"], payload["products"])
+        return await conditional_list(jsonify(payload))
+
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    except OperationFailure as e:
+        if not missing_text_index(e):
+            logging.error("Error searching products (q='%s'): %s", request.args.get('q', ''), e, exc_info=True)
+            return jsonify({"error": "Failed to search products"}), 500
+        logging.error("Text search without the product_text index (run `flask ensure-indexes`): %s", e)
+        return jsonify({"error": TEXT_INDEX_MISSING}), 503
+    except Exception as e:
+        logging.error("Error searching products (q='%s'): %s", request.args.get('q', ''), e, exc_info=True)
+        return jsonify({"error": "Failed to search products"}), 500
+
+
+# 🗂️ Get products by category
+async def get_products_by_category(category):
+    try:
+        fields = _requested_fields()
+        fmt = request.args.get("stream")
+        if fmt:
+            return _stream_listing({"category": category}, fields, fmt, category)
+
+        projection = projection_for(fields) if fields else None
+        products = await AsyncProductModel.category_products(category, projection=projection)
+        if not products:
+            return jsonify({"total": 0, "products": []}), 200
+        return await conditional_list(jsonify(serializer_for(ProductSchema, fields).dump(products, many=True)))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    except Exception as e:
+        logging.error("Error fetching category products ('%s'): %s", category, e, exc_info=True)
+        return jsonify({"error": "Failed to fetch category products"}), 500
+
+
+# 🏷️ Get products by brand
+async def get_products_by_brand(brand_id):
+    try:
+        fields = _requested_fields()
+        fmt = request.args.get("stream")
+        if fmt:
+            return _stream_listing({"brand_id": brand_id}, fields, fmt, brand_id)
+
+        projection = projection_for(fields) if fields else None
+        products = await AsyncProductModel.brand_products(brand_id, projection=projection)
+        if not products:
+            return jsonify({"total": 0, "products": []}), 200
+        return await conditional_list(jsonify(serializer_for(ProductSchema, fields).dump(products, many=True)))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    except Exception as e:
+        logging.error("Error fetching brand products (brand_id=%s): %s", brand_id, e, exc_info=True)
+        return jsonify({"error": "Failed to fetch brand products"}), 500
@@ -0,0 +1,213 @@
+from ...extensions import async_mongo, async_reads, product_cache
+from pymongo import DeleteMany
+from pymongo.errors import BulkWriteError
+from datetime import datetime
+from uuid import uuid4
+from .model import ProductModel, resolve_sort, utcnow_ms, PRE_IMAGE_PROJECTION
+from .stats import TRACKED_FIELDS, stats_writer
+from .async_stats import AsyncProductStats
+from .recent import recent_feed
+from .search_cache import search_cache
+
+
+# Async mirror of ProductModel for the ASGI app (app/asgi.py). Query building
+# and result shaping are ProductModel's own static helpers, so both apps run
+# the same queries and return the same shapes; only the I/O is awaited here.
+
+class AsyncProductModel:
+    @staticmethod
+    def get_collection():
+        return async_mongo.db.products
+
+    @staticmethod
+    def read_collection():
+        return async_reads.db.products
+
+    #  Create product
+    @staticmethod
+    async def create(data):
+        data["product_id"] = str(uuid4())
+        data["created_at"] = data["updated_at"] = utcnow_ms()
+        await AsyncProductModel.get_collection().insert_one(data)
+        stats_writer.record_insert([data])
+        recent_feed.product_created(data)
+        search_cache.products_changed(data)
+        return data
+
+    # Bulk insert for imports; see ProductModel.bulk_create
+    @staticmethod
+    async def bulk_create(docs, write_concern=None):
+        now = utcnow_ms()
+        for doc in docs:
+            doc["product_id"] = str(uuid4())
+            doc["created_at"] = now
+            doc["updated_at"] = now
+        try:
+            coll = AsyncProductModel.get_collection()
+            if write_concern is not None:
+                coll = coll.with_options(write_concern=write_concern)
+            result = await coll.insert_many(docs, ordered=False)
+            await AsyncProductStats.record_insert(docs)
+            recent_feed.product_changed()
+            search_cache.products_changed(*docs)
+            return len(result.inserted_ids), {}
+        except BulkWriteError as e:
+            errors = {err["index"]: err["errmsg"] for err in e.details.get("writeErrors", [])}
+            await AsyncProductStats.record_insert([doc for i, doc in enumerate(docs) if i not in errors])
+            recent_feed.product_changed()
+            search_cache.products_changed(*docs)
+            return e.details.get("nInserted", 0), errors
+
+    # Keyset page: range filter on the sort keys instead of skip
+    @staticmethod
+    async def keyset_page(filters, sort_spec, limit, cursor=None, projection=None):
+        filters = ProductModel.keyset_query(filters, sort_spec, cursor)
+        results = await AsyncProductModel.read_collection().find(filters, projection).sort(sort_spec).limit(limit + 1).to_list()
+        return ProductModel.keyset_result(results, sort_spec, limit)
+
+    # Get all products
+    @staticmethod
+    async def get_all(filters=None, skip=0, limit=10, sort=None, projection=None):
+        cursor = AsyncProductModel.read_collection().find(filters or {}, projection)
+        sort_spec = resolve_sort(sort)
+        if sort_spec:
+            cursor = cursor.sort(sort_spec)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list()
+
+    # Primary only when filling a shared cache (see ProductModel.detail_collection)
+    @staticmethod
+    def detail_collection():
+        return AsyncProductModel.get_collection() if product_cache.shared else AsyncProductModel.read_collection()
+
+    # Get product by ID
+    @staticmethod
+    async def get_by_id(product_id):
+        return await product_cache.get_or_load_async(
+            product_id,
+            lambda: AsyncProductModel.detail_collection().find_one({"product_id": product_id})
+        )
+
+    @staticmethod
+    async def get_by_ids(product_ids):
+        async def load(missing):
+            cursor = AsyncProductModel.detail_collection().find({"product_id": {"$in": missing}})
+            return {p["product_id"]: p async for p in cursor}
+        return await product_cache.get_or_load_many_async(product_ids, load)
+
+    # Update product
+    @staticmethod
+    async def update(product_id, update_data):
+        update_data["updated_at"] = datetime.utcnow()
+        # The pre-image tells the stats what changed; when the recent feed
+        # holds the product it is fetched whole, to patch the feed with
+        in_feed = recent_feed.contains(product_id)
+        before = await AsyncProductModel.get_collection().find_one_and_update(
+            {"product_id": product_id},
+            {"$set": update_data},
+            projection=None if in_feed else PRE_IMAGE_PROJECTION
+        )
+        await product_cache.invalidate_async(product_id)
+        if before is None:
+            return 0
+        after = {**before, **update_data}
+        if TRACKED_FIELDS & update_data.keys():
+            stats_writer.record_change(before, after)
+        recent_feed.product_updated(product_id, before.get("created_at"), after if in_feed else None)
+        search_cache.products_changed(before, after)
+        return 1
+
+    # Delete product
+    @staticmethod
+    async def delete(product_id):
+        before = await AsyncProductModel.get_collection().find_one_and_delete(
+            {"product_id": product_id},
+            projection=PRE_IMAGE_PROJECTION
+        )
+        await product_cache.invalidate_async(product_id)
+        if before is None:
+            return 0
+        stats_writer.record_change(before, None)
+        recent_feed.product_deleted(product_id, before.get("created_at"))
+        search_cache.products_changed(before)
+        return 1
+
+    # Bulk updates / deletes, same semantics as ProductModel
+    @staticmethod
+    async def bulk_update(operations):
+        requests = ProductModel.bulk_update_requests(operations)
+        scopes = await AsyncProductStats.scopes_matching([f for f, _, _ in operations], [u for _, u, _ in operations])
+        result = await AsyncProductModel._bulk_write(requests)
+        await product_cache.run_async(ProductModel._invalidate_matching, [filters for filters, _, _ in operations])
+        await AsyncProductStats.mark_dirty(scopes)
+        recent_feed.product_changed()
+        search_cache.scopes_changed(scopes)
+        return {"matched": result["nMatched"], "modified": result["nModified"], "errors": result["errors"]}
+
+    @staticmethod
+    async def bulk_delete(filters_list):
+        scopes = await AsyncProductStats.scopes_matching(filters_list)
+        result = await AsyncProductModel._bulk_write([DeleteMany(filters) for filters in filters_list])
+        await product_cache.run_async(ProductModel._invalidate_matching, filters_list)
+        await AsyncProductStats.mark_dirty(scopes)
+        recent_feed.product_changed()
+        search_cache.scopes_changed(scopes)
+        return {"deleted": result["nRemoved"], "errors": result["errors"]}
+
+    @staticmethod
+    async def _bulk_write(requests):
+        try:
+            result = await AsyncProductModel.get_collection().bulk_write(requests, ordered=False)
+            return ProductModel.bulk_summary(result.bulk_api_result)
+        except BulkWriteError as e:
+            return ProductModel.bulk_summary(e.details)
+
+    # Get by brand
+    @staticmethod
+    async def brand_products(brand_id, projection=None):
+        return await AsyncProductModel.read_collection().find({"brand_id": brand_id}, projection).to_list()
+
+    # Get by category
+    @staticmethod
+    async def category_products(category, projection=None):
+        return await AsyncProductModel.read_collection().find({"category": category}, projection).to_list()
+
+    # Search products with filters, pagination, sorting
+    @staticmethod
+    async def search(**params):
+        coll = AsyncProductModel.read_collection()
+        plan = ProductModel.search_plan(**params)
+        filters, sort_spec = plan["filters"], plan["sort_spec"]
+
+        total = await coll.count_documents(filters)
+
+        if plan["cursor"] is not None:
+            keyset = ProductModel.keyset_query(filters, sort_spec, plan["cursor"])
+            cursor = coll.find(keyset, plan["projection"]).sort(sort_spec).limit(plan["limit"] + 1)
+        else:
+            cursor = coll.find(filters, plan["projection"]).sort(sort_spec).skip(plan["skip"]).limit(plan["limit"])
+
+        return ProductModel.search_result(plan, total, await cursor.to_list())
+
+    # Faceted search: page, total and facet buckets in one aggregation
+    @staticmethod
+    async def faceted_search(total_cap=None, **params):
+        plan = ProductModel.search_plan(**params)
+        pipeline = ProductModel.faceted_pipeline(plan, total_cap)
+        cursor = await AsyncProductModel.read_collection().aggregate(pipeline)
+        results = await cursor.to_list(length=1)
+        return ProductModel.faceted_result(plan, results[0] if results else {}, total_cap)
+
+    # Async cursor over every match, fetched `batch_size` at a time
+    @staticmethod
+    def iter_products(filters, projection=None, batch_size=500):
+        return AsyncProductModel.read_collection().find(filters, projection, batch_size=batch_size)
+
+    # Get recent products
+    @staticmethod
+    async def get_recent(limit=5, projection=None):
+        cursor = AsyncProductModel.read_collection().find({}, projection).sort("created_at", -1).limit(limit)
+        return await cursor.to_list()
@@ -0,0 +1,79 @@
+from quart import Blueprint
+from .async_controller import (
+    create_product, bulk_import_products, bulk_update_products, bulk_delete_products, get_all_products,
+    get_product_by_id, get_products_batch, update_product, delete_product, get_recent_products,
+    search_products, get_products_by_category, get_products_by_brand, get_catalog_stats
+)
+
+# Same URLs as routes.py, served by the ASGI app (app/asgi.py)
+async_products_bp = Blueprint("products", __name__)
+
+
+@async_products_bp.route("/new", methods=["POST"])
+async def add_product():
+    return await create_product()
+
+
+@async_products_bp.route("/bulk", methods=["POST"])
+async def bulk_import():
+    return await bulk_import_products()
+
+
+@async_products_bp.route("/bulk/update", methods=["POST"])
+async def bulk_update():
+    return await bulk_update_products()
+
+
+@async_products_bp.route("/bulk/delete", methods=["POST"])
+async def bulk_delete():
+    return await bulk_delete_products()
+
+
+@async_products_bp.route("", methods=["GET"])
+async def get_products():
+    return await get_all_products()
+
+
+@async_products_bp.route("/batch", methods=["GET", "POST"])
+async def get_batch():
+    return await get_products_batch()
+
+
+@async_products_bp.route("/<product_id>", methods=["GET"])
+async def get_product(product_id):
+    return await get_product_by_id(product_id)
+
+
+@async_products_bp.route("/<product_id>", methods=["PUT", "PATCH"])
+async def update_details_of_product(product_id):
+    return await update_product(product_id)
+
+
+@async_products_bp.route("/<product_id>", methods=["DELETE"])
+async def delete(product_id):
+    return await delete_product(product_id)
+
+
+@async_products_bp.route("/brand/<brand_id>", methods=["GET"])
+async def brand_products(brand_id):
+    return await get_products_by_brand(brand_id)
+
+
+@async_products_bp.route("/category/<category>", methods=["GET"])
+async def product_by_category(category):
+    return await get_products_by_category(category)
+
+
+@async_products_bp.route("/search", methods=["GET"])
+async def search():
+    return await search_products()
+
+
+@async_products_bp.route("/recent", methods=["GET"])
+async def get_recent():
+    return await get_recent_products()
+
+
+@async_products_bp.route("/stats", methods=["GET"])
+async def stats():
+    return await get_catalog_stats()
@@ -0,0 +1,114 @@
+import logging
+from datetime import datetime
+from pymongo import UpdateOne, ReturnDocument
+from ...extensions import async_mongo, async_reads
+from .stats import (
+    COLLECTION, DIRTY_COLLECTION, SCOPES, insert_steps, settle, bounds_pipeline,
+    rebuild_pipeline, rebuild_requests, scopes_pipeline, scopes_of, stats_id,
+    scopes_of_docs, dirty_requests, dirty_scopes, clear_requests, stats_writer
+)
+
+# Async mirror of ProductStats for the ASGI app; the steps and pipelines are
+# the ones stats.py builds.
+
+
+class AsyncProductStats:
+    @staticmethod
+    def collection():
+        return async_mongo.db[COLLECTION]
+
+    @staticmethod
+    def read_collection():
+        return async_reads.db[COLLECTION]
+
+    @staticmethod
+    async def apply(steps):
+        coll = AsyncProductStats.collection()
+        plain = [UpdateOne(s["filter"], s["update"], upsert=s["upsert"]) for s in steps if s["check"] is None]
+        if plain:
+            await coll.bulk_write(plain, ordered=False)
+        for step in steps:
+            if step["check"] is None:
+                continue
+            doc = await coll.find_one_and_update(step["filter"], step["update"], return_document=ReturnDocument.AFTER)
+            action = settle(doc, step["check"])
+            if action == "delete":
+                await coll.delete_one({"_id": doc["_id"], "count": {"$lte": 0}})
+            elif action == "bounds":
+                field, key, _ = step["check"]
+                cursor = await async_mongo.db.products.aggregate(bounds_pipeline(field, key))
+                bounds = await cursor.to_list()
+                if bounds:
+                    await coll.update_one({"_id": doc["_id"]}, {"$set": {
+                        "min_price": bounds[0]["min_price"], "max_price": bounds[0]["max_price"]
+                    }})
+
+    @staticmethod
+    async def record(steps, docs):
+        try:
+            await AsyncProductStats.apply(steps)
+        except Exception as e:
+            logging.warning("Stats update failed, queued for rebuild: %s", e)
+            await AsyncProductStats.mark_dirty(scopes_of_docs(docs))
+
+    @staticmethod
+    async def record_insert(docs):
+        await AsyncProductStats.record(insert_steps(docs, datetime.utcnow()), docs)
+
+    # Drains stats_writer in the ASGI app (see StatsWriter)
+    @staticmethod
+    async def flush_queued():
+        queued = stats_writer.take()
+        if queued:
+            await AsyncProductStats.record(*queued)
+
+    @staticmethod
+    async def mark_dirty(scopes):
+        requests = dirty_requests(scopes, datetime.utcnow())
+        if not requests:
+            return
+        try:
+            await async_mongo.db[DIRTY_COLLECTION].bulk_write(requests, ordered=False)
+        except Exception as e:
+            logging.error("Could not queue stats rebuild (run `flask rebuild-stats`): %s", e)
+
+    @staticmethod
+    async def rebuild_dirty(limit=1000):
+        coll = async_mongo.db[DIRTY_COLLECTION]
+        marks = await coll.find({}).limit(limit).to_list()
+        if not marks:
+            return {}
+        summary = await AsyncProductStats.rebuild(dirty_scopes(marks))
+        await coll.bulk_write(clear_requests(marks), ordered=False)
+        return summary
+
+    @staticmethod
+    async def scopes_matching(filters_list, updates=()):
+        cursor = await async_mongo.db.products.aggregate(scopes_pipeline(filters_list))
+        result = await cursor.to_list()
+        return scopes_of(result[0] if result else None, updates)
+
+    @staticmethod
+    async def rebuild(scopes=None):
+        started = datetime.utcnow()
+        coll = AsyncProductStats.collection()
+        summary = {}
+        for scope, field in SCOPES.items():
+            keys = None if scopes is None else scopes.get(scope)
+            if keys is not None and not keys:
+                continue
+            cursor = await async_mongo.db.products.aggregate(rebuild_pipeline(field, keys))
+            results = await cursor.to_list()
+            summary[scope] = len(results)
+            requests = rebuild_requests(scope, results, keys, started)
+            if requests:
+                await coll.bulk_write(requests, ordered=False)
+        return summary
+
+    @staticmethod
+    async def get(scope, key):
+        return await AsyncProductStats.read_collection().find_one({"_id": stats_id(scope, key)})
+
+    @staticmethod
+    async def get_scope(scope):
+        return await AsyncProductStats.read_collection().find({"scope": scope}).to_list()
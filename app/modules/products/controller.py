@@ -1,12 +1,59 @@
 import logging
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from marshmallow import ValidationError
+from pymongo.errors import OperationFailure
 from datetime import datetime
 from .schema import ProductSchema
-from .model import ProductModel
+from ...pagination import with_tiebreaker
+from ...projection import parse_fields, projection_for
+from ...serializers import serializer_for
+from ...streaming import iter_json_records, stream_response, STREAM_FORMATS
+from ...http_cache import document_etag, last_modified, is_not_modified, not_modified_response, with_validators, conditional_list
+from ...db import ingest_write_concern
+from ...batch import parse_ids, in_order
+from .model import ProductModel, resolve_sort, DEFAULT_SORT, DEFAULT_SEARCH_MODE, missing_text_index
+from .stats import ProductStats, stats_view, totals_view
+from .recent import recent_feed
+from .search_cache import search_cache
+from .expand import parse_expand, expansion_fields, expansion_projection, expand_brands
 
 product_schema = ProductSchema()
 
+# Only what the listing view (_simplify) reads
+LIST_PROJECTION = {"_id": 0, "product_id": 1, "product_name": 1, "images": {"$slice": 1}, "stock": 1}
+
+
+# Default CSV export columns
+CSV_COLUMNS = ("product_id", "product_name", "brand_id", "category", "price", "stock", "images", "created_at", "updated_at")
+
+
+def _stream_listing(filters, fields, fmt, name):
+    """Chunked JSON array / NDJSON / CSV response for a product listing."""
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"stream must be one of: {', '.join(STREAM_FORMATS)}")
+    batch_size = current_app.config["STREAM_BATCH_SIZE"]
+    projection = projection_for(fields) if fields else None
+    docs = ProductModel.iter_products(filters, projection, batch_size=batch_size)
+    dump = serializer_for(ProductSchema, fields).dump
+    return stream_response(
+        docs,
+        dump,
+        fmt,
+        columns=fields or CSV_COLUMNS,
+        filename=f"products-{name}.csv" if fmt == "csv" else None,
+        batch_size=batch_size
+    )
+
+
+def _requested_fields():
+    """`?fields=` as a tuple of schema field names, or None."""
+    return parse_fields(request.args.get("fields"), ProductSchema)
+
+
+def _requested_expand():
+    """`?expand=` as a frozenset of expansion names."""
+    return parse_expand(request.args.get("expand"))
+
 
 # ➕ Create new product
 def create_product():
@@ -19,20 +66,221 @@ def create_product():
         validated_data = product_schema.load(data)
         product = ProductModel.create(validated_data)
 
-        logging.info(f"Product created successfully: {product.get('product_name')} (ID: {product.get('product_id')})")
+        logging.info("Product created successfully: %s (ID: %s)", product.get('product_name'), product.get('product_id'))
         return jsonify({
             "message": "Product created successfully",
-            "product": product_schema.dump(product)
+            "product": serializer_for(ProductSchema).dump(product)
         }), 201
 
     except ValidationError as err:
-        logging.warning(f"Validation error while creating product: {err.messages}")
+        logging.warning("Validation error while creating product: %s", err.messages)
         return jsonify({"errors": err.messages}), 400
     except Exception as e:
-        logging.error(f"Error creating product: {e}", exc_info=True)
+        logging.error("Error creating product: %s", e, exc_info=True)
         return jsonify({"error": "Failed to create product"}), 500
 
 
+# 📦 Bulk import (NDJSON or JSON array body, streamed)
+def bulk_import_products():
+    batch_size = current_app.config["BULK_BATCH_SIZE"]
+    max_reported = current_app.config["BULK_MAX_REPORTED_ERRORS"]
+    write_concern = ingest_write_concern(current_app.config)
+    report = {"received": 0, "inserted": 0, "rejected_count": 0, "rejected": []}
+
+    def reject(line, errors):
+        report["rejected_count"] += 1
+        if len(report["rejected"]) < max_reported:
+            report["rejected"].append({"line": line, "errors": errors})
+
+    def flush(batch):
+        inserted, failed = ProductModel.bulk_create([doc for _, doc in batch], write_concern)
+        report["inserted"] += inserted
+        for index, message in sorted(failed.items()):
+            reject(batch[index][0], message)
+
+    try:
+        batch = []
+        for line, record, error in iter_json_records(request.stream):
+            report["received"] += 1
+            if error:
+                reject(line, error)
+                continue
+            if not isinstance(record, dict):
+                reject(line, "Expected a JSON object")
+                continue
+            try:
+                batch.append((line, product_schema.load(record)))
+            except ValidationError as err:
+                reject(line, err.messages)
+                continue
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+        report["truncated"] = report["rejected_count"] > len(report["rejected"])
+        logging.info("Bulk import finished: %s inserted, %s rejected", report['inserted'], report['rejected_count'])
+        return jsonify(report), 200
+
+    except Exception as e:
+        logging.error("Error during bulk import: %s", e, exc_info=True)
+        report["error"] = "Bulk import aborted"
+        return jsonify(report), 500
+
+
+# Keys a bulk "filter" may use (same meaning as the search filters)
+BULK_FILTER_KEYS = {"product_ids", "brand_id", "category", "min_price", "max_price", "in_stock"}
+# Fields bulk "multiply" / "inc" may touch
+BULK_NUMERIC_FIELDS = {"price", "stock"}
+
+
+def _bulk_target(op):
+    """(filters, many) for one bulk operation: a product_id or a filter."""
+    if "product_id" in op:
+        return {"product_id": str(op["product_id"])}, False
+
+    spec = op.get("filter")
+    if not isinstance(spec, dict) or not spec:
+        raise ValueError("Each operation needs a product_id or a non-empty filter")
+    unknown = set(spec) - BULK_FILTER_KEYS
+    if unknown:
+        raise ValueError(f"Unsupported filter keys: {', '.join(sorted(unknown))}")
+
+    category = spec.get("category")
+    filters = ProductModel.search_filters(
+        # Stored categories are capitalized by ProductSchema
+        category=category.capitalize() if isinstance(category, str) else category,
+        brand_id=spec.get("brand_id"),
+        min_price=spec.get("min_price"),
+        max_price=spec.get("max_price"),
+        in_stock=spec.get("in_stock")
+    )
+    if "product_ids" in spec:
+        if not isinstance(spec["product_ids"], list) or not spec["product_ids"]:
+            raise ValueError("product_ids must be a non-empty list")
+        filters["product_id"] = {"$in": [str(i) for i in spec["product_ids"]]}
+    if not filters:
+        raise ValueError("Filter matches every product")
+    return filters, True
+
+
+def _bulk_update_doc(op):
+    """Mongo update from an operation's set / multiply / inc parts."""
+    update = {}
+    if "set" in op:
+        # Same validation as PUT /api/products/<id>
+        validated = product_schema.load(op["set"], partial=True)
+        if validated:
+            update["$set"] = validated
+    for key, operator in (("multiply", "$mul"), ("inc", "$inc")):
+        if key not in op:
+            continue
+        values = op[key]
+        if not isinstance(values, dict) or set(values) - BULK_NUMERIC_FIELDS:
+            raise ValueError(f"'{key}' only supports {', '.join(sorted(BULK_NUMERIC_FIELDS))}")
+        for field, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"'{key}.{field}' must be a number")
+            if field in update.get("$set", {}) or any(field in update.get(o, {}) for o in ("$mul", "$inc")):
+                raise ValueError(f"'{field}' is changed twice in one operation")
+        update[operator] = dict(values)
+    if not update:
+        raise ValueError("Each operation needs 'set', 'multiply' or 'inc'")
+    return update
+
+
+def bulk_operations(data, max_operations):
+    """Operations list from a bulk request body, or raise ValueError."""
+    operations = (data or {}).get("operations") if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("'operations' must be a non-empty list")
+    if len(operations) > max_operations:
+        raise ValueError(f"At most {max_operations} operations per request")
+    return operations
+
+
+def parse_bulk_updates(operations):
+    """Validate every update operation; returns (parsed, errors by index)."""
+    parsed, errors = [], {}
+    for index, op in enumerate(operations):
+        try:
+            if not isinstance(op, dict):
+                raise ValueError("Operation must be an object")
+            filters, many = _bulk_target(op)
+            parsed.append((filters, _bulk_update_doc(op), many))
+        except ValidationError as err:
+            errors[index] = err.messages
+        except ValueError as err:
+            errors[index] = str(err)
+    return parsed, errors
+
+
+def parse_bulk_deletes(operations):
+    """Validate every delete operation; returns (filters list, errors by index)."""
+    filters_list, errors = [], {}
+    for index, op in enumerate(operations):
+        try:
+            if not isinstance(op, dict):
+                raise ValueError("Operation must be an object")
+            filters_list.append(_bulk_target(op)[0])
+        except ValueError as err:
+            errors[index] = str(err)
+    return filters_list, errors
+
+
+# 🔁 Bulk update (per-product patches or filter-based updates)
+def bulk_update_products():
+    try:
+        operations = bulk_operations(request.get_json(silent=True), current_app.config["BULK_MAX_OPERATIONS"])
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    # Validate everything first so a bad operation writes nothing
+    parsed, errors = parse_bulk_updates(operations)
+    if errors:
+        logging.warning("Bulk update rejected: %s invalid operations", len(errors))
+        return jsonify({"errors": errors}), 400
+
+    try:
+        result = ProductModel.bulk_update(parsed)
+        logging.info("Bulk update: %s operations, matched=%s, modified=%s", len(parsed), result['matched'], result['modified'])
+        return jsonify(result), 200
+    except Exception as e:
+        logging.error("Error during bulk update: %s", e, exc_info=True)
+        return jsonify({"error": "Bulk update failed"}), 500
+
+
+# 🗑️ Bulk delete (product ids and/or filters)
+def bulk_delete_products():
+    try:
+        operations = bulk_operations(request.get_json(silent=True), current_app.config["BULK_MAX_OPERATIONS"])
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    filters_list, errors = parse_bulk_deletes(operations)
+    if errors:
+        logging.warning("Bulk delete rejected: %s invalid operations", len(errors))
+        return jsonify({"errors": errors}), 400
+
+    try:
+        result = ProductModel.bulk_delete(filters_list)
+        logging.info("Bulk delete: %s operations, deleted=%s", len(filters_list), result['deleted'])
+        return jsonify(result), 200
+    except Exception as e:
+        logging.error("Error during bulk delete: %s", e, exc_info=True)
+        return jsonify({"error": "Bulk delete failed"}), 500
+
+
+def _simplify(p):
+    return {
+        "product_id": p["product_id"],
+        "product_name": p["product_name"],
+        "product_image": p.get("images", [None])[0],
+        "stock": p.get("stock", 0)
+    }
+
+
 # 📜 Get all products
 def get_all_products():
     try:
@@ -40,53 +288,121 @@ def get_all_products():
         limit = int(request.args.get("limit", 10))
         sort = request.args.get("sort")
         skip = (page - 1) * limit
-
-        products = ProductModel.get_all(skip=skip, limit=limit, sort=sort)
+        fields = _requested_fields()
+        expand = _requested_expand()
+
+        # ?fields= dumps the chosen schema fields instead of the listing view
+        def render(products):
+            if fields:
+                rendered = serializer_for(ProductSchema, fields).dump(products, many=True)
+            else:
+                rendered = [_simplify(p) for p in products]
+            # ?expand=brand: one $in query for the page's brands
+            if "brand" in expand:
+                expand_brands(products, rendered)
+            return rendered
+
+        # Cursor mode (?cursor= for the first page, then ?cursor=<next_cursor>)
+        cursor = request.args.get("cursor")
+        if cursor is not None:
+            # Projections must keep every sort key, tiebreaker included
+            sort_spec = with_tiebreaker(resolve_sort(sort, DEFAULT_SORT), "product_id")
+            if fields:
+                projection = projection_for(fields, sort_spec)
+            else:
+                projection = {**LIST_PROJECTION, **{key: 1 for key, _ in sort_spec}}
+            projection = expansion_projection(projection, expand)
+            products, next_cursor = ProductModel.keyset_page({}, sort_spec, max(1, min(100, limit)), cursor, projection)
+            logging.info("Fetched %s products by cursor (limit=%s)", len(products), limit)
+            return conditional_list(jsonify({
+                "products": render(products),
+                "next_cursor": next_cursor
+            }))
+
+        projection = expansion_projection(projection_for(fields) if fields else LIST_PROJECTION, expand)
+        products = ProductModel.get_all(skip=skip, limit=limit, sort=sort, projection=projection)
 
         if not products:
-            logging.info(f"No products found (page={page}, limit={limit})")
+            logging.info("No products found (page=%s, limit=%s)", page, limit)
             return jsonify({"total": 0, "products": []}), 200
 
-        logging.info(f"Fetched {len(products)} products (page={page}, limit={limit})")
+        logging.info("Fetched %s products (page=%s, limit=%s)", len(products), page, limit)
 
-        simplified_products = [
-            {
-                "product_id": p["product_id"],
-                "product_name": p["product_name"],
-                "product_image": p.get("images", [None])[0],
-                "stock": p.get("stock", 0)
-            }
-            for p in products
-        ]
-        return jsonify(simplified_products), 200
+        return conditional_list(jsonify(render(products)))
 
+    except ValueError as err:
+        logging.warning("Invalid listing parameters: %s", err)
+        return jsonify({"error": str(err)}), 400
     except Exception as e:
-        logging.error(f"Error fetching all products: {e}", exc_info=True)
+        logging.error("Error fetching all products: %s", e, exc_info=True)
         return jsonify({"error": "Failed to fetch products"}), 500
 
 
 # 🔍 Get product by ID
 def get_product_by_id(product_id):
     try:
+        fields = _requested_fields()
+        expand = _requested_expand()
         product = ProductModel.get_by_id(product_id)
         if not product:
-            logging.warning(f"Product not found (ID: {product_id})")
+            logging.warning("Product not found (ID: %s)", product_id)
             return jsonify({"error": "Product not found"}), 404
 
-        logging.info(f"Fetched product successfully (ID: {product_id})")
-        return jsonify(product_schema.dump(product)), 200
-
+        # Validators come from updated_at, so a 304 skips the dump
+        etag = document_etag(product, "product_id", fields)
+        modified = last_modified(product)
+        brand = None
+        if "brand" in expand:
+            # The brand can change without the product's updated_at moving:
+            # fold its summary into the ETag and drop Last-Modified
+            brand = expand_brands([product], [{}])[0]["brand"]
+            etag = document_etag(product, "product_id", fields, "brand", brand)
+            modified = None
+        if is_not_modified(etag, modified):
+            return not_modified_response(etag, modified)
+
+        logging.info("Fetched product successfully (ID: %s)", product_id)
+        body = serializer_for(ProductSchema, fields).dump(product)
+        if "brand" in expand:
+            body["brand"] = brand
+        return with_validators(jsonify(body), etag, modified)
+
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
     except Exception as e:
-        logging.error(f"Error fetching product by ID ({product_id}): {e}", exc_info=True)
+        logging.error("Error fetching product by ID (%s): %s", product_id, e, exc_info=True)
         return jsonify({"error": "Failed to fetch product"}), 500
 
 
+# 📦 Get several products by ID (?ids=a,b,c or POST {"ids": [...]})
+def get_products_batch():
+    try:
+        fields = _requested_fields()
+        expand = _requested_expand()
+        body = request.get_json(silent=True) if request.method == "POST" else None
+        ids = parse_ids(request.args.get("ids"), body, current_app.config["BATCH_MAX_IDS"])
+        products, missing = in_order(ids, ProductModel.get_by_ids(ids))
+
+        # Same dump as the detail route
+        rendered = serializer_for(ProductSchema, fields).dump(products, many=True)
+        if "brand" in expand:
+            expand_brands(products, rendered)
+        logging.info("Fetched %s of %s products by ID", len(products), len(ids))
+        return conditional_list(jsonify({"products": rendered, "missing": missing}))
+
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    except Exception as e:
+        logging.error("Error fetching products by ID: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to fetch products"}), 500
+
+
 # ✏️ Update product
 def update_product(product_id):
     try:
         data = request.get_json()
         if not data:
-            logging.warning(f"No data provided for update (product_id={product_id})")
+            logging.warning("No data provided for update (product_id=%s)", product_id)
             return jsonify({"error": "No data provided"}), 400
 
         validated_data = product_schema.load(data, partial=True)
@@ -94,17 +410,17 @@ def update_product(product_id):
 
         updated = ProductModel.update(product_id, validated_data)
         if updated == 0:
-            logging.warning(f"Attempted to update non-existent product (ID: {product_id})")
+            logging.warning("Attempted to update non-existent product (ID: %s)", product_id)
             return jsonify({"error": "Product not found"}), 404
 
-        logging.info(f"Product updated successfully (ID: {product_id})")
+        logging.info("Product updated successfully (ID: %s)", product_id)
         return jsonify({"message": "Product updated successfully"}), 200
 
     except ValidationError as err:
-        logging.warning(f"Validation error while updating product {product_id}: {err.messages}")
+        logging.warning("Validation error while updating product %s: %s", product_id, err.messages)
         return jsonify({"errors": err.messages}), 400
     except Exception as e:
-        logging.error(f"Error updating product (ID: {product_id}): {e}", exc_info=True)
+        logging.error("Error updating product (ID: %s): %s", product_id, e, exc_info=True)
         return jsonify({"error": "Failed to update product"}), 500
 
 
@@ -113,98 +429,190 @@ def delete_product(product_id):
     try:
         deleted = ProductModel.delete(product_id)
         if deleted == 0:
-            logging.warning(f"Attempted to delete non-existent product (ID: {product_id})")
+            logging.warning("Attempted to delete non-existent product (ID: %s)", product_id)
             return jsonify({"error": "Product not found"}), 404
 
-        logging.info(f"Product deleted successfully (ID: {product_id})")
+        logging.info("Product deleted successfully (ID: %s)", product_id)
         return jsonify({"message": "Product deleted successfully"}), 200
     except Exception as e:
-        logging.error(f"Error deleting product (ID: {product_id}): {e}", exc_info=True)
+        logging.error("Error deleting product (ID: %s): %s", product_id, e, exc_info=True)
         return jsonify({"error": "Failed to delete product"}), 500
 
 
+# 📊 Catalog stats per category, plus totals
+def get_catalog_stats():
+    try:
+        categories = ProductStats.get_scope("category")
+        return jsonify({
+            "totals": totals_view(categories),
+            "categories": {doc["key"]: stats_view(doc) for doc in sorted(categories, key=lambda d: d["key"])}
+        }), 200
+    except Exception as e:
+        logging.error("Error fetching catalog stats: %s", e, exc_info=True)
+        return jsonify({"error": "Failed to fetch catalog stats"}), 500
+
+
+def _encode(value):
+    """Response bytes for `value`, exactly as jsonify would produce them."""
+    return current_app.json.response(value).get_data()
+
+
+def _cached_response(body, etag):
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag, weak=True)
+    return response.make_conditional(request)
+
+
 # 🕒 Get recent products
 def get_recent_products():
     try:
         limit = int(request.args.get("limit", 5))
-        products = ProductModel.get_recent(limit=limit)
+        fields = _requested_fields()
+        expand = _requested_expand()
+
+        # Default view: pre-encoded body from the in-memory feed
+        if not fields and not expand:
+            cached = recent_feed.page(limit, _encode)
+            if cached is not None:
+                return _cached_response(*cached)
+
+        projection = projection_for(expansion_fields(fields, expand)) if fields else None
+        products = ProductModel.get_recent(limit=limit, projection=projection)
         if not products:
             logging.info("No recent products found.")
             return jsonify({"total": 0, "products": []}), 200
 
-        logging.info(f"Fetched {len(products)} recent products (limit={limit})")
-        return jsonify(product_schema.dump(products, many=True)), 200
+        logging.info("Fetched %s recent products (limit=%s)", len(products), limit)
+        rendered = serializer_for(ProductSchema, fields).dump(products, many=True)
+        if "brand" in expand:
+            expand_brands(products, rendered)
+        return conditional_list(jsonify(rendered))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
     except Exception as e:
-        logging.error(f"Error fetching recent products: {e}", exc_info=True)
+        logging.error("Error fetching recent products: %s", e, exc_info=True)
         return jsonify({"error": "Failed to fetch recent products"}), 500
 
 
+def search_params(args):
+    """Keyword arguments for ProductModel.search from the query string."""
+    in_stock = args.get("in_stock")
+    return dict(
+        query=args.get("q", "").strip(),
+        page=int(args.get("page", 1)),
+        limit=int(args.get("limit", 10)),
+        sort=args.get("sort", "newest"),
+        category=args.get("category"),
+        brand_id=args.get("brand_id"),
+        min_price=args.get("min_price"),
+        max_price=args.get("max_price"),
+        in_stock=in_stock.lower() == "true" if in_stock else None,
+        cursor=args.get("cursor"),
+        mode=args.get("mode", DEFAULT_SEARCH_MODE),
+        fields=parse_fields(args.get("fields"), ProductSchema)
+    )
+
+
+def search_payload(data, fields=None):
+    """Search response body from a ProductModel.search / faceted_search result."""
+    response = {
+        "total": data["total"],
+        "page": data["page"],
+        "limit": data["limit"],
+        "total_pages": data["total_pages"],
+        "next_cursor": data["next_cursor"],
+        "products": serializer_for(ProductSchema, fields).dump(data["products"], many=True)
+    }
+    if "facets" in data:
+        response["total_capped"] = data["total_capped"]
+        response["facets"] = data["facets"]
+    return response
+
+
+TEXT_INDEX_MISSING = "Text search is unavailable until the product_text index exists; use mode=regex"
+
+
 # 🔎 Search products
 def search_products():
     try:
-        query = request.args.get("q", "").strip()
-        page = int(request.args.get("page", 1))
-        limit = int(request.args.get("limit", 10))
-        sort = request.args.get("sort", "newest")
-        category = request.args.get("category")
-        brand_id = request.args.get("brand_id")
-        min_price = request.args.get("min_price")
-        max_price = request.args.get("max_price")
-        in_stock = request.args.get("in_stock")
-
-        in_stock = in_stock.lower() == "true" if in_stock else None
-
-        data = ProductModel.search(
-            query=query,
-            page=page,
-            limit=limit,
-            sort=sort,
-            category=category,
-            brand_id=brand_id,
-            min_price=min_price,
-            max_price=max_price,
-            in_stock=in_stock
-        )
-
-        logging.info(f"Search query executed (q='{query}', total={data['total']})")
-        return jsonify({
-            "total": data["total"],
-            "page": data["page"],
-            "limit": data["limit"],
-            "total_pages": data["total_pages"],
-            "products": product_schema.dump(data["products"], many=True)
-        }), 200
-
+        params = search_params(request.args)
+        query = params["query"]
+        expand = _requested_expand()
+        query_params = {**params, "fields": expansion_fields(params["fields"], expand)}
+
+        # ?facets=true: page, total and sidebar facets from one aggregation
+        if request.args.get("facets", "").lower() == "true":
+            total_cap = current_app.config.get("SEARCH_TOTAL_CAP")
+            data = search_cache.get_or_compute(
+                {**query_params, "facets": True, "total_cap": total_cap},
+                lambda: ProductModel.faceted_search(total_cap=total_cap, **query_params)
+            )
+        else:
+            data = search_cache.get_or_compute(query_params, lambda: ProductModel.search(**query_params))
+
+        logging.info("Search query executed (q='%s', total=%s)", query, data['total'])
+        payload = search_payload(data, params["fields"])
+        if "brand" in expand:
+            expand_brands(data["products"], payload["products"])
+        return conditional_list(jsonify(payload))
+
+    except ValueError as err:
+        logging.warning("Invalid search parameters: %s", err)
+        return jsonify({"error": str(err)}), 400
+    except OperationFailure as e:
+        if not missing_text_index(e):
+            logging.error("Error searching products (q='%s'): %s", request.args.get('q', ''), e, exc_info=True)
+            return jsonify({"error": "Failed to search products"}), 500
+        logging.error("Text search without the product_text index (run `flask ensure-indexes`): %s", e)
+        return jsonify({"error": TEXT_INDEX_MISSING}), 503
     except Exception as e:
-        logging.error(f"Error searching products (q='{request.args.get('q', '')}'): {e}", exc_info=True)
+        logging.error("Error searching products (q='%s'): %s", request.args.get('q', ''), e, exc_info=True)
         return jsonify({"error": "Failed to search products"}), 500
 
 
 # 🗂️ Get products by category
 def get_products_by_category(category):
     try:
-        products = ProductModel.category_products(category)
+        fields = _requested_fields()
+        fmt = request.args.get("stream")
+        if fmt:
+            logging.info("Streaming products for category '%s' as %s", category, fmt)
+            return _stream_listing({"category": category}, fields, fmt, category)
+
+        projection = projection_for(fields) if fields else None
+        products = ProductModel.category_products(category, projection=projection)
         if not products:
-            logging.info(f"No products found for category '{category}'")
+            logging.info("No products found for category '%s'", category)
             return jsonify({"total": 0, "products": []}), 200
 
-        logging.info(f"Fetched {len(products)} products for category '{category}'")
-        return jsonify(product_schema.dump(products, many=True)), 200
+        logging.info("Fetched %s products for category '%s'", len(products), category)
+        return conditional_list(jsonify(serializer_for(ProductSchema, fields).dump(products, many=True)))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
     except Exception as e:
-        logging.error(f"Error fetching category products ('{category}'): {e}", exc_info=True)
+        logging.error("Error fetching category products ('%s'): %s", category, e, exc_info=True)
         return jsonify({"error": "Failed to fetch category products"}), 500
 
 
 # 🏷️ Get products by brand
 def get_products_by_brand(brand_id):
     try:
-        products = ProductModel.brand_products(brand_id)
+        fields = _requested_fields()
+        fmt = request.args.get("stream")
+        if fmt:
+            logging.info("Streaming products for brand '%s' as %s", brand_id, fmt)
+            return _stream_listing({"brand_id": brand_id}, fields, fmt, brand_id)
+
+        projection = projection_for(fields) if fields else None
+        products = ProductModel.brand_products(brand_id, projection=projection)
         if not products:
-            logging.info(f"No products found for brand '{brand_id}'")
+            logging.info("No products found for brand '%s'", brand_id)
             return jsonify({"total": 0, "products": []}), 200
 
-        logging.info(f"Fetched {len(products)} products for brand '{brand_id}'")
-        return jsonify(product_schema.dump(products, many=True)), 200
+        logging.info("Fetched %s products for brand '%s'", len(products), brand_id)
+        return conditional_list(jsonify(serializer_for(ProductSchema, fields).dump(products, many=True)))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
     except Exception as e:
-        logging.error(f"Error fetching brand products (brand_id={brand_id}): {e}", exc_info=True)
+        logging.error("Error fetching brand products (brand_id=%s): %s", brand_id, e, exc_info=True)
         return jsonify({"error": "Failed to fetch brand products"}), 500
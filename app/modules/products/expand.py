@@ -0,0 +1,64 @@
+from ..brands.controller import brand_summary
+from ..brands.model import BrandModel, SUMMARY_PROJECTION
+
+
+# `?expand=brand` on product responses: each product gets a "brand" object
+# with the brand listing's summary. The brand ids of a whole page are resolved
+# with one $in query, and summaries are memoized on `g` for the rest of the
+# request, so a brand is fetched at most once per request.
+
+EXPANSIONS = ("brand",)
+
+
+def parse_expand(raw):
+    """Requested expansions as a frozenset. Raises ValueError for unknown names."""
+    if raw is None:
+        return frozenset()
+    names = frozenset(name.strip() for name in raw.split(",") if name.strip())
+    unknown = names - set(EXPANSIONS)
+    if unknown:
+        raise ValueError(f"expand must be one of: {', '.join(EXPANSIONS)}")
+    return names
+
+
+def expansion_fields(fields, expand):
+    """`fields` plus the keys the expansions read (the dump still uses `fields`)."""
+    if fields and "brand" in expand and "brand_id" not in fields:
+        return fields + ("brand_id",)
+    return fields
+
+
+def expansion_projection(projection, expand):
+    """Inclusion `projection` plus the keys the expansions read."""
+    if projection and "brand" in expand:
+        return {**projection, "brand_id": 1}
+    return projection
+
+
+def missing_brand_ids(products, memo):
+    return {p["brand_id"] for p in products if p.get("brand_id") is not None} - memo.keys()
+
+
+def remember(memo, brand_ids, brands):
+    """Store summaries for `brands`; ids with no brand are remembered as None."""
+    for b in brands:
+        memo[b["brand_id"]] = brand_summary(b)
+    for brand_id in brand_ids:
+        memo.setdefault(brand_id, None)
+
+
+def embed_brands(rendered, products, memo):
+    """Set "brand" on each rendered product from its source document."""
+    for out, product in zip(rendered, products):
+        out["brand"] = memo.get(product.get("brand_id"))
+    return rendered
+
+
+def expand_brands(products, rendered):
+    """Embed brand summaries into `rendered` (parallel to `products`)."""
+    from flask import g
+    memo = g.setdefault("brand_summaries", {})
+    missing = missing_brand_ids(products, memo)
+    if missing:
+        remember(memo, missing, BrandModel.get_many(missing, SUMMARY_PROJECTION))
+    return embed_brands(rendered, products, memo)
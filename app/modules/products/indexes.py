@@ -0,0 +1,34 @@
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
+
+# Indexes the products collection is expected to have. `create_app` reconciles
+# this list on startup (see app/indexes.py); name every index so it can be
+# matched against what is already on the server.
+PRODUCT_INDEXES = [
+    # get_by_id / update / delete, and the keyset tiebreaker
+    IndexModel([("product_id", ASCENDING)], name="product_id_unique", unique=True),
+
+    # brand_products, category_products and the brand/category search filters
+    IndexModel([("brand_id", ASCENDING), ("created_at", DESCENDING)], name="brand_id_created_at"),
+    IndexModel([("category", ASCENDING), ("created_at", DESCENDING)], name="category_created_at"),
+
+    # Sort orders from SORT_MAP with product_id as tiebreaker (get_recent,
+    # newest/oldest, price_*, name_* and cursor pagination)
+    IndexModel([("created_at", DESCENDING), ("product_id", DESCENDING)], name="created_at_product_id"),
+    IndexModel([("price", ASCENDING), ("product_id", ASCENDING)], name="price_product_id"),
+    IndexModel([("product_name", ASCENDING), ("product_id", ASCENDING)], name="product_name_product_id"),
+
+    # Backs `$text` keyword search; the weights rank name matches above the rest
+    IndexModel(
+        [("product_name", TEXT), ("description", TEXT), ("category", TEXT)],
+        name="product_text",
+        weights={"product_name": 10, "category": 5, "description": 1},
+        default_language="english",
+        language_override="search_language",
+    ),
+]
+
+# catalog_stats (stats.py): documents are fetched by _id; the category listing
+# and rebuilds select by scope
+STATS_INDEXES = [
+    IndexModel([("scope", ASCENDING), ("key", ASCENDING)], name="scope_key"),
+]
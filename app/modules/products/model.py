@@ -1,91 +1,344 @@
-from ...extensions import mongo
+import re
+from pymongo import UpdateOne, UpdateMany, DeleteMany
+from pymongo.errors import BulkWriteError
+from ...extensions import mongo, mongo_reads, product_cache
+from ...projection import projection_for
+from ...pagination import with_tiebreaker, encode_cursor, decode_cursor, keyset_filter, merge_filters
 from datetime import datetime
 from uuid import uuid4
+from .stats import ProductStats, TRACKED_FIELDS, stats_writer
+from .recent import recent_feed
+from .search_cache import search_cache
 
 
+SORT_MAP = {
+    "price_asc": [("price", 1)],
+    "price_desc": [("price", -1)],
+    "newest": [("created_at", -1)],
+    "oldest": [("created_at", 1)],
+    "name_asc": [("product_name", 1)],
+    "name_desc": [("product_name", -1)]
+}
+DEFAULT_SORT = [("created_at", -1)]
+
+# `sort=relevance` orders text search hits by their text score
+RELEVANCE = "relevance"
+TEXT_SCORE = {"$meta": "textScore"}
+
+# Keyword search mode when none is given. `text` needs the product_text index
+# (a server error otherwise), `regex` works on any deployment.
+DEFAULT_SEARCH_MODE = "regex"
+
+
+def missing_text_index(err):
+    """Whether an OperationFailure is a `$text` query without a text index."""
+    return err.code == 27 or "text index required" in str(err)
+
+# Facet settings for faceted search: price bucket lower bounds (the last one
+# is open ended) and how many brands to report
+PRICE_BUCKETS = [0, 500, 1000, 2000, 5000, 10000, 50000]
+FACET_LIMIT = 20
+
+
+def utcnow_ms():
+    """Current UTC time at the millisecond precision MongoDB stores, so a
+    document returned without a read-back matches what is in the database."""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def resolve_sort(sort, default=None):
+    """Turn a comma separated list of SORT_MAP keys into a Mongo sort spec."""
+    sort_spec = []
+    for s in str(sort or "").split(","):
+        s = s.strip()
+        if s in SORT_MAP:
+            sort_spec.extend(SORT_MAP[s])
+    return sort_spec or list(default or [])
+
+
+# Fields ProductStats needs from a product's pre-image
+STATS_PROJECTION = {"_id": 0, **{field: 1 for field in TRACKED_FIELDS}}
+# Pre-image of single updates/deletes: the stats fields, plus created_at so
+# the recent feed can tell whether the product may be in its window
+PRE_IMAGE_PROJECTION = {**STATS_PROJECTION, "created_at": 1}
+
 class ProductModel:
     @staticmethod
     def get_collection():
         return mongo.db.products
 
+    # Same collection for read-only queries; may be served by a secondary
+    @staticmethod
+    def read_collection():
+        return mongo_reads.db.products
+
     #  Create product
     @staticmethod
     def create(data):
         data["product_id"] = str(uuid4())
-        data["created_at"] = datetime.utcnow()
-        data["updated_at"] = datetime.utcnow()
-        coll = ProductModel.get_collection()
-        coll.insert_one(data)
-        return ProductModel.get_by_id(data["product_id"])
+        data["created_at"] = data["updated_at"] = utcnow_ms()
+        # insert_one sets data["_id"]; the stored document is exactly `data`,
+        # so there is nothing to read back
+        ProductModel.get_collection().insert_one(data)
+        stats_writer.record_insert([data])
+        recent_feed.product_created(data)
+        search_cache.products_changed(data)
+        return data
+
+    # Bulk insert for imports; no read-back, duplicates don't stop the batch
+    @staticmethod
+    def bulk_create(docs, write_concern=None):
+        """Insert already validated documents with one unordered insert_many.
+
+        `write_concern` overrides the client's for this batch (see
+        INGEST_WRITE_CONCERN). Returns (inserted_count, {index in docs: error message}).
+        """
+        now = utcnow_ms()
+        for doc in docs:
+            doc["product_id"] = str(uuid4())
+            doc["created_at"] = now
+            doc["updated_at"] = now
+        try:
+            coll = ProductModel.get_collection()
+            if write_concern is not None:
+                coll = coll.with_options(write_concern=write_concern)
+            result = coll.insert_many(docs, ordered=False)
+            ProductStats.record_insert(docs)
+            recent_feed.product_changed()
+            search_cache.products_changed(*docs)
+            return len(result.inserted_ids), {}
+        except BulkWriteError as e:
+            errors = {err["index"]: err["errmsg"] for err in e.details.get("writeErrors", [])}
+            ProductStats.record_insert([doc for i, doc in enumerate(docs) if i not in errors])
+            recent_feed.product_changed()
+            search_cache.products_changed(*docs)
+            return e.details.get("nInserted", 0), errors
+
+    # Bulk updates: one unordered bulk_write round-trip for the whole batch
+    @staticmethod
+    def bulk_update(operations):
+        """Apply (filters, update, many) triples; updated_at is set on each.
+
+        Returns {"matched", "modified", "errors"}.
+        """
+        requests = ProductModel.bulk_update_requests(operations)
+        # Which brands/categories the batch can touch isn't known from the
+        # filters alone: read them first and queue their stats for the
+        # background rebuild (stats_rebuilder) once the batch is written
+        scopes = ProductStats.scopes_matching([f for f, _, _ in operations], [u for _, u, _ in operations])
+        result = ProductModel._bulk_write(requests)
+        ProductModel._invalidate_matching([filters for filters, _, _ in operations])
+        ProductStats.mark_dirty(scopes)
+        recent_feed.product_changed()
+        search_cache.scopes_changed(scopes)
+        return {"matched": result["nMatched"], "modified": result["nModified"], "errors": result["errors"]}
+
+    # Bulk deletes by product id list or filter
+    @staticmethod
+    def bulk_delete(filters_list):
+        requests = [DeleteMany(filters) for filters in filters_list]
+        scopes = ProductStats.scopes_matching(filters_list)
+        result = ProductModel._bulk_write(requests)
+        ProductModel._invalidate_matching(filters_list)
+        ProductStats.mark_dirty(scopes)
+        recent_feed.product_changed()
+        search_cache.scopes_changed(scopes)
+        return {"deleted": result["nRemoved"], "errors": result["errors"]}
+
+    @staticmethod
+    def bulk_update_requests(operations):
+        now = datetime.utcnow()
+        requests = []
+        for filters, update, many in operations:
+            update = {**update, "$set": {**update.get("$set", {}), "updated_at": now}}
+            requests.append(UpdateMany(filters, update) if many else UpdateOne(filters, update))
+        return requests
+
+    @staticmethod
+    def _bulk_write(requests):
+        try:
+            result = ProductModel.get_collection().bulk_write(requests, ordered=False)
+            return ProductModel.bulk_summary(result.bulk_api_result)
+        except BulkWriteError as e:
+            return ProductModel.bulk_summary(e.details)
+
+    # Counts and per-operation errors from a bulk_write result document
+    @staticmethod
+    def bulk_summary(details):
+        return {
+            "nMatched": details.get("nMatched", 0),
+            "nModified": details.get("nModified", 0),
+            "nRemoved": details.get("nRemoved", 0),
+            "errors": [{"index": err["index"], "error": err["errmsg"]} for err in details.get("writeErrors", [])]
+        }
+
+    # Drop cached details touched by a bulk operation
+    @staticmethod
+    def _invalidate_matching(filters_list):
+        ids = []
+        for filters in filters_list:
+            product_id = filters.get("product_id")
+            if isinstance(product_id, str):
+                ids.append(product_id)
+            elif set(product_id or {}) == {"$in"} and len(filters) == 1:
+                ids.extend(product_id["$in"])
+            else:
+                # Can't tell which products a filter hit
+                product_cache.clear()
+                return
+        if ids:
+            product_cache.invalidate(*ids)
+
+    # Keyset page: range filter on the sort keys instead of skip
+    @staticmethod
+    def keyset_page(filters, sort_spec, limit, cursor=None, projection=None):
+        """Fetch `limit` documents after `cursor` (a token from a previous page).
+
+        Returns (documents, next_cursor); next_cursor is None on the last page.
+        """
+        coll = ProductModel.read_collection()
+        sort_spec = with_tiebreaker(sort_spec, "product_id")
+        filters = ProductModel.keyset_query(filters, sort_spec, cursor)
+
+        # One extra document tells us whether another page exists
+        results = list(coll.find(filters, projection).sort(sort_spec).limit(limit + 1))
+        return ProductModel.keyset_result(results, sort_spec, limit)
+
+    # Filters for the page after `cursor` (shared with AsyncProductModel)
+    @staticmethod
+    def keyset_query(filters, sort_spec, cursor):
+        if not cursor:
+            return filters
+        after = keyset_filter(sort_spec, decode_cursor(cursor, sort_spec))
+        return merge_filters(filters, after)
+
+    # Trim the look-ahead document and build next_cursor from the page
+    @staticmethod
+    def keyset_result(results, sort_spec, limit):
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = encode_cursor(results[-1], sort_spec)
+        return results, next_cursor
 
     # Get all products
     @staticmethod
-    def get_all(filters=None, skip=0, limit=10, sort=None):
-        coll = ProductModel.get_collection()
+    def get_all(filters=None, skip=0, limit=10, sort=None, projection=None):
+        coll = ProductModel.read_collection()
         filters = filters or {}
-        cursor = coll.find(filters)
-        if sort:
-            cursor = cursor.sort(sort)
+        cursor = coll.find(filters, projection)
+        sort_spec = resolve_sort(sort)
+        if sort_spec:
+            cursor = cursor.sort(sort_spec)
         if skip:
             cursor = cursor.skip(skip)
         if limit:
             cursor = cursor.limit(limit)
         return list(cursor)
 
+    # Detail lookups read the primary when they fill a shared cache: a
+    # lagging secondary could otherwise re-cache the pre-update product for
+    # every worker for CACHE_TTL right after a write. Otherwise they follow
+    # the read routing like the other queries.
+    @staticmethod
+    def detail_collection():
+        return ProductModel.get_collection() if product_cache.shared else ProductModel.read_collection()
+
     # Get product by ID
     @staticmethod
     def get_by_id(product_id):
-        return ProductModel.get_collection().find_one({"product_id": product_id})
+        return product_cache.get_or_load(
+            product_id,
+            lambda: ProductModel.detail_collection().find_one({"product_id": product_id})
+        )
+
+    # Get several products by ID: cache first, one $in query for the rest
+    @staticmethod
+    def get_by_ids(product_ids):
+        return product_cache.get_or_load_many(product_ids, lambda missing: {
+            p["product_id"]: p
+            for p in ProductModel.detail_collection().find({"product_id": {"$in": missing}})
+        })
 
     # Update product
     @staticmethod
     def update(product_id, update_data):
         update_data["updated_at"] = datetime.utcnow()
-        result = ProductModel.get_collection().update_one(
+        # The pre-image tells the stats what changed; when the recent feed
+        # holds the product it is fetched whole, to patch the feed with
+        in_feed = recent_feed.contains(product_id)
+        before = ProductModel.get_collection().find_one_and_update(
             {"product_id": product_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection=None if in_feed else PRE_IMAGE_PROJECTION
         )
-        return result.modified_count
+        product_cache.invalidate(product_id)
+        if before is None:
+            return 0
+        after = {**before, **update_data}
+        if TRACKED_FIELDS & update_data.keys():
+            stats_writer.record_change(before, after)
+        recent_feed.product_updated(product_id, before.get("created_at"), after if in_feed else None)
+        search_cache.products_changed(before, after)
+        return 1
 
     # Delete product
     @staticmethod
     def delete(product_id):
-        res = ProductModel.get_collection().delete_one({"product_id": product_id})
-        return res.deleted_count
+        before = ProductModel.get_collection().find_one_and_delete(
+            {"product_id": product_id},
+            projection=PRE_IMAGE_PROJECTION
+        )
+        product_cache.invalidate(product_id)
+        if before is None:
+            return 0
+        stats_writer.record_change(before, None)
+        recent_feed.product_deleted(product_id, before.get("created_at"))
+        search_cache.products_changed(before)
+        return 1
 
     # Get by brand
     @staticmethod
-    def brand_products(brand_id):
-        return list(ProductModel.get_collection().find({"brand_id": brand_id}))
+    def brand_products(brand_id, projection=None):
+        return list(ProductModel.read_collection().find({"brand_id": brand_id}, projection))
 
     # Get by category
     @staticmethod
-    def category_products(category):
-        return list(ProductModel.get_collection().find({"category": category}))
+    def category_products(category, projection=None):
+        return list(ProductModel.read_collection().find({"category": category}, projection))
 
-    # Search products with filters, pagination, sorting
+    # Cursor over every match, fetched from the server `batch_size` at a time
     @staticmethod
-    def search(
+    def iter_products(filters, projection=None, batch_size=500):
+        return ProductModel.read_collection().find(filters, projection, batch_size=batch_size)
+
+    # Build the match filter shared by every search mode
+    @staticmethod
+    def search_filters(
         query=None,
-        page=1,
-        limit=10,
-        sort="newest",
+        mode=DEFAULT_SEARCH_MODE,
         category=None,
         brand_id=None,
         min_price=None,
         max_price=None,
         in_stock=None
     ):
-        coll = ProductModel.get_collection()
         filters = {}
 
-        # Keyword search
+        # Keyword search: escaped regex by default, the text index on request
         if query:
-            filters["$or"] = [
-                {"product_name": {"$regex": query, "$options": "i"}},
-                {"description": {"$regex": query, "$options": "i"}},
-                {"category": {"$regex": query, "$options": "i"}},
-            ]
+            if mode == "regex":
+                pattern = re.escape(query)
+                filters["$or"] = [
+                    {"product_name": {"$regex": pattern, "$options": "i"}},
+                    {"description": {"$regex": pattern, "$options": "i"}},
+                    {"category": {"$regex": pattern, "$options": "i"}},
+                ]
+            elif mode == "text":
+                filters["$text"] = {"$search": query}
+            else:
+                raise ValueError(f"Unknown search mode '{mode}'")
 
         # Optional filters
         if category:
@@ -101,45 +354,215 @@ class ProductModel:
             if max_price is not None:
                 price_filter["$lte"] = float(max_price)
             filters["price"] = price_filter
+        return filters
+
+    # Sort spec for a search; relevance only applies to text queries
+    @staticmethod
+    def search_sort(sort, filters):
+        sort_spec = with_tiebreaker(resolve_sort(sort, DEFAULT_SORT), "product_id")
+        relevance = "$text" in filters and RELEVANCE in [s.strip() for s in str(sort).split(",")]
+        if relevance:
+            sort_spec = [("score", TEXT_SCORE)] + sort_spec
+        return sort_spec, relevance
+
+    # Everything a search needs besides the database, shared by search,
+    # faceted_search and AsyncProductModel
+    @staticmethod
+    def search_plan(
+        query=None,
+        page=1,
+        limit=10,
+        sort="newest",
+        category=None,
+        brand_id=None,
+        min_price=None,
+        max_price=None,
+        in_stock=None,
+        cursor=None,
+        mode=DEFAULT_SEARCH_MODE,
+        fields=None
+    ):
+        filters = ProductModel.search_filters(
+            query=query,
+            mode=mode,
+            category=category,
+            brand_id=brand_id,
+            min_price=min_price,
+            max_price=max_price,
+            in_stock=in_stock
+        )
 
         # Pagination
         page = max(1, int(page))
-        limit = min(100, int(limit))
+        limit = max(1, min(100, int(limit)))
         skip = (page - 1) * limit
 
-        # Sorting
-        sort_map = {
-            "price_asc": [("price", 1)],
-            "price_desc": [("price", -1)],
-            "newest": [("created_at", -1)],
-            "oldest": [("created_at", 1)],
-            "name_asc": [("product_name", 1)],
-            "name_desc": [("product_name", -1)]
+        # Sorting (product_id breaks ties so pages never overlap)
+        sort_spec, relevance = ProductModel.search_sort(sort, filters)
+        projection = projection_for(fields, sort_spec) if fields else None
+        if relevance:
+            projection = {**(projection or {}), "score": TEXT_SCORE}
+        if relevance and cursor is not None:
+            raise ValueError("Cursor pagination is not supported with sort=relevance")
+
+        return {
+            "filters": filters,
+            "sort_spec": sort_spec,
+            "relevance": relevance,
+            "projection": projection,
+            "fields": fields,
+            "page": page,
+            "limit": limit,
+            "skip": skip,
+            # `cursor` is "" for the first page in cursor mode, None in page mode
+            "cursor": cursor
         }
 
-        sort_spec = []
-        for s in str(sort).split(","):
-            s = s.strip()
-            if s in sort_map:
-                sort_spec.extend(sort_map[s])
-        if not sort_spec:
-            sort_spec = [("created_at", -1)]  # ✅ Fixed
+    # Shape a search response from the count and the fetched documents
+    @staticmethod
+    def search_result(plan, total, results):
+        limit, skip = plan["limit"], plan["skip"]
+        if plan["cursor"] is not None:
+            results, next_cursor = ProductModel.keyset_result(results, plan["sort_spec"], limit)
+        else:
+            next_cursor = None
+            if not plan["relevance"] and results and skip + len(results) < total:
+                next_cursor = encode_cursor(results[-1], plan["sort_spec"])
+
+        return {
+            "total": total,
+            "page": plan["page"] if plan["cursor"] is None else None,
+            "limit": limit,
+            "total_pages": (total + limit - 1) // limit,
+            "products": results,
+            "next_cursor": next_cursor
+        }
+
+    # Search products with filters, pagination, sorting
+    @staticmethod
+    def search(**params):
+        """Run a search; accepts the same keyword arguments as search_plan."""
+        coll = ProductModel.read_collection()
+        plan = ProductModel.search_plan(**params)
+        filters, sort_spec = plan["filters"], plan["sort_spec"]
 
         total = coll.count_documents(filters)
-        cursor = coll.find(filters).sort(sort_spec).skip(skip).limit(limit)
-        results = list(cursor)
 
+        # Cursor mode fetches one extra document to detect the last page
+        if plan["cursor"] is not None:
+            keyset = ProductModel.keyset_query(filters, sort_spec, plan["cursor"])
+            cursor = coll.find(keyset, plan["projection"]).sort(sort_spec).limit(plan["limit"] + 1)
+        else:
+            cursor = coll.find(filters, plan["projection"]).sort(sort_spec).skip(plan["skip"]).limit(plan["limit"])
+
+        return ProductModel.search_result(plan, total, list(cursor))
+
+    # Aggregation for faceted search: page, total and facets in one $facet
+    @staticmethod
+    def faceted_pipeline(plan, total_cap=None):
+        sort_spec = plan["sort_spec"]
+
+        # Page of products; cursor mode filters inside the facet so the
+        # other facets still see the whole match set
+        products_stages = []
+        if plan["cursor"]:
+            after = keyset_filter(sort_spec, decode_cursor(plan["cursor"], sort_spec))
+            products_stages.append({"$match": after})
+        products_stages.append({"$sort": dict(sort_spec)})
+        if plan["cursor"] is None:
+            products_stages.append({"$skip": plan["skip"]})
+        products_stages.append({"$limit": plan["limit"] + 1})
+        if plan["fields"]:
+            products_stages.append({"$project": projection_for(plan["fields"], sort_spec)})
+
+        # Counting stops at `total_cap` so huge match sets stay cheap
+        total_stages = [{"$limit": total_cap}] if total_cap else []
+        total_stages.append({"$count": "n"})
+
+        facets = {
+            "products": products_stages,
+            "total": total_stages,
+            "category": [
+                {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}}
+            ],
+            "brand_id": [
+                {"$group": {"_id": "$brand_id", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": FACET_LIMIT}
+            ],
+            # Only numeric prices >= 0 are bucketed: the default bucket is
+            # the open-ended top one, and would otherwise also collect
+            # missing, null and negative prices
+            "price": [
+                {"$match": {"price": {"$gte": PRICE_BUCKETS[0]}}},
+                {"$bucket": {
+                    "groupBy": "$price",
+                    "boundaries": PRICE_BUCKETS,
+                    "default": PRICE_BUCKETS[-1],
+                    "output": {"count": {"$sum": 1}}
+                }}
+            ],
+            "stock": [{"$group": {
+                "_id": None,
+                "in_stock": {"$sum": {"$cond": [{"$gt": ["$stock", 0]}, 1, 0]}},
+                "out_of_stock": {"$sum": {"$cond": [{"$gt": ["$stock", 0]}, 0, 1]}}
+            }}]
+        }
+        return [{"$match": plan["filters"]}, {"$facet": facets}]
+
+    # Shape the $facet output into the search response
+    @staticmethod
+    def faceted_result(plan, result, total_cap=None):
+        limit, skip = plan["limit"], plan["skip"]
+        results = result.get("products", [])
+        has_more = len(results) > limit
+        results = results[:limit]
+        counted = result.get("total") or [{"n": 0}]
+        total = counted[0]["n"]
+        total_capped = bool(total_cap) and total >= total_cap
+
+        next_cursor = None
+        more = has_more or (plan["cursor"] is None and skip + len(results) < total)
+        if results and not plan["relevance"] and more:
+            next_cursor = encode_cursor(results[-1], plan["sort_spec"])
+
+        stock = (result.get("stock") or [{}])[0]
         return {
             "total": total,
-            "page": page,
+            "total_capped": total_capped,
+            "page": plan["page"] if plan["cursor"] is None else None,
             "limit": limit,
             "total_pages": (total + limit - 1) // limit,
-            "products": results
+            "products": results,
+            "next_cursor": next_cursor,
+            "facets": {
+                "category": [{"value": b["_id"], "count": b["count"]} for b in result.get("category", [])],
+                "brand_id": [{"value": b["_id"], "count": b["count"]} for b in result.get("brand_id", [])],
+                "price": [
+                    {
+                        "min": b["_id"],
+                        "max": PRICE_BUCKETS[PRICE_BUCKETS.index(b["_id"]) + 1] if b["_id"] != PRICE_BUCKETS[-1] else None,
+                        "count": b["count"]
+                    }
+                    for b in result.get("price", [])
+                ],
+                "in_stock": stock.get("in_stock", 0),
+                "out_of_stock": stock.get("out_of_stock", 0)
+            }
         }
 
+    # Faceted search: page, total and facet buckets in one aggregation
+    @staticmethod
+    def faceted_search(total_cap=None, **params):
+        plan = ProductModel.search_plan(**params)
+        pipeline = ProductModel.faceted_pipeline(plan, total_cap)
+        result = next(ProductModel.read_collection().aggregate(pipeline), {})
+        return ProductModel.faceted_result(plan, result, total_cap)
+
     # Get recent products
     @staticmethod
-    def get_recent(limit=5):
-        coll = ProductModel.get_collection()
-        cursor = coll.find().sort("created_at", -1).limit(limit)
+    def get_recent(limit=5, projection=None):
+        coll = ProductModel.read_collection()
+        cursor = coll.find({}, projection).sort("created_at", -1).limit(limit)
         return list(cursor)
@@ -0,0 +1,313 @@
+import hashlib
+import logging
+import os
+import threading
+from datetime import datetime
+from pymongo import ReturnDocument
+from ...extensions import mongo, async_mongo
+from ...serializers import serializer_for
+from .schema import ProductSchema
+
+
+# In-process feed of the newest RECENT_FEED_SIZE products, already dumped
+# with ProductSchema, behind GET /api/products/recent. Encoded bodies are
+# cached per `limit`, so a request is a dict lookup.
+#
+# Writes in this process patch the feed in memory: creates are prepended,
+# updates replaced from the post-image, deletes removed. Bulk writes only
+# mark it stale. Writes that can change the feed also bump a version marker
+# document: creates, bulk writes, and updates/deletes of a product that may
+# be in the window (see may_contain). Edits to older products leave the
+# marker alone, so it is not a write hotspot. No feed I/O runs in the
+# request: the background poller (a thread, or a task in the ASGI app) does
+# the queued bump, reloads whatever the patches could not fix (the tail
+# after a delete, bulk writes) and, every RECENT_FEED_SYNC_INTERVAL seconds,
+# reloads when another process bumped the marker. Until the first load
+# completes, while the feed is stale, and for limits above the feed size the
+# endpoint falls back to the database.
+
+MARKER_COLLECTION = "feed_versions"
+MARKER_ID = "recent_products"
+# Same order as ProductModel.get_recent, with a tiebreaker
+RECENT_SORT = [("created_at", -1), ("product_id", -1)]
+
+
+def _dump(doc):
+    return serializer_for(ProductSchema).dump(doc)
+
+
+class RecentFeed:
+    def __init__(self):
+        self.size = 50
+        self.interval = 2
+        self.enabled = False
+        self.version = None
+        self._items = None  # dumped products, newest first; None until loaded
+        self._encoded = {}
+        # Leading items known to be the newest products
+        self._exact = 0
+        # Writes seen by this process, and how many of them _items reflects
+        self._writes = 0
+        self._synced = 0
+        self._bump_pending = False
+        self._wake = threading.Event()
+        # Event of the ASGI app's poller task; None in the WSGI app
+        self.async_wake = None
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def init_app(self, app):
+        self.size = app.config.get("RECENT_FEED_SIZE", 50)
+        self.interval = app.config.get("RECENT_FEED_SYNC_INTERVAL", 2)
+        self.enabled = self.size > 0
+        self.version = None
+        self._items = None
+        self._encoded = {}
+        self._exact = 0
+        self._bump_pending = False
+        self._pid = None
+
+    # --- state ---
+
+    def _replace(self, docs, version, writes):
+        """Install a load that started when `writes` writes had been seen."""
+        items = [_dump(doc) for doc in docs]
+        with self._lock:
+            self._items = items
+            self._encoded = {}
+            self.version = version
+            self._synced = writes
+            # A write during the load may be missing from it: reload again
+            self._exact = self.size if writes == self._writes else 0
+
+    def _wrote(self, patched):
+        """Count a write (caller holds the lock); `patched` if _items now reflects it."""
+        in_sync = self._synced == self._writes
+        self._writes += 1
+        if patched and in_sync:
+            self._synced = self._writes
+
+    def _add(self, doc):
+        item = _dump(doc)
+        with self._lock:
+            if self._items is not None:
+                self._items = ([item] + self._items)[:self.size]
+                self._encoded = {}
+                self._exact = min(self._exact + 1, self.size)
+            self._wrote(self._items is not None)
+
+    def _patch(self, product_id, after):
+        """Replace the product's item with `after`, or mark the feed stale without one."""
+        item = _dump(after) if after is not None else None
+        with self._lock:
+            index = self._index(product_id)
+            if index is None:
+                return
+            if item is None:
+                self._exact = 0
+            else:
+                self._items = self._items[:index] + [item] + self._items[index + 1:]
+                self._encoded = {}
+            self._wrote(item is not None)
+
+    def _remove(self, product_id):
+        with self._lock:
+            index = self._index(product_id)
+            if index is None:
+                return
+            self._items = self._items[:index] + self._items[index + 1:]
+            self._encoded = {}
+            # The items left are still the newest; the poller reloads the tail
+            self._exact = min(self._exact, len(self._items))
+            self._wrote(False)
+
+    def _invalidate(self):
+        with self._lock:
+            self._exact = 0
+            self._wrote(False)
+
+    def _index(self, product_id):
+        if self._items is None:
+            return None
+        for index, item in enumerate(self._items):
+            if item.get("product_id") == product_id:
+                return index
+        return None
+
+    def _bumped(self, version):
+        # Our bump is the only change since the version we hold: stay current.
+        # Otherwise another process wrote too and the poller will reload.
+        with self._lock:
+            if self.version is not None and version == self.version + 1:
+                self.version = version
+
+    def contains(self, product_id):
+        with self._lock:
+            return self._index(product_id) is not None
+
+    def _stale(self):
+        return self._items is None or self._synced != self._writes
+
+    def may_contain(self, product_id, created_at=None):
+        """Whether the product may be one of the newest `size` products.
+
+        True when it is in our copy, or is at least as new as our oldest item:
+        our copy can lag products created by other workers. Unknown cases
+        (feed not loaded, not full, no created_at) count as possibly in.
+        """
+        with self._lock:
+            items = self._items
+        if items is None or len(items) < self.size or created_at is None:
+            return True
+        if any(i.get("product_id") == product_id for i in items):
+            return True
+        try:
+            oldest = datetime.fromisoformat(items[-1]["created_at"])
+            return created_at.replace(tzinfo=None) >= oldest.replace(tzinfo=None)
+        except (KeyError, TypeError, ValueError):
+            return True
+
+    def page(self, limit, encode):
+        """(body, etag) for the newest `limit` products, or None to fall back.
+
+        `encode` turns the list into response bytes (the app's JSON provider).
+        """
+        if not self.enabled or limit < 1 or limit > self.size:
+            return None
+        with self._lock:
+            items = self._items
+            cached = self._encoded.get(limit)
+            exact = self._exact
+        if not items or limit > exact:
+            return None
+        if cached is None:
+            body = encode(items[:limit])
+            cached = (body, hashlib.sha1(body).hexdigest())
+            with self._lock:
+                if self._items is items:
+                    self._encoded[limit] = cached
+        return cached
+
+    # --- sync I/O (WSGI app) ---
+
+    def refresh(self):
+        writes = self._writes
+        marker = mongo.db[MARKER_COLLECTION].find_one({"_id": MARKER_ID})
+        docs = list(mongo.db.products.find({}).sort(RECENT_SORT).limit(self.size))
+        self._replace(docs, (marker or {}).get("version", 0), writes)
+
+    def sync(self):
+        marker = mongo.db[MARKER_COLLECTION].find_one({"_id": MARKER_ID})
+        if self._stale() or (marker or {}).get("version", 0) != self.version:
+            self.refresh()
+
+    def flush_bump(self):
+        if not self._bump_pending:
+            return
+        self._bump_pending = False
+        try:
+            self._bump()
+        except Exception:
+            self._bump_pending = True
+            raise
+
+    def _bump(self):
+        marker = mongo.db[MARKER_COLLECTION].find_one_and_update(
+            {"_id": MARKER_ID}, {"$inc": {"version": 1}},
+            upsert=True, return_document=ReturnDocument.AFTER
+        )
+        self._bumped(marker["version"])
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                self.flush_bump()
+                self.sync()
+            except Exception as e:
+                logging.warning("Recent feed sync failed: %s", e)
+            # Woken early by writes in this process
+            self._wake.wait(self.interval)
+
+    def ensure_started(self):
+        """Start the loader/poller thread in this process if it is not running yet."""
+        if not self.enabled or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # A forked worker must not trust the parent's copy
+            self._items = None
+            self._encoded = {}
+            self._bump_pending = False
+        threading.Thread(target=self._run, name="recent-feed", daemon=True).start()
+
+    # Called by ProductModel after its writes. Nothing here does I/O: the
+    # marker bump and any reload are left to the poller.
+    def _queue_bump(self):
+        self._bump_pending = True
+        (self.async_wake or self._wake).set()
+
+    def product_created(self, doc):
+        if not self.enabled:
+            return
+        self._add(doc)
+        self._queue_bump()
+
+    def product_updated(self, product_id, created_at, after=None):
+        """A single update went through.
+
+        `created_at` is the product's, from the write's pre-image; `after` is
+        its full post-image, which the write fetches when contains() was true.
+        """
+        if not self.enabled or not self.may_contain(product_id, created_at):
+            return
+        self._patch(product_id, after)
+        self._queue_bump()
+
+    def product_deleted(self, product_id, created_at):
+        if not self.enabled or not self.may_contain(product_id, created_at):
+            return
+        self._remove(product_id)
+        self._queue_bump()
+
+    def product_changed(self):
+        """A bulk write went through: reload before serving the feed again."""
+        if not self.enabled:
+            return
+        self._invalidate()
+        self._queue_bump()
+
+    # --- async I/O (ASGI app) ---
+
+    async def refresh_async(self):
+        writes = self._writes
+        marker = await async_mongo.db[MARKER_COLLECTION].find_one({"_id": MARKER_ID})
+        docs = await async_mongo.db.products.find({}).sort(RECENT_SORT).limit(self.size).to_list()
+        self._replace(docs, (marker or {}).get("version", 0), writes)
+
+    async def sync_async(self):
+        marker = await async_mongo.db[MARKER_COLLECTION].find_one({"_id": MARKER_ID})
+        if self._stale() or (marker or {}).get("version", 0) != self.version:
+            await self.refresh_async()
+
+    async def _bump_async(self):
+        marker = await async_mongo.db[MARKER_COLLECTION].find_one_and_update(
+            {"_id": MARKER_ID}, {"$inc": {"version": 1}},
+            upsert=True, return_document=ReturnDocument.AFTER
+        )
+        self._bumped(marker["version"])
+
+    async def flush_bump_async(self):
+        if not self._bump_pending:
+            return
+        self._bump_pending = False
+        try:
+            await self._bump_async()
+        except Exception:
+            self._bump_pending = True
+            raise
+
+
+recent_feed = RecentFeed()
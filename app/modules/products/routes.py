@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 
 from marshmallow import ValidationError
-from .controller import create_product,get_all_products,get_product_by_id,update_product,delete_product, get_recent_products,search_products,get_products_by_category,get_products_by_brand
+from .controller import bulk_import_products, bulk_update_products, bulk_delete_products, create_product,get_all_products,get_product_by_id,get_products_batch,update_product,delete_product, get_recent_products,search_products,get_products_by_category,get_products_by_brand,get_catalog_stats
 
 products_bp = Blueprint("products", __name__)
 
@@ -13,12 +13,36 @@ def add_product():
     return create_product()
 
 
+# ✅ 1b. Bulk import products (NDJSON / JSON array body)
+@products_bp.route("/bulk", methods=["POST"])
+def bulk_import():
+    return bulk_import_products()
+
+
+# ✅ 1c. Bulk update products (patches by id or by filter)
+@products_bp.route("/bulk/update", methods=["POST"])
+def bulk_update():
+    return bulk_update_products()
+
+
+# ✅ 1d. Bulk delete products (by id or by filter)
+@products_bp.route("/bulk/delete", methods=["POST"])
+def bulk_delete():
+    return bulk_delete_products()
+
+
 # ✅ 2. Get all products (with filters & pagination)
 @products_bp.route("", methods=["GET"])
 def get_products():
     return get_all_products()
 
 
+# ✅ 2b. Get several products by ID (?ids=a,b,c or JSON {"ids": [...]})
+@products_bp.route("/batch", methods=["GET", "POST"])
+def get_batch():
+    return get_products_batch()
+
+
 # ✅ 3. Get product by ID
 @products_bp.route("/<product_id>", methods=["GET"])
 def get_product(product_id):
@@ -61,3 +85,8 @@ def search():
 def get_recent():
     return get_recent_products()
 
+
+# ✅ 10. Catalog stats (per category and totals)
+@products_bp.route("/stats", methods=["GET"])
+def stats():
+    return get_catalog_stats()
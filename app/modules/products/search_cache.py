@@ -0,0 +1,194 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import threading
+from ...cache import MemoryBackend
+
+
+# Short-lived per-process cache of ProductModel.search / faceted_search
+# results for hot queries, keyed by the normalized search parameters.
+#
+# Invalidation is by generation: every product write bumps a catalog-wide
+# counter plus one per brand and category it touched. A key embeds the
+# counters its search depends on (its brand/category filters, or the
+# catalog-wide one when it has neither), so after a write the affected
+# entries are simply never looked up again and age out of the LRU.
+# Generations are per process; other workers notice a write once their
+# entries expire (SEARCH_CACHE_TTL seconds).
+#
+# Concurrent misses for the same key are coalesced: one request runs the
+# query and the others wait for its result.
+
+CATALOG = "all"
+
+
+def _tags(params):
+    tags = []
+    if params.get("brand_id"):
+        tags.append(f"brand:{params['brand_id']}")
+    if params.get("category"):
+        tags.append(f"category:{params['category']}")
+    return tags or [CATALOG]
+
+
+def _normalized(params):
+    normalized = {k: v for k, v in params.items() if v is not None and v != ""}
+    if "query" in normalized and normalized.get("mode") == "text":
+        # $text ignores case and splits on whitespace. The regex mode matches
+        # the escaped query as typed, spaces included, so it is keyed as is.
+        normalized["query"] = " ".join(normalized["query"].lower().split())
+    return normalized
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.ok = False
+
+
+class SearchCache:
+    namespace = "search"
+
+    def __init__(self):
+        self.backend = None
+        self.ttl = 5
+        self.wait_timeout = 5
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._generations = {}
+        self._flights = {}
+        self._async_flights = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get("SEARCH_CACHE_TTL", 5)
+        self.wait_timeout = app.config.get("SEARCH_CACHE_WAIT_TIMEOUT", 5)
+        max_entries = app.config.get("SEARCH_CACHE_MAX_ENTRIES", 1000)
+        self.backend = MemoryBackend(max_entries) if self.ttl > 0 and max_entries > 0 else None
+        self._generations = {}
+
+    def key(self, params):
+        """Cache key for a search: its normalized parameters plus the
+        generations of the brands/categories it reads."""
+        with self._lock:
+            generations = [(tag, self._generations.get(tag, 0)) for tag in _tags(params)]
+        raw = json.dumps([_normalized(params), generations], sort_keys=True, default=str)
+        return f"{self.namespace}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    # --- invalidation ---
+
+    def _bump(self, brands=(), categories=()):
+        tags = [CATALOG]
+        tags += [f"brand:{b}" for b in brands if b is not None]
+        tags += [f"category:{c}" for c in categories if c is not None]
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def products_changed(self, *docs):
+        """Products written (their before and/or after images)."""
+        docs = [d for d in docs if d]
+        self._bump({d.get("brand_id") for d in docs}, {d.get("category") for d in docs})
+
+    def scopes_changed(self, scopes):
+        """A bulk write touched these {"brand": ids, "category": names} (ProductStats scopes)."""
+        self._bump(scopes.get("brand", ()), scopes.get("category", ()))
+
+    # --- lookups ---
+
+    def _get(self, key):
+        value = self.backend.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return value
+
+    def _set(self, key, value):
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logging.warning("Search cache write failed: %s", e)
+
+    def get_or_compute(self, params, compute):
+        """Cached result for `params`, else `compute()` (once for concurrent misses)."""
+        if self.backend is None:
+            return compute()
+        key = self.key(params)
+        value = self._get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            # The leader's result, or our own query if it failed or stalls
+            if flight.done.wait(self.wait_timeout) and flight.ok:
+                return copy.deepcopy(flight.value)
+            return compute()
+
+        try:
+            value = compute()
+            self._set(key, value)
+            flight.value, flight.ok = value, True
+            return value
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    async def get_or_compute_async(self, params, compute):
+        """get_or_compute for the ASGI app: `compute` is a coroutine function."""
+        if self.backend is None:
+            return await compute()
+        key = self.key(params)
+        value = self._get(key)
+        if value is not None:
+            return value
+
+        future = self._async_flights.get(key)
+        if future is not None:
+            with self._lock:
+                self.coalesced += 1
+            try:
+                return copy.deepcopy(await asyncio.wait_for(asyncio.shield(future), self.wait_timeout))
+            except Exception:
+                return await compute()
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_flights[key] = future
+        try:
+            value = await compute()
+            self._set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError("search cancelled"))
+            future.exception()  # retrieved: waiters fall back to their own query
+            raise
+        finally:
+            self._async_flights.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            hits, misses, coalesced = self.hits, self.misses, self.coalesced
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "coalesced": coalesced,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+        }
+
+
+search_cache = SearchCache()
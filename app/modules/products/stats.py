@@ -0,0 +1,487 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import click
+from datetime import datetime
+from flask.cli import with_appcontext
+from pymongo import UpdateOne, ReplaceOne, DeleteOne, DeleteMany, ReturnDocument
+from ...extensions import mongo, mongo_reads
+
+
+# Materialized catalog stats: one document per brand and per category in
+# `catalog_stats`, e.g.
+#
+#   {"_id": "brand:<brand_id>", "scope": "brand", "key": "<brand_id>",
+#    "count", "total_stock", "in_stock_count", "price_sum",
+#    "min_price", "max_price", "updated_at"}
+#
+# ProductModel's single-product writes keep them current with $inc/$min/$max.
+# $min/$max can only tighten a bound, so when the product holding the min or
+# max price goes away that bound is recomputed from the products collection.
+# Those updates run off the request path: the write queues its pre/post
+# images on stats_writer, which applies everything queued so far at once.
+#
+# Stats never fail a product write: it has already committed. Bulk writes,
+# and single writes whose stats update failed, mark the brands/categories
+# they touched in `stats_dirty`; a background thread per process
+# (stats_rebuilder) recomputes those every STATS_REBUILD_INTERVAL seconds.
+# `flask rebuild-stats` recomputes everything to fix any drift.
+
+COLLECTION = "catalog_stats"
+# Scopes waiting for a rebuild: {"_id": stats id, "scope", "key", "marked_at"}
+DIRTY_COLLECTION = "stats_dirty"
+
+# scope -> product field it groups by
+SCOPES = {"brand": "brand_id", "category": "category"}
+
+# Product fields that feed the stats; other updates leave them alone
+TRACKED_FIELDS = {"brand_id", "category", "price", "stock"}
+
+COUNTERS = ("count", "total_stock", "in_stock_count", "price_sum")
+
+
+def stats_id(scope, key):
+    return f"{scope}:{key}"
+
+
+def _contribution(doc, sign=1):
+    stock = doc.get("stock") or 0
+    return {
+        "count": sign,
+        "total_stock": sign * stock,
+        "in_stock_count": sign if stock > 0 else 0,
+        "price_sum": sign * (doc.get("price") or 0),
+    }
+
+
+def insert_steps(docs, now):
+    """Upserts adding `docs` to their stats, merged per stats document."""
+    merged = {}
+    for doc in docs:
+        for scope, field in SCOPES.items():
+            key = doc.get(field)
+            if key is None:
+                continue
+            entry = merged.setdefault(stats_id(scope, key), {
+                "scope": scope, "key": key, "inc": dict.fromkeys(COUNTERS, 0), "prices": []
+            })
+            for name, value in _contribution(doc).items():
+                entry["inc"][name] += value
+            if doc.get("price") is not None:
+                entry["prices"].append(doc["price"])
+
+    steps = []
+    for _id, entry in merged.items():
+        update = {
+            "$inc": entry["inc"],
+            "$set": {"updated_at": now},
+            "$setOnInsert": {"scope": entry["scope"], "key": entry["key"]},
+        }
+        if entry["prices"]:
+            update["$min"] = {"min_price": min(entry["prices"])}
+            update["$max"] = {"max_price": max(entry["prices"])}
+        steps.append({"filter": {"_id": _id}, "update": update, "upsert": True, "check": None})
+    return steps
+
+
+def _removal_step(scope, key, doc, now):
+    return {
+        "filter": {"_id": stats_id(scope, key)},
+        "update": {"$inc": _contribution(doc, -1), "$set": {"updated_at": now}},
+        "upsert": False,
+        "check": (SCOPES[scope], key, doc.get("price")),
+    }
+
+
+def change_steps(before, after, now):
+    """Steps moving one product's contribution from `before` to `after`.
+
+    Either side may be None (insert / delete). A product that stays in the
+    same brand or category gets a single $inc of the difference.
+    """
+    if before is None:
+        return insert_steps([after], now)
+
+    steps = []
+    for scope, field in SCOPES.items():
+        old_key = before.get(field)
+        new_key = after.get(field) if after else None
+        if old_key is not None and old_key == new_key:
+            old, new = _contribution(before), _contribution(after)
+            inc = {name: new[name] - old[name] for name in COUNTERS}
+            price_changed = before.get("price") != after.get("price")
+            if not any(inc.values()) and not price_changed:
+                continue
+            update = {"$inc": inc, "$set": {"updated_at": now}}
+            check = None
+            if price_changed:
+                if after.get("price") is not None:
+                    update["$min"] = {"min_price": after["price"]}
+                    update["$max"] = {"max_price": after["price"]}
+                check = (field, old_key, before.get("price"))
+            steps.append({"filter": {"_id": stats_id(scope, old_key)}, "update": update, "upsert": False, "check": check})
+            continue
+        if old_key is not None:
+            steps.append(_removal_step(scope, old_key, before, now))
+        if new_key is not None:
+            steps += [s for s in insert_steps([after], now) if s["filter"]["_id"] == stats_id(scope, new_key)]
+    return steps
+
+
+def queued_steps(changes, now):
+    """Steps for a batch of (before, after) pairs; the inserts share upserts."""
+    steps = insert_steps([after for before, after in changes if before is None], now)
+    for before, after in changes:
+        if before is not None:
+            steps += change_steps(before, after, now)
+    return steps
+
+
+def settle(doc, check):
+    """What a checked step still needs once applied: "delete", "bounds" or None."""
+    if doc is None:
+        return None
+    if doc.get("count", 0) <= 0:
+        return "delete"
+    price = check[2]
+    if price is not None and price in (doc.get("min_price"), doc.get("max_price")):
+        return "bounds"
+    return None
+
+
+def bounds_pipeline(field, key):
+    return [
+        {"$match": {field: key}},
+        {"$group": {"_id": None, "min_price": {"$min": "$price"}, "max_price": {"$max": "$price"}}},
+    ]
+
+
+def rebuild_pipeline(field, keys=None):
+    """Stats for every value of `field`, or only for `keys`."""
+    match = {field: {"$in": list(keys)}} if keys is not None else {field: {"$ne": None}}
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": f"${field}",
+            "count": {"$sum": 1},
+            "total_stock": {"$sum": {"$ifNull": ["$stock", 0]}},
+            "in_stock_count": {"$sum": {"$cond": [{"$gt": ["$stock", 0]}, 1, 0]}},
+            "price_sum": {"$sum": {"$ifNull": ["$price", 0]}},
+            "min_price": {"$min": "$price"},
+            "max_price": {"$max": "$price"},
+        }},
+    ]
+
+
+def rebuild_requests(scope, results, keys, started):
+    """Writes replacing a scope's stats with `results` from rebuild_pipeline."""
+    requests = []
+    found = set()
+    for row in results:
+        key = row.pop("_id")
+        found.add(key)
+        requests.append(ReplaceOne(
+            {"_id": stats_id(scope, key)},
+            {"scope": scope, "key": key, **row, "updated_at": started},
+            upsert=True
+        ))
+    if keys is None:
+        # Full rebuild: anything not rewritten above has no products left
+        requests.append(DeleteMany({"scope": scope, "updated_at": {"$lt": started}}))
+    elif set(keys) - found:
+        requests.append(DeleteMany({"_id": {"$in": [stats_id(scope, k) for k in set(keys) - found]}}))
+    return requests
+
+
+def scopes_pipeline(filters_list):
+    """Brands and categories of the products matching any of the filters."""
+    match = filters_list[0] if len(filters_list) == 1 else {"$or": list(filters_list)}
+    return [
+        {"$match": match},
+        {"$group": {"_id": None, "brand": {"$addToSet": "$brand_id"}, "category": {"$addToSet": "$category"}}},
+    ]
+
+
+def scopes_of(result, updates=()):
+    """{scope: set of keys} from a scopes_pipeline result plus keys $set by `updates`."""
+    scopes = {scope: set(result.get(scope, ())) if result else set() for scope in SCOPES}
+    for update in updates:
+        for scope, field in SCOPES.items():
+            if field in update.get("$set", {}):
+                scopes[scope].add(update["$set"][field])
+    return scopes
+
+
+def scopes_of_docs(docs):
+    """{scope: keys} of the brands/categories of some product documents."""
+    scopes = {scope: set() for scope in SCOPES}
+    for doc in docs:
+        for scope, field in SCOPES.items():
+            if doc and doc.get(field) is not None:
+                scopes[scope].add(doc[field])
+    return scopes
+
+
+def dirty_requests(scopes, now):
+    """Upserts marking `scopes` ({scope: keys}) for the background rebuild."""
+    return [
+        UpdateOne(
+            {"_id": stats_id(scope, key)},
+            {"$set": {"scope": scope, "key": key, "marked_at": now}},
+            upsert=True
+        )
+        for scope, keys in scopes.items() for key in keys if key is not None
+    ]
+
+
+def dirty_scopes(marks):
+    """{scope: keys} from stats_dirty documents."""
+    scopes = {scope: set() for scope in SCOPES}
+    for mark in marks:
+        scopes[mark["scope"]].add(mark["key"])
+    return scopes
+
+
+def clear_requests(marks):
+    # A scope marked again while it was being rebuilt has a newer marked_at
+    # and stays queued for the next round
+    return [DeleteOne({"_id": m["_id"], "marked_at": m["marked_at"]}) for m in marks]
+
+
+def stats_view(doc):
+    """API shape of a stats document (zeros when there is none)."""
+    doc = doc or {}
+    count = doc.get("count", 0)
+    return {
+        "product_count": count,
+        "total_stock": doc.get("total_stock", 0),
+        "in_stock_count": doc.get("in_stock_count", 0),
+        "min_price": doc.get("min_price") if count else None,
+        "max_price": doc.get("max_price") if count else None,
+        "avg_price": round(doc["price_sum"] / count, 2) if count else None,
+    }
+
+
+def totals_view(docs):
+    """Catalog-wide stats from the per-category documents."""
+    docs = [d for d in docs if d.get("count", 0) > 0]
+    mins = [d["min_price"] for d in docs if d.get("min_price") is not None]
+    maxes = [d["max_price"] for d in docs if d.get("max_price") is not None]
+    total = {name: sum(d.get(name, 0) for d in docs) for name in COUNTERS}
+    return stats_view({**total, "min_price": min(mins, default=None), "max_price": max(maxes, default=None)})
+
+
+class ProductStats:
+    @staticmethod
+    def collection():
+        return mongo.db[COLLECTION]
+
+    @staticmethod
+    def read_collection():
+        return mongo_reads.db[COLLECTION]
+
+    # Apply steps: plain upserts in one bulk_write, checked steps one by one
+    @staticmethod
+    def apply(steps):
+        coll = ProductStats.collection()
+        plain = [UpdateOne(s["filter"], s["update"], upsert=s["upsert"]) for s in steps if s["check"] is None]
+        if plain:
+            coll.bulk_write(plain, ordered=False)
+        for step in steps:
+            if step["check"] is None:
+                continue
+            doc = coll.find_one_and_update(step["filter"], step["update"], return_document=ReturnDocument.AFTER)
+            action = settle(doc, step["check"])
+            if action == "delete":
+                coll.delete_one({"_id": doc["_id"], "count": {"$lte": 0}})
+            elif action == "bounds":
+                field, key, _ = step["check"]
+                bounds = list(mongo.db.products.aggregate(bounds_pipeline(field, key)))
+                if bounds:
+                    coll.update_one({"_id": doc["_id"]}, {"$set": {
+                        "min_price": bounds[0]["min_price"], "max_price": bounds[0]["max_price"]
+                    }})
+
+    # Called after product writes have committed: failures are logged and
+    # the scopes queued for a rebuild instead of failing the request
+    @staticmethod
+    def record(steps, docs):
+        try:
+            ProductStats.apply(steps)
+        except Exception as e:
+            logging.warning("Stats update failed, queued for rebuild: %s", e)
+            ProductStats.mark_dirty(scopes_of_docs(docs))
+
+    @staticmethod
+    def record_insert(docs):
+        ProductStats.record(insert_steps(docs, datetime.utcnow()), docs)
+
+    @staticmethod
+    def mark_dirty(scopes):
+        """Queue scopes ({scope: keys}) for stats_rebuilder; never raises."""
+        requests = dirty_requests(scopes, datetime.utcnow())
+        if not requests:
+            return
+        try:
+            mongo.db[DIRTY_COLLECTION].bulk_write(requests, ordered=False)
+        except Exception as e:
+            logging.error("Could not queue stats rebuild (run `flask rebuild-stats`): %s", e)
+
+    @staticmethod
+    def rebuild_dirty(limit=1000):
+        """Rebuild up to `limit` queued scopes; returns the rebuild summary."""
+        coll = mongo.db[DIRTY_COLLECTION]
+        marks = list(coll.find({}).limit(limit))
+        if not marks:
+            return {}
+        summary = ProductStats.rebuild(dirty_scopes(marks))
+        coll.bulk_write(clear_requests(marks), ordered=False)
+        return summary
+
+    # Scopes a bulk operation may touch, read before it runs
+    @staticmethod
+    def scopes_matching(filters_list, updates=()):
+        result = list(mongo.db.products.aggregate(scopes_pipeline(filters_list)))
+        return scopes_of(result[0] if result else None, updates)
+
+    @staticmethod
+    def rebuild(scopes=None):
+        """Recompute stats from the products collection.
+
+        `scopes` is {scope: keys} for a partial rebuild; None rebuilds all.
+        """
+        started = datetime.utcnow()
+        coll = ProductStats.collection()
+        summary = {}
+        for scope, field in SCOPES.items():
+            keys = None if scopes is None else scopes.get(scope)
+            if keys is not None and not keys:
+                continue
+            results = list(mongo.db.products.aggregate(rebuild_pipeline(field, keys)))
+            summary[scope] = len(results)
+            requests = rebuild_requests(scope, results, keys, started)
+            if requests:
+                coll.bulk_write(requests, ordered=False)
+        return summary
+
+    @staticmethod
+    def get(scope, key):
+        return ProductStats.read_collection().find_one({"_id": stats_id(scope, key)})
+
+    @staticmethod
+    def get_scope(scope):
+        return list(ProductStats.read_collection().find({"scope": scope}))
+
+
+class StatsRebuilder:
+    """Per-process thread draining stats_dirty every STATS_REBUILD_INTERVAL seconds."""
+
+    def __init__(self):
+        self.interval = 5
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.interval = app.config.get("STATS_REBUILD_INTERVAL", 5)
+        self._pid = None
+
+    def _run(self):
+        while True:
+            try:
+                ProductStats.rebuild_dirty()
+            except Exception as e:
+                logging.warning("Stats rebuild failed: %s", e)
+            time.sleep(self.interval)
+
+    def ensure_started(self):
+        """Start the rebuild thread in this process if it is not running yet."""
+        if self.interval <= 0 or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._run, name="stats-rebuild", daemon=True).start()
+
+
+class StatsWriter:
+    """Applies single-product stats updates off the request path.
+
+    Writes queue (before, after) pairs; a per-process thread, or in the ASGI
+    app a task on its event loop (`async_wake` is then that task's
+    asyncio.Event), applies everything queued so far with one
+    ProductStats.record. Updates still queued when a process is killed are
+    lost; `flask rebuild-stats` repairs that drift.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self.async_wake = None
+        self._pid = None
+
+    def record_insert(self, docs):
+        self._queue([(None, doc) for doc in docs])
+
+    def record_change(self, before, after):
+        self._queue([(before, after)])
+
+    def _queue(self, changes):
+        wake = self.async_wake
+        if wake is None:
+            self.ensure_started()
+            wake = self._wake
+        with self._lock:
+            self._pending.extend(changes)
+        wake.set()
+
+    def take(self):
+        """(steps, docs) for everything queued so far, or None; empties the queue."""
+        with self._lock:
+            changes, self._pending = self._pending, []
+        if not changes:
+            return None
+        return queued_steps(changes, datetime.utcnow()), [doc for pair in changes for doc in pair]
+
+    def flush(self):
+        queued = self.take()
+        if queued:
+            ProductStats.record(*queued)
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logging.warning("Stats update failed: %s", e)
+
+    def ensure_started(self):
+        """Start the writer thread in this process if it is not running yet."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # A forked worker must not apply what the parent queued
+            self._pending = []
+        threading.Thread(target=self._run, name="stats-writer", daemon=True).start()
+
+
+stats_rebuilder = StatsRebuilder()
+stats_writer = StatsWriter()
+# Apply what is still queued when the process exits normally
+atexit.register(stats_writer.flush)
+
+
+@click.command("rebuild-stats")
+@with_appcontext
+def rebuild_stats_command():
+    """Recompute brand and category stats from the products collection."""
+    click.echo(json.dumps(ProductStats.rebuild(), indent=2))
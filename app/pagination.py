@@ -0,0 +1,93 @@
+import base64
+import json
+from datetime import datetime
+
+
+# Keyset (cursor) pagination helpers.
+#
+# A cursor stores the sort key values of the last document on a page, so the
+# next page is fetched with a range filter on an indexed sort instead of
+# `.skip()`. The token is opaque to clients: base64url encoded JSON.
+
+def with_tiebreaker(sort_spec, tiebreaker):
+    """Append a unique field to the sort so every document has a stable position."""
+    fields = [field for field, _ in sort_spec]
+    if tiebreaker in fields:
+        return list(sort_spec)
+    direction = sort_spec[-1][1] if sort_spec else 1
+    return list(sort_spec) + [(tiebreaker, direction)]
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+def encode_cursor(doc, sort_spec):
+    """Build the cursor token pointing right after `doc`."""
+    payload = {
+        "s": [[field, direction] for field, direction in sort_spec],
+        "v": [_encode_value(doc.get(field)) for field, _ in sort_spec],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, sort_spec):
+    """Return the sort key values stored in `token`.
+
+    Raises ValueError if the token is malformed or was issued for another sort.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        spec = [(field, direction) for field, direction in payload["s"]]
+        values = [_decode_value(v) for v in payload["v"]]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+
+    if spec != list(sort_spec) or len(values) != len(spec):
+        raise ValueError("Cursor does not match the requested sort")
+    return values
+
+
+def keyset_filter(sort_spec, values):
+    """Filter matching documents that sort strictly after `values`.
+
+    For a sort on (a, b, c) this expands to:
+        a > va  OR  (a == va AND b > vb)  OR  (a == va AND b == vb AND c > vc)
+    with `>` flipped to `<` for descending keys.
+
+    MongoDB sorts a missing or null key below every value, and `$gt`/`$lt`
+    never match null, so those documents get their own branches: `== None`
+    matches both, descending keys continue into them after the last value,
+    and ascending keys continue from them into every value.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort_spec):
+        clause = {f: values[j] for j, (f, _) in enumerate(sort_spec[:i])}
+        value = values[i]
+        if direction == 1:
+            clause[field] = {"$ne": None} if value is None else {"$gt": value}
+        elif value is None:
+            continue  # nothing sorts after null when descending
+        else:
+            clause["$or"] = [{field: {"$lt": value}}, {field: None}]
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def merge_filters(filters, extra):
+    """AND two Mongo filters without clobbering keys they share (e.g. `$or`)."""
+    if not filters:
+        return dict(extra)
+    if set(filters) & set(extra):
+        return {"$and": [filters, extra]}
+    return {**filters, **extra}
@@ -0,0 +1,51 @@
+import logging
+from pymongo import MongoClient, uri_parser
+from .extensions import mongo, health_monitor
+from .logging_config import configure_logging
+from .modules.products.recent import recent_feed
+from .modules.products.stats import stats_rebuilder
+
+
+# Hooks for pre-forking servers (gunicorn.conf.py). With a preloaded app,
+# create_app runs once in the master and the workers are forked from it, so
+# each worker must replace what does not survive fork():
+#
+#   - the MongoClient: pymongo clients are not fork-safe, and the master has
+#     already used it (index reconciliation)
+#   - the logging listener thread: threads are not copied into the child
+#
+# The health pinger, stats rebuilder and recent-feed poller are started per
+# process already (they check os.getpid()), so warm_up only starts them early.
+
+def after_fork(app):
+    """Give a freshly forked worker its own MongoClient and log listener."""
+    from . import mongo_client_kwargs
+    configure_logging(app)
+    uri = app.config["MONGO_URI"]
+    # The parent's client is dropped, not closed: closing would end sessions
+    # on sockets the master still shares
+    mongo.cx = MongoClient(uri, connect=False, **mongo_client_kwargs(app))
+    database = uri_parser.parse_uri(uri)["database"]
+    mongo.db = mongo.cx[database] if database else None
+
+
+def warm_up(app):
+    """Connect and load per-process state before the worker takes traffic."""
+    with app.app_context():
+        health_monitor.ensure_started()
+        stats_rebuilder.ensure_started()
+        # ensure_started drops the feed inherited from the master, so load it after
+        recent_feed.ensure_started()
+        try:
+            mongo.cx.admin.command("ping")
+            if recent_feed.enabled:
+                recent_feed.refresh()
+        except Exception as e:
+            logging.warning("Worker warm-up failed: %s", e)
+
+
+def shutdown():
+    """Close the worker's client once in-flight requests have drained."""
+    client = mongo.cx
+    if client is not None:
+        client.close()
@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+
+# Sparse fieldsets (`?fields=a,b,c`): the same field list drives the Mongo
+# projection and the marshmallow `only=` dump.
+
+def parse_fields(raw, schema_cls):
+    """Requested field names as a tuple, or None when `fields` is not given.
+
+    Raises ValueError for names the schema does not dump.
+    """
+    if raw is None:
+        return None
+    names = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    dumpable = {name for name, field in schema_for(schema_cls).fields.items() if not field.load_only}
+    unknown = [name for name in names if name not in dumpable]
+    if not names:
+        raise ValueError("fields must name at least one field")
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def projection_for(fields, sort_spec=()):
+    """Mongo projection for `fields` plus the sort keys paging relies on."""
+    projection = {name: 1 for name in fields}
+    for key, _ in sort_spec:
+        if key != "score":
+            projection[key] = 1
+    if "_id" not in projection:
+        projection["_id"] = 0
+    return projection
+
+
+@lru_cache(maxsize=256)
+def schema_for(schema_cls, fields=None):
+    """Shared schema instance limited to `fields` (all fields when None)."""
+    return schema_cls(only=fields) if fields else schema_cls()
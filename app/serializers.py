@@ -0,0 +1,133 @@
+import json
+from functools import lru_cache
+import click
+from flask.cli import with_appcontext
+from marshmallow import fields, missing
+from marshmallow.utils import ensure_text_type
+from .projection import schema_for
+
+
+# Compiled dump functions: for each (schema, fields) pair the field loop of
+# Schema.dump is turned into straight-line Python once, so a listing of N
+# documents costs N plain function calls instead of N x fields Field.serialize
+# calls. Only field types whose dump behaviour is known exactly are inlined;
+# anything else calls the field's own _serialize, and schemas with dump hooks
+# or dotted attributes are not compiled at all (Schema.dump is used as is).
+
+def _inline(field, var, ns, attr):
+    """Python expression that serializes `var` the way `field` would."""
+    cls = type(field)
+    if cls._serialize is fields.String._serialize:
+        ns["_text"] = ensure_text_type
+        return f"(None if {var} is None else {var} if {var}.__class__ is str else _text({var}))"
+    if (isinstance(field, fields.Number) and not field.as_string
+            and cls._serialize is fields.Number._serialize
+            and cls._format_num is fields.Number._format_num):
+        name = f"_num_{len(ns)}"
+        ns[name] = field.num_type
+        return f"(None if {var} is None else {name}({var}))"
+    if (cls._serialize is fields.DateTime._serialize
+            and (field.format or field.DEFAULT_FORMAT) in ("iso", "iso8601")):
+        return f"(None if {var} is None else {var}.isoformat())"
+    if cls._serialize is fields.Field._serialize:
+        return var
+    if cls._serialize is fields.List._serialize:
+        inner = _inline(field.inner, "x", ns, attr)
+        return f"(None if {var} is None else [{inner} for x in {var}])"
+    name = f"_field_{len(ns)}"
+    ns[name] = field
+    return f"{name}._serialize({var}, {attr!r}, obj)"
+
+
+def compile_dump(schema):
+    """Single-document dump function equivalent to `schema.dump` for dicts.
+
+    Returns None when the schema cannot be compiled safely.
+    """
+    if schema._hooks["pre_dump"] or schema._hooks["post_dump"]:
+        return None
+
+    ns = {"MISSING": missing}
+    lines = ["def dump(obj):", "    get = obj.get", "    out = {}"]
+    for attr_name, field in schema.dump_fields.items():
+        attr = field.attribute or attr_name
+        if "." in attr or not field._CHECK_ATTRIBUTE:
+            return None
+        key = field.data_key if field.data_key is not None else attr_name
+        expr = _inline(field, "v", ns, attr)
+        lines.append(f"    v = get({attr!r}, MISSING)")
+        if field.dump_default is missing:
+            lines.append("    if v is not MISSING:")
+            lines.append(f"        out[{key!r}] = {expr}")
+        else:
+            default = f"_default_{len(ns)}"
+            ns[default] = field.dump_default
+            call = "()" if callable(field.dump_default) else ""
+            lines.append("    if v is MISSING:")
+            lines.append(f"        v = {default}{call}")
+            lines.append(f"    out[{key!r}] = {expr}")
+    lines.append("    return out")
+
+    exec(compile("\n".join(lines), f"<dump {type(schema).__name__}>", "exec"), ns)
+    return ns["dump"]
+
+
+class CompiledSerializer:
+    """Drop-in for `schema.dump` backed by a compiled dump function."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._dump = compile_dump(schema)
+
+    def dump(self, obj, many=None):
+        many = self.schema.many if many is None else bool(many)
+        dump = self._dump
+        if dump is None or obj is None:
+            return self.schema.dump(obj, many=many)
+        if many:
+            return [dump(doc) if isinstance(doc, dict) else self.schema.dump(doc) for doc in obj]
+        return dump(obj) if isinstance(obj, dict) else self.schema.dump(obj)
+
+
+@lru_cache(maxsize=256)
+def serializer_for(schema_cls, fields=None):
+    """Shared compiled serializer for `schema_for(schema_cls, fields)`."""
+    return CompiledSerializer(schema_for(schema_cls, fields))
+
+
+def check_parity(schema_cls, docs, fields=None):
+    """Compare compiled output with marshmallow's for `docs`.
+
+    Returns a list of (index, expected, got) for every document that differs.
+    Schemas with callable dump defaults (e.g. a timestamp) only compare
+    equal when the field is present in the document.
+    """
+    schema = schema_for(schema_cls, fields)
+    serializer = serializer_for(schema_cls, fields)
+    mismatches = []
+    for i, doc in enumerate(docs):
+        expected, got = schema.dump(doc), serializer.dump(doc)
+        if expected != got or list(expected) != list(got):
+            mismatches.append((i, expected, got))
+    return mismatches
+
+
+@click.command("check-serializers")
+@click.option("--sample", default=500, show_default=True, help="Documents sampled per collection.")
+@with_appcontext
+def check_serializers_command(sample):
+    """Check compiled serializers against marshmallow on live documents."""
+    from .extensions import mongo
+    from .modules.products.schema import ProductSchema
+    from .modules.brands.schema import BrandSchema
+
+    failed = False
+    for name, schema_cls in (("products", ProductSchema), ("brands", BrandSchema)):
+        docs = list(mongo.db[name].aggregate([{"$sample": {"size": sample}}]))
+        mismatches = check_parity(schema_cls, docs)
+        click.echo(f"{name}: {len(docs)} checked, {len(mismatches)} mismatched")
+        for i, expected, got in mismatches[:5]:
+            click.echo(json.dumps({"expected": expected, "got": got}, default=str, indent=2))
+        failed = failed or bool(mismatches)
+    if failed:
+        raise SystemExit(1)
@@ -0,0 +1,278 @@
+import codecs
+import csv
+import io
+import json
+from flask import Response, current_app, stream_with_context
+
+
+# Streaming helpers for request bodies too large to load in one go.
+
+_decoder = json.JSONDecoder()
+
+# Records bigger than this are rejected rather than buffered
+MAX_RECORD_SIZE = 1024 * 1024
+
+
+class JSONRecordParser:
+    """Incremental parser for an NDJSON or JSON array body.
+
+    `feed(chunk)` takes the body bytes as they arrive and returns the
+    (line, record, error) tuples completed so far; `close()` returns the
+    rest once the body has ended. The format is picked from the first
+    non-whitespace byte: `[` means a JSON array, anything else is read as
+    NDJSON. `line` is the 1-based line number (NDJSON) or element position
+    (array). Exactly one of `record` and `error` is set. Only one record (or
+    one chunk) is held in memory at a time; a record over `max_record_size`
+    is reported as an error (NDJSON skips to the next line, an array cannot
+    be resynchronised and stops there). `done` is set once nothing more will
+    be parsed (end of the array), so the caller can stop reading.
+
+    Being push-based, the same parser serves the WSGI request stream
+    (iter_json_records) and Quart's async request body (aiter_json_records).
+    """
+
+    def __init__(self, max_record_size=MAX_RECORD_SIZE):
+        self.max_record_size = max_record_size
+        self.done = False
+        self._mode = None  # "lines" or "array" once the first byte is known
+        self._head = b""
+        # NDJSON
+        self._pending = b""
+        self._line_no = 0
+        self._skipping = False
+        # JSON array
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._position = 0
+
+    def feed(self, chunk):
+        if self.done or not chunk:
+            return []
+        if self._mode is None:
+            self._head += chunk
+            stripped = self._head.lstrip()
+            if not stripped:
+                return []
+            if stripped[:1] == b"[":
+                self._mode = "array"
+                chunk = stripped[1:]
+            else:
+                self._mode = "lines"
+                chunk = self._head
+            self._head = b""
+        if self._mode == "array":
+            self._buf += self._text.decode(chunk)
+            return self._parse_array(eof=False)
+        return self._parse_lines(chunk)
+
+    def close(self):
+        if self.done or self._mode is None:
+            self.done = True
+            return []
+        if self._mode == "array":
+            self._buf += self._text.decode(b"", final=True)
+            out = self._parse_array(eof=True)
+        else:
+            out = []
+            if self._pending and not self._skipping:
+                out = self._line(self._pending)
+        self.done = True
+        return out
+
+    # --- NDJSON ---
+
+    def _oversized(self):
+        self._line_no += 1
+        return [(self._line_no, None, f"Record exceeds {self.max_record_size} bytes")]
+
+    def _line(self, line):
+        if len(line.rstrip(b"\n")) > self.max_record_size:
+            return self._oversized()
+        self._line_no += 1
+        if not line.strip():
+            return []
+        try:
+            return [(self._line_no, json.loads(line), None)]
+        except ValueError as e:
+            return [(self._line_no, None, f"Invalid JSON: {e}")]
+
+    def _parse_lines(self, chunk):
+        out = []
+        data = self._pending + chunk
+        start = 0
+        while True:
+            end = data.find(b"\n", start)
+            if end == -1:
+                break
+            if self._skipping:
+                # Rest of an oversized line, already reported
+                self._skipping = False
+            else:
+                out += self._line(data[start:end + 1])
+            start = end + 1
+        self._pending = b"" if self._skipping else data[start:]
+        if len(self._pending) > self.max_record_size:
+            # Drain the rest of the oversized line without keeping it
+            out += self._oversized()
+            self._pending = b""
+            self._skipping = True
+        return out
+
+    # --- JSON array ---
+
+    def _parse_array(self, eof):
+        out = []
+        while not self.done:
+            self._buf = self._buf.lstrip()
+            buf = self._buf
+            if not buf:
+                if eof:
+                    out.append((self._position + 1, None, "Unexpected end of JSON array"))
+                    self.done = True
+                break
+            if buf[0] == "]":
+                self.done = True
+                break
+            if buf[0] == "," and self._position:
+                self._buf = buf[1:]
+                continue
+
+            try:
+                record, end = _decoder.raw_decode(buf)
+            except ValueError as e:
+                if eof:
+                    out.append((self._position + 1, None, f"Invalid JSON: {e}"))
+                    self.done = True
+                elif len(buf) > self.max_record_size:
+                    out.append((self._position + 1, None, f"Record exceeds {self.max_record_size} bytes"))
+                    self.done = True
+                break
+            if end > self.max_record_size:
+                out.append((self._position + 1, None, f"Record exceeds {self.max_record_size} bytes"))
+                self.done = True
+                break
+
+            # A value cut off at a chunk boundary can still parse (e.g. `12` of
+            # `123`), so only accept it once the next delimiter has been read
+            if not buf[end:].strip() and not eof:
+                break
+
+            self._position += 1
+            self._buf = buf[end:]
+            out.append((self._position, record, None))
+        return out
+
+
+def iter_json_records(stream, chunk_size=64 * 1024, max_record_size=MAX_RECORD_SIZE):
+    """Yield (line, record, error) for each record of an NDJSON or JSON array
+    body read from the file-like `stream` (see JSONRecordParser)."""
+    parser = JSONRecordParser(max_record_size)
+    while not parser.done:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_json_records(chunks, max_record_size=MAX_RECORD_SIZE):
+    """iter_json_records for an async iterable of body chunks (Quart's request.body)."""
+    parser = JSONRecordParser(max_record_size)
+    async for chunk in chunks:
+        for result in parser.feed(chunk):
+            yield result
+        if parser.done:
+            break
+    for result in parser.close():
+        yield result
+
+
+# Streaming response bodies: documents are pulled from a cursor and written
+# out in chunks of `batch_size`, so memory stays flat whatever the result size.
+
+STREAM_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class _Encoder:
+    """Turns documents into the text parts of one STREAM_FORMATS body.
+
+    `head()`, `part(doc)` per document and `tail()`, so the sync and async
+    response generators below share the encoding.
+    """
+
+    def __init__(self, fmt, dump, dumps, columns=None):
+        self.fmt = fmt
+        self.dump = dump
+        self.dumps = dumps
+        self.columns = columns
+        self._count = 0
+        if fmt == "csv":
+            self._out = io.StringIO()
+            self._writer = csv.writer(self._out)
+
+    def _csv_row(self, row):
+        self._writer.writerow(row)
+        value = self._out.getvalue()
+        self._out.seek(0)
+        self._out.truncate()
+        return value
+
+    def head(self):
+        if self.fmt == "csv":
+            return self._csv_row(self.columns)
+        return "[" if self.fmt == "json" else ""
+
+    def part(self, doc):
+        row = self.dump(doc)
+        self._count += 1
+        if self.fmt == "csv":
+            return self._csv_row(
+                "|".join(str(v) for v in value) if isinstance(value, list) else value
+                for value in (row.get(column) for column in self.columns)
+            )
+        if self.fmt == "ndjson":
+            return self.dumps(row) + "\n"
+        return ("," if self._count > 1 else "") + self.dumps(row)
+
+    def tail(self):
+        return "]" if self.fmt == "json" else ""
+
+
+def iter_stream(docs, encoder, batch_size):
+    """Body chunks for `docs`, `batch_size` documents per chunk."""
+    buf = [encoder.head()]
+    for doc in docs:
+        buf.append(encoder.part(doc))
+        if len(buf) >= batch_size:
+            yield "".join(buf)
+            buf = []
+    buf.append(encoder.tail())
+    yield "".join(buf)
+
+
+async def aiter_stream(docs, encoder, batch_size):
+    """iter_stream for an async cursor (ASGI app)."""
+    buf = [encoder.head()]
+    async for doc in docs:
+        buf.append(encoder.part(doc))
+        if len(buf) >= batch_size:
+            yield "".join(buf)
+            buf = []
+    buf.append(encoder.tail())
+    yield "".join(buf)
+
+
+def stream_response(docs, dump, fmt, columns=None, filename=None, batch_size=500):
+    """Chunked response for `docs` in one of STREAM_FORMATS.
+
+    `dump` turns a document into a dict; `columns` is required for CSV.
+    """
+    encoder = _Encoder(fmt, dump, current_app.json.dumps, columns)
+    response = Response(stream_with_context(iter_stream(docs, encoder, batch_size)), mimetype=STREAM_FORMATS[fmt])
+    if filename:
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,4 @@
+from app.asgi import create_async_app
+
+# ASGI entry point: hypercorn asgi:app  (or uvicorn asgi:app)
+app = create_async_app("development")
@@ -0,0 +1,135 @@
+import itertools
+import random
+import uuid
+from datetime import datetime, timedelta
+
+
+# Seeded synthetic catalog. The same seed and sizes always produce the same
+# documents, so runs against different commits query identical data.
+
+# Category -> (share of products, median price, price spread)
+CATEGORIES = {
+    "Fashion": (0.30, 1200, 0.8),
+    "Electronics": (0.15, 8000, 1.1),
+    "Grocery": (0.20, 150, 0.6),
+    "Beauty": (0.15, 600, 0.7),
+    "Sports": (0.12, 2000, 0.9),
+    "Other": (0.08, 500, 1.0),
+}
+
+ADJECTIVES = [
+    "classic", "slim", "organic", "wireless", "premium", "compact", "vintage",
+    "smart", "eco", "ultra", "soft", "rugged", "deluxe", "mini", "pro",
+]
+NOUNS = {
+    "Fashion": ["shirt", "jacket", "sneaker", "saree", "kurta", "jeans", "scarf"],
+    "Electronics": ["headphones", "charger", "speaker", "watch", "keyboard", "camera"],
+    "Grocery": ["tea", "rice", "honey", "spice", "coffee", "oil", "lentils"],
+    "Beauty": ["serum", "lipstick", "cream", "shampoo", "perfume", "sunscreen"],
+    "Sports": ["racket", "ball", "mat", "bottle", "gloves", "helmet"],
+    "Other": ["lamp", "notebook", "planter", "mug", "backpack", "candle"],
+}
+TAGS = ["new", "sale", "bestseller", "handmade", "limited", "gift", "eco"]
+
+EPOCH = datetime(2024, 1, 1)
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _timestamp(rng, days=730):
+    return EPOCH + timedelta(seconds=rng.randrange(days * 86400), milliseconds=rng.randrange(1000))
+
+
+def generate_brands(count, seed=42):
+    rng = random.Random(f"{seed}:brands")
+    for i in range(count):
+        created = _timestamp(rng)
+        yield {
+            "brand_id": _uuid(rng),
+            "brand_name": f"Brand {i:05d}",
+            "email": f"brand{i}@example.com",
+            "phone_number": f"9{rng.randrange(10**9):09d}",
+            "brand_logo": f"https://cdn.example.com/brands/{i}.png",
+            "brand_description": f"Synthetic brand number {i}",
+            "documents": [],
+            "verification_status": rng.choices(["Verified", "Pending", "Rejected"], [0.7, 0.25, 0.05])[0],
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def generate_products(count, brand_ids, seed=42):
+    """Products spread over `brand_ids` with a long tail (a few big brands)."""
+    rng = random.Random(f"{seed}:products")
+    names = list(CATEGORIES)
+    shares = list(itertools.accumulate(CATEGORIES[c][0] for c in names))
+    # Pareto weights: brand popularity follows a power law
+    weights = list(itertools.accumulate(rng.paretovariate(1.2) for _ in brand_ids))
+    for i in range(count):
+        category = rng.choices(names, cum_weights=shares)[0]
+        _, median, spread = CATEGORIES[category]
+        created = _timestamp(rng)
+        # 8% out of stock, otherwise mostly small quantities
+        stock = 0 if rng.random() < 0.08 else int(rng.expovariate(1 / 40)) + 1
+        yield {
+            "product_id": _uuid(rng),
+            "brand_id": rng.choices(brand_ids, cum_weights=weights)[0],
+            "product_name": f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS[category])} {i}",
+            "description": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS[category])} from the synthetic catalog",
+            "price": round(rng.lognormvariate(0, spread) * median, 2),
+            "category": category,
+            "images": [f"https://cdn.example.com/products/{i}/{n}.jpg" for n in range(rng.randint(1, 4))],
+            "stock": stock,
+            "featured": rng.random() < 0.05,
+            "rating": round(min(5.0, max(0.0, rng.gauss(3.9, 0.7))), 1),
+            "tags": rng.sample(TAGS, rng.randint(0, 3)),
+            "created_at": created,
+            "updated_at": created + timedelta(days=rng.randrange(30)),
+        }
+
+
+def _batches(docs, size):
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _reservoir(rng, sample, seen, value, size):
+    if len(sample) < size:
+        sample.append(value)
+    else:
+        j = rng.randrange(seen)
+        if j < size:
+            sample[j] = value
+
+
+def seed_catalog(db, brands=200, products=10000, seed=42, batch_size=5000, sample_size=1000):
+    """Replace the brands/products collections with a generated catalog.
+
+    Documents are written in batches, so millions of products never sit in
+    memory at once. Returns a reservoir sample of ids for request generation.
+    """
+    db.brands.delete_many({})
+    db.products.delete_many({})
+
+    brand_ids = []
+    for batch in _batches(generate_brands(brands, seed), batch_size):
+        db.brands.insert_many(batch, ordered=False)
+        brand_ids.extend(b["brand_id"] for b in batch)
+
+    rng = random.Random(f"{seed}:sample")
+    product_ids, seen = [], 0
+    for batch in _batches(generate_products(products, brand_ids, seed), batch_size):
+        db.products.insert_many(batch, ordered=False)
+        for p in batch:
+            seen += 1
+            _reservoir(rng, product_ids, seen, p["product_id"], sample_size)
+
+    return {"brand_ids": brand_ids[:sample_size], "product_ids": product_ids}
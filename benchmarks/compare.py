@@ -0,0 +1,54 @@
+import json
+import sys
+
+
+# Side-by-side view of two benchmark result files:
+#   python -m benchmarks.compare baseline.json candidate.json
+# Negative latency changes and positive throughput changes are improvements.
+
+ROUTE_METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(old, new):
+    if old in (None, 0) or new is None:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def compare(baseline, candidate):
+    lines = []
+    for key in ("commit", "backend", "products", "concurrency"):
+        lines.append(f"{key}: {baseline['meta'].get(key)} -> {candidate['meta'].get(key)}")
+
+    lines.append("")
+    lines.append(f"{'route':<32}" + "".join(f"{m:>22}" for m in ROUTE_METRICS))
+    for name, new in candidate["routes"].items():
+        old = baseline["routes"].get(name)
+        if not old or "skipped" in old or "skipped" in new:
+            continue
+        cells = [f"{old[m]}->{new[m]} ({_change(old[m], new[m])})" for m in ROUTE_METRICS]
+        lines.append(f"{name:<32}" + "".join(f"{c:>22}" for c in cells))
+
+    if baseline.get("micro") and candidate.get("micro"):
+        lines.append("")
+        lines.append(f"{'micro (median us/call)':<32}{'':>22}")
+        for name, new in candidate["micro"].items():
+            old = baseline["micro"].get(name)
+            if old:
+                lines.append(f"{name:<32}{old['median_us']:>12} -> {new['median_us']:<10} {_change(old['median_us'], new['median_us'])}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        sys.exit("usage: python -m benchmarks.compare BASELINE.json CANDIDATE.json")
+    with open(argv[0]) as f:
+        baseline = json.load(f)
+    with open(argv[1]) as f:
+        candidate = json.load(f)
+    print(compare(baseline, candidate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import statistics
+import timeit
+from .catalog import generate_brands, generate_products
+
+
+# Micro-benchmarks for the per-document serialization work behind every
+# listing: marshmallow load/dump, the compiled serializers and JSON encoding.
+
+def _measure(fn, number, repeat=5):
+    runs = [t / number for t in timeit.repeat(fn, number=number, repeat=repeat)]
+    best, median = min(runs), statistics.median(runs)
+    return {"best_us": round(best * 1e6, 2), "median_us": round(median * 1e6, 2), "ops_per_sec": round(1 / median, 1)}
+
+
+def run_micro(app, size=1000, number=20, seed=42):
+    from flask_pymongo.helpers import BSONProvider
+    from app.json_provider import FastJSONProvider
+    from app.modules.products.schema import ProductSchema
+    from app.modules.brands.schema import BrandSchema
+    from app.projection import schema_for
+    from app.serializers import serializer_for
+
+    brands = list(generate_brands(max(1, size // 10), seed))
+    products = list(generate_products(size, [b["brand_id"] for b in brands], seed))
+    payloads = [{k: v for k, v in p.items() if k not in ("product_id", "created_at", "updated_at")} for p in products]
+
+    product_schema = schema_for(ProductSchema)
+    product_fields = ("product_id", "product_name", "price")
+    dumped = product_schema.dump(products, many=True)
+    bson_json, fast_json = BSONProvider(app), FastJSONProvider(app)
+    body = bson_json.dumps(dumped)
+
+    cases = {
+        "product.load": lambda: product_schema.load(payloads, many=True),
+        "product.dump.marshmallow": lambda: product_schema.dump(products, many=True),
+        "product.dump.compiled": lambda: serializer_for(ProductSchema).dump(products, many=True),
+        "product.dump_fields.marshmallow": lambda: schema_for(ProductSchema, product_fields).dump(products, many=True),
+        "product.dump_fields.compiled": lambda: serializer_for(ProductSchema, product_fields).dump(products, many=True),
+        "brand.dump.marshmallow": lambda: schema_for(BrandSchema).dump(brands, many=True),
+        "brand.dump.compiled": lambda: serializer_for(BrandSchema).dump(brands, many=True),
+        "json.dumps.bson": lambda: bson_json.dumps(dumped),
+        "json.dumps.fast": lambda: fast_json.dumps(dumped),
+        "json.loads.bson": lambda: bson_json.loads(body),
+        "json.loads.fast": lambda: fast_json.loads(body),
+    }
+    # Timings are per call, each call handling `size` documents
+    return {
+        name: {"documents": len(brands) if name.startswith("brand") else size, **_measure(fn, number)}
+        for name, fn in cases.items()
+    }
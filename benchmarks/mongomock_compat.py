@@ -0,0 +1,51 @@
+from pymongo import InsertOne, UpdateOne, UpdateMany, ReplaceOne, DeleteOne, DeleteMany
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.results import BulkWriteResult
+
+
+# mongomock's Collection.bulk_write passes request objects to its own bulk
+# builder, which rejects the `sort` argument current pymongo's UpdateOne /
+# ReplaceOne hand it. The benchmark backend replays the requests through the
+# single-document methods instead; results and write errors keep the shape
+# bulk_write reports.
+
+def _bulk_write(self, requests, ordered=True, **kwargs):
+    result = {
+        "nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0,
+        "nUpserted": 0, "upserted": [], "writeErrors": [], "writeConcernErrors": [],
+    }
+    for index, request in enumerate(requests):
+        try:
+            if isinstance(request, InsertOne):
+                self.insert_one(request._doc)
+                result["nInserted"] += 1
+                continue
+            if isinstance(request, (DeleteOne, DeleteMany)):
+                delete = self.delete_one if isinstance(request, DeleteOne) else self.delete_many
+                result["nRemoved"] += delete(request._filter).deleted_count
+                continue
+            if isinstance(request, ReplaceOne):
+                res = self.replace_one(request._filter, request._doc, upsert=request._upsert)
+            elif isinstance(request, UpdateOne):
+                res = self.update_one(request._filter, request._doc, upsert=request._upsert)
+            elif isinstance(request, UpdateMany):
+                res = self.update_many(request._filter, request._doc, upsert=request._upsert)
+            else:
+                raise TypeError(f"Unsupported bulk request {request!r}")
+            result["nMatched"] += res.matched_count
+            result["nModified"] += res.modified_count
+            if res.upserted_id is not None:
+                result["nUpserted"] += 1
+                result["upserted"].append({"index": index, "_id": res.upserted_id})
+        except DuplicateKeyError as e:
+            result["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e)})
+            if ordered:
+                break
+    if result["writeErrors"]:
+        raise BulkWriteError(result)
+    return BulkWriteResult(result, True)
+
+
+def patch_mongomock():
+    import mongomock.collection
+    mongomock.collection.Collection.bulk_write = _bulk_write
@@ -0,0 +1,226 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from .catalog import seed_catalog
+from .micro import run_micro
+from .mongomock_compat import patch_mongomock
+from .scenarios import SCENARIOS, Context
+
+
+# Benchmark runner: seeds a catalog, drives every brands/products route through
+# create_app's test client and writes throughput/latency figures as JSON.
+#
+#   python -m benchmarks.run                       # in-process mongomock
+#   python -m benchmarks.run --backend mongod --uri mongodb://localhost:27017/bench \
+#       --products 1000000 --requests 500 --concurrency 8
+#
+# Compare two runs with `python -m benchmarks.compare old.json new.json`.
+#
+# A scenario answering with 5xx, or 4xx unless --allow-errors, aborts the
+# run: its latencies would measure the error path, not the route.
+
+BLUEPRINTS = ("brands_bp", "products")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies, errors, statuses, wall):
+    latencies = sorted(latencies)
+    ms = lambda v: round(v * 1000, 3) if v is not None else None
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else None,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+    }
+
+
+class ScenarioFailed(Exception):
+    pass
+
+
+def run_scenario(app, scenario, ctx, requests, warmup, concurrency, allow_errors=False):
+    if "setup" in scenario:
+        scenario["setup"](ctx, requests + warmup)
+
+    def call(client):
+        method, url, kwargs = scenario["build"](ctx)
+        start = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        body = response.get_data()  # drains streamed bodies too
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 500 or (response.status_code >= 400 and not allow_errors):
+            raise ScenarioFailed(f"{scenario['name']}: {method} {url} -> {response.status_code} {body[:300]!r}")
+        return elapsed, response.status_code
+
+    warm = app.test_client()
+    for _ in range(warmup):
+        call(warm)
+
+    def worker(count):
+        client = app.test_client()
+        return [call(client) for _ in range(count)]
+
+    shares = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [r for chunk in pool.map(worker, shares) for r in chunk]
+    wall = time.perf_counter() - start
+
+    statuses = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(1 for _, status in results if status >= 400)
+    return summarize([latency for latency, _ in results], errors, statuses, wall)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def build_app(args):
+    # Config classes read the environment at import time, so set it first
+    os.environ["CACHE_BACKEND"] = args.cache
+    os.environ["JSON_PROVIDER"] = args.json_provider
+    # Measure the routes, not load shedding (--admission keeps it on)
+    os.environ["ADMISSION_ENABLED"] = "true" if args.admission else "false"
+    if args.backend == "mongomock":
+        os.environ["MONGO_URI"] = "mongodb://localhost:27017/bench"
+        os.environ["ENSURE_INDEXES"] = "false"
+    else:
+        os.environ["MONGO_URI"] = args.uri
+        os.environ["ENSURE_INDEXES"] = "false"  # created after seeding
+
+    from app import create_app
+    from app.extensions import mongo
+
+    app = create_app(args.config)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.backend == "mongomock":
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("--backend mongomock needs the mongomock package (pip install mongomock)")
+        patch_mongomock()
+        mongo.cx = mongomock.MongoClient()
+        mongo.db = mongo.cx["bench"]
+    return app, mongo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the brands/products API.")
+    parser.add_argument("--backend", choices=("mongomock", "mongod"), default="mongomock")
+    parser.add_argument("--uri", default="mongodb://localhost:27017/bench", help="mongod URI (its database is wiped)")
+    parser.add_argument("--config", default="production")
+    parser.add_argument("--brands", type=int, default=200)
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--cache", default="memory", help="CACHE_BACKEND for the run")
+    parser.add_argument("--json-provider", default="fast", help="JSON_PROVIDER for the run")
+    parser.add_argument("--admission", action="store_true", help="keep admission control (load shedding) on")
+    parser.add_argument("--allow-errors", action="store_true", help="record 4xx responses instead of aborting")
+    parser.add_argument("--only", help="comma-separated scenario names")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    app, mongo = build_app(args)
+
+    print(f"Seeding {args.brands} brands / {args.products} products (seed {args.seed})...")
+    started = time.perf_counter()
+    ids = seed_catalog(mongo.db, brands=args.brands, products=args.products, seed=args.seed)
+    # Seeding bypasses the models, so build the catalog stats it would have kept
+    from app.modules.products.stats import ProductStats
+    with app.app_context():
+        ProductStats.rebuild()
+    seed_seconds = round(time.perf_counter() - started, 2)
+    if args.backend == "mongod":
+        from app.indexes import reconcile_indexes, log_report
+        log_report(reconcile_indexes(mongo.db))
+
+    ctx = Context(mongo.db, ids, args.seed)
+    only = set(args.only.split(",")) if args.only else None
+    routes = {}
+    for scenario in SCENARIOS:
+        if only and scenario["name"] not in only:
+            continue
+        if args.backend not in scenario.get("backends", (args.backend,)):
+            routes[scenario["name"]] = {"endpoint": scenario["endpoint"], "skipped": f"needs {', '.join(scenario['backends'])}"}
+            continue
+        try:
+            result = run_scenario(app, scenario, ctx, args.requests, args.warmup, args.concurrency, args.allow_errors)
+        except ScenarioFailed as e:
+            sys.exit(f"Benchmark aborted, error response in scenario {e}")
+        routes[scenario["name"]] = {"endpoint": scenario["endpoint"], **result}
+        print(f"{scenario['name']:<32} {result['throughput_rps']:>9} req/s  "
+              f"p50 {result['p50_ms']}ms  p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms  errors {result['errors']}")
+
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules() if rule.endpoint.split(".")[0] in BLUEPRINTS}
+    uncovered = sorted(endpoints - {s["endpoint"] for s in SCENARIOS})
+    if uncovered:
+        print(f"Routes without a scenario: {', '.join(uncovered)}")
+
+    micro = {} if args.skip_micro else run_micro(app, seed=args.seed)
+    for name, m in micro.items():
+        print(f"{name:<32} {m['median_us']:>12} us/call ({m['documents']} docs)")
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "config": args.config,
+            "cache": args.cache,
+            "json_provider": args.json_provider,
+            "admission": args.admission,
+            "seed": args.seed,
+            "brands": args.brands,
+            "products": args.products,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "seed_seconds": seed_seconds,
+        },
+        "routes": routes,
+        "uncovered_routes": uncovered,
+        "micro": micro,
+    }
+    output = args.output or os.path.join(
+        "benchmarks", "results", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import json
+import random
+from .catalog import CATEGORIES, NOUNS, generate_products
+
+
+# One entry per benchmarked request. `build(ctx)` returns (method, url, kwargs
+# for the test client); `setup(ctx, count)` runs once before timing when a
+# scenario consumes data (deletes). `backends` limits where it can run, e.g.
+# $text search needs a real mongod.
+
+class Context:
+    """Ids and a seeded RNG shared by the scenarios of one run."""
+
+    def __init__(self, db, ids, seed):
+        self.db = db
+        self.rng = random.Random(f"{seed}:requests")
+        self.brand_ids = ids["brand_ids"]
+        self.product_ids = ids["product_ids"]
+        self.seed = seed
+        self.disposable = []
+        self._generated = 0
+
+    def brand_id(self):
+        return self.rng.choice(self.brand_ids)
+
+    def product_id(self):
+        return self.rng.choice(self.product_ids)
+
+    def new_products(self, count):
+        """Fresh, valid product payloads (no ids) that never repeat in a run."""
+        self._generated += 1
+        docs = generate_products(count, self.brand_ids, seed=f"{self.seed}:extra:{self._generated}")
+        return [{k: v for k, v in d.items() if k not in ("product_id", "created_at", "updated_at")} for d in docs]
+
+    def fill_disposable(self, count):
+        docs = list(generate_products(count, self.brand_ids, seed=f"{self.seed}:disposable:{len(self.disposable)}"))
+        self.db.products.insert_many(docs)
+        self.disposable.extend(d["product_id"] for d in docs)
+
+
+def _word(ctx):
+    return ctx.rng.choice(NOUNS[ctx.rng.choice(list(NOUNS))])
+
+
+def _category(ctx):
+    return ctx.rng.choice(list(CATEGORIES))
+
+
+def _new_brand(ctx):
+    n = ctx.rng.getrandbits(48)
+    return {
+        "brand_name": f"Bench brand {n}",
+        "email": f"bench{n}@example.com",
+        "phone_number": f"8{n % 10**9:09d}",
+    }
+
+
+def _product_ids(ctx, count=20):
+    return ctx.rng.sample(ctx.product_ids, min(count, len(ctx.product_ids)))
+
+
+def _brand_ids(ctx, count=10):
+    return ctx.rng.sample(ctx.brand_ids, min(count, len(ctx.brand_ids)))
+
+
+def _bulk_import(ctx):
+    body = "\n".join(json.dumps(p) for p in ctx.new_products(100))
+    return "POST", "/api/products/bulk", {"data": body, "content_type": "application/x-ndjson"}
+
+
+def _bulk_update(ctx):
+    ops = [{"product_id": ctx.product_id(), "inc": {"stock": 1}} for _ in range(50)]
+    return "POST", "/api/products/bulk/update", {"json": {"operations": ops}}
+
+
+def _bulk_delete(ctx):
+    ids = [ctx.disposable.pop() for _ in range(min(50, len(ctx.disposable)))]
+    return "POST", "/api/products/bulk/delete", {"json": {"operations": [{"filter": {"product_ids": ids}}]}}
+
+
+SCENARIOS = [
+    # brands_bp
+    {"name": "brands.list", "endpoint": "brands_bp.list_brands",
+     "build": lambda ctx: ("GET", "/api/brands/", {})},
+    {"name": "brands.get", "endpoint": "brands_bp.get_by_id",
+     "build": lambda ctx: ("GET", f"/api/brands/{ctx.brand_id()}", {})},
+    {"name": "brands.batch", "endpoint": "brands_bp.batch",
+     "build": lambda ctx: ("GET", f"/api/brands/batch?ids={','.join(_brand_ids(ctx))}", {})},
+    {"name": "brands.stats", "endpoint": "brands_bp.brand_stats",
+     "build": lambda ctx: ("GET", f"/api/brands/{ctx.brand_id()}/stats", {})},
+    {"name": "brands.create", "endpoint": "brands_bp.new_brand",
+     "build": lambda ctx: ("POST", "/api/brands/", {"json": _new_brand(ctx)})},
+    {"name": "brands.update", "endpoint": "brands_bp.update_details",
+     "build": lambda ctx: ("POST", f"/api/brands/{ctx.brand_id()}/update",
+                           {"json": {"brand_description": f"updated {ctx.rng.random()}"}})},
+
+    # products_bp: reads
+    {"name": "products.list", "endpoint": "products.get_products",
+     "build": lambda ctx: ("GET", f"/api/products?page={ctx.rng.randint(1, 20)}&limit=20&sort=price_asc", {})},
+    {"name": "products.list_cursor", "endpoint": "products.get_products",
+     "build": lambda ctx: ("GET", "/api/products?cursor=&limit=20", {})},
+    {"name": "products.list_fields", "endpoint": "products.get_products",
+     "build": lambda ctx: ("GET", "/api/products?limit=20&fields=product_id,product_name,price", {})},
+    {"name": "products.get", "endpoint": "products.get_product",
+     "build": lambda ctx: ("GET", f"/api/products/{ctx.product_id()}", {})},
+    {"name": "products.batch", "endpoint": "products.get_batch",
+     "build": lambda ctx: ("GET", f"/api/products/batch?ids={','.join(_product_ids(ctx))}", {})},
+    {"name": "products.batch_post", "endpoint": "products.get_batch",
+     "build": lambda ctx: ("POST", "/api/products/batch",
+                           {"json": {"ids": _product_ids(ctx, 100)}})},
+    {"name": "products.stats", "endpoint": "products.stats",
+     "build": lambda ctx: ("GET", "/api/products/stats", {})},
+    {"name": "products.by_brand", "endpoint": "products.brand_products",
+     "build": lambda ctx: ("GET", f"/api/products/brand/{ctx.brand_id()}", {})},
+    {"name": "products.by_category", "endpoint": "products.product_by_category",
+     "build": lambda ctx: ("GET", f"/api/products/category/{_category(ctx)}?fields=product_id,price", {})},
+    {"name": "products.by_category_stream", "endpoint": "products.product_by_category",
+     "build": lambda ctx: ("GET", f"/api/products/category/{_category(ctx)}?stream=ndjson", {})},
+    {"name": "products.search_text", "endpoint": "products.search", "backends": ("mongod",),
+     "build": lambda ctx: ("GET", f"/api/products/search?q={_word(ctx)}&mode=text&limit=20", {})},
+    {"name": "products.search_regex", "endpoint": "products.search",
+     "build": lambda ctx: ("GET", f"/api/products/search?q={_word(ctx)}&mode=regex&limit=20&in_stock=true", {})},
+    {"name": "products.search_facets", "endpoint": "products.search",
+     "build": lambda ctx: ("GET", f"/api/products/search?category={_category(ctx)}&facets=true&limit=20", {})},
+    {"name": "products.recent", "endpoint": "products.get_recent",
+     "build": lambda ctx: ("GET", "/api/products/recent?limit=10", {})},
+
+    # products_bp: writes
+    {"name": "products.create", "endpoint": "products.add_product",
+     "build": lambda ctx: ("POST", "/api/products/new", {"json": ctx.new_products(1)[0]})},
+    {"name": "products.update", "endpoint": "products.update_details_of_product",
+     "build": lambda ctx: ("PATCH", f"/api/products/{ctx.product_id()}", {"json": {"stock": ctx.rng.randint(0, 100)}})},
+    {"name": "products.delete", "endpoint": "products.delete",
+     "setup": lambda ctx, count: ctx.fill_disposable(count),
+     "build": lambda ctx: ("DELETE", f"/api/products/{ctx.disposable.pop()}", {})},
+    {"name": "products.bulk_import", "endpoint": "products.bulk_import", "build": _bulk_import},
+    {"name": "products.bulk_update", "endpoint": "products.bulk_update", "build": _bulk_update},
+    {"name": "products.bulk_delete", "endpoint": "products.bulk_delete",
+     "setup": lambda ctx, count: ctx.fill_disposable(count * 50),
+     "build": _bulk_delete},
+]
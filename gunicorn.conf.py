@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+
+# Production launcher for the WSGI app:
+#
+#   gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Every setting can be overridden with a GUNICORN_* environment variable.
+# The app is preloaded in the master and forked into the workers; the hooks
+# below (app/prefork.py) give each worker its own MongoClient and log
+# listener, optionally warm it up before it accepts connections, and close
+# the client once a worker has drained.
+
+# Size-based rotation is not safe with several processes writing one file,
+# so workers log to stderr for gunicorn / the supervisor to collect. To keep
+# a file, set LOG_FILE together with LOG_ROTATION=external and logrotate.
+# (Set before the app is loaded: config classes read the environment once.)
+os.environ.setdefault("LOG_FILE", "")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# Threaded workers even with one thread: their main loop keeps reporting to
+# the master while a request runs, so long streamed exports (?stream=) are
+# not killed by `timeout` the way a sync worker would be
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+# Recycle each worker after about this many requests (jitter staggers the
+# restarts so workers don't all recycle at once); 0 never recycles
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# Seconds a hung worker process (not a slow request) lives before it is
+# killed, and seconds a worker gets to finish in-flight requests after
+# SIGTERM / a recycle
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+
+# Load the recent feed and open a connection before taking traffic
+WARM_UP = os.getenv("GUNICORN_WARM_UP", "true").lower() == "true"
+
+
+def post_fork(server, worker):
+    from app.prefork import after_fork
+    after_fork(worker.app.wsgi())
+
+
+def post_worker_init(worker):
+    if WARM_UP:
+        from app.prefork import warm_up
+        warm_up(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    from app.prefork import shutdown
+    shutdown()
@@ -1,5 +1,6 @@
 from app import create_app
 
+# Development server; for production use gunicorn -c gunicorn.conf.py wsgi:app
 # Create the Flask app instance
 app = create_app("development")
 
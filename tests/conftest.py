@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+# app.config reads the environment when it is imported: no index build, no
+# log file, and none of the background threads that would share the
+# in-process database with the test
+os.environ.update(
+    MONGO_URI="mongodb://localhost:27017/test",
+    ENSURE_INDEXES="false",
+    LOG_FILE="",
+    ADMISSION_ENABLED="false",
+    RECENT_FEED_SIZE="0",
+    STATS_REBUILD_INTERVAL="0",
+)
+
+
+@pytest.fixture
+def app():
+    """create_app on an in-process mongomock database (skipped without mongomock)."""
+    mongomock = pytest.importorskip("mongomock")
+    from benchmarks.mongomock_compat import patch_mongomock
+    from app import create_app
+    from app.extensions import mongo
+    from app.modules.products.stats import stats_writer
+
+    patch_mongomock()
+    app = create_app()
+    mongo.cx = mongomock.MongoClient()
+    mongo.db = mongo.cx["test"]
+    # Queued stats updates are applied by the tests that check them
+    # (stats_writer.flush), not by the writer thread
+    stats_writer._pid = os.getpid()
+    stats_writer._pending = []
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def brand_id(client):
+    response = client.post("/api/brands/", json={
+        "brand_name": "Acme", "email": "hello@acme.example", "phone_number": "5550100100"
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["brand"]["brand_id"]
+
+
+@pytest.fixture
+def product_body(brand_id):
+    """Factory for valid create/import bodies (ProductSchema)."""
+    def make(**fields):
+        return {
+            "product_name": "Lamp",
+            "description": "Desk lamp",
+            "price": 10,
+            "category": "Other",
+            "images": ["https://cdn.example.com/lamp.png"],
+            "stock": 1,
+            "brand_id": brand_id,
+            **fields,
+        }
+    return make
+
+
+@pytest.fixture
+def create_product(client, product_body):
+    """Factory creating a product through the API; returns the stored product."""
+    def create(**fields):
+        response = client.post("/api/products/new", json=product_body(**fields))
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()["product"]
+    return create
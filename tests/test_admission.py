@@ -0,0 +1,113 @@
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, jsonify
+
+from app.admission import AdmissionControl, TokenBuckets
+
+# Admission control (app/admission.py): 429 past a client's rate, 503 past a
+# route's concurrency limit, both with Retry-After.
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update({
+        "ADMISSION_ENABLED": True,
+        "ADMISSION_EXPENSIVE_ENDPOINTS": "search",
+        "ADMISSION_EXEMPT_ENDPOINTS": "health",
+        "ADMISSION_QUEUE_TIMEOUT": 0,
+        "ADMISSION_CLIENT_HEADER": "X-Forwarded-For",
+        **config,
+    })
+    admission = AdmissionControl()
+    admission.init_app(app)
+    app.release = threading.Event()
+    app.entered = threading.Event()
+
+    @app.route("/search")
+    def search():
+        app.entered.set()
+        app.release.wait(5)
+        return jsonify(ok=True)
+
+    @app.route("/items")
+    def items():
+        return jsonify(ok=True)
+
+    @app.route("/health")
+    def health():
+        return jsonify(ok=True)
+
+    app.admission = admission
+    return app
+
+
+def test_rate_limit_returns_429_with_retry_after():
+    app = make_app(ADMISSION_DEFAULT_RATE=0.5, ADMISSION_DEFAULT_BURST=2)
+    client = app.test_client()
+    alice = {"X-Forwarded-For": "10.0.0.1, 10.0.0.254"}
+
+    assert [client.get("/items", headers=alice).status_code for _ in range(2)] == [200, 200]
+    response = client.get("/items", headers=alice)
+    assert response.status_code == 429
+    assert response.get_json() == {"error": "Too many requests"}
+    assert response.headers["Retry-After"] == "2"
+
+    # Other clients and exempt routes are unaffected
+    assert client.get("/items", headers={"X-Forwarded-For": "10.0.0.2"}).status_code == 200
+    assert client.get("/health", headers=alice).status_code == 200
+    assert app.admission.stats() == {("items", "rate"): 1}
+
+
+def test_concurrency_limit_returns_503_with_retry_after():
+    app = make_app(ADMISSION_EXPENSIVE_CONCURRENCY=1, ADMISSION_RETRY_AFTER=3)
+    statuses = []
+    holder = threading.Thread(target=lambda: statuses.append(app.test_client().get("/search").status_code))
+    holder.start()
+    try:
+        assert app.entered.wait(5)
+        response = app.test_client().get("/search")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+        # The limit is per route
+        assert app.test_client().get("/items").status_code == 200
+    finally:
+        app.release.set()
+        holder.join(5)
+    assert statuses == [200]
+
+    # The slot is released after the request
+    assert app.test_client().get("/search").status_code == 200
+    assert app.admission.stats() == {("search", "concurrency"): 1}
+
+
+def test_disabled():
+    app = make_app(ADMISSION_ENABLED=False, ADMISSION_DEFAULT_RATE=1, ADMISSION_DEFAULT_BURST=1)
+    client = app.test_client()
+    assert [client.get("/items").status_code for _ in range(3)] == [200, 200, 200]
+
+
+def test_route_classes():
+    admission = make_app().admission
+    assert admission.route_class("search") == "expensive"
+    assert admission.route_class("items") == "default"
+    assert admission.route_class("health") is None
+    assert admission.route_class(None) is None
+
+
+def test_token_buckets(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(sys.modules["app.admission"], "time", SimpleNamespace(monotonic=lambda: now[0]))
+    buckets = TokenBuckets(rate=2, burst=2, max_clients=2)
+
+    assert buckets.take("a") == buckets.take("a") == 0
+    assert buckets.take("a") == pytest.approx(0.5)
+    now[0] += 0.5
+    assert buckets.take("a") == 0
+
+    # Least recently seen clients are dropped past max_clients
+    buckets.take("b")
+    buckets.take("c")
+    assert list(buckets._buckets) == ["b", "c"]
@@ -0,0 +1,118 @@
+import io
+import json
+
+import pytest
+
+from app.extensions import mongo
+from app.streaming import iter_json_records
+
+# Streamed bulk import: iter_json_records (app/streaming.py) and the
+# per-record report of POST /api/products/bulk.
+
+CHUNK_SIZES = [1, 2, 7, 64 * 1024]
+
+
+def parse(body, chunk_size=64 * 1024, max_record_size=1024):
+    return list(iter_json_records(io.BytesIO(body), chunk_size, max_record_size))
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_ndjson(chunk_size):
+    body = b'{"a": 1}\n\n  \n{"a": 2}\r\nnot json\n{"a": 3}'
+    results = parse(body, chunk_size)
+    assert [(line, record) for line, record, _ in results] == [(1, {"a": 1}), (4, {"a": 2}), (5, None), (6, {"a": 3})]
+    assert results[2][2].startswith("Invalid JSON")
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_array(chunk_size):
+    body = b' \n[{"a": 1}, 123 ,\n"x", {"b": [1, 2]}]  trailing'
+    assert parse(body, chunk_size) == [(1, {"a": 1}, None), (2, 123, None), (3, "x", None), (4, {"b": [1, 2]}, None)]
+
+
+@pytest.mark.parametrize("body", [b"", b"   \n", b"[]", b"[ ]"])
+def test_empty_bodies(body):
+    assert parse(body) == []
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_truncated_array(chunk_size):
+    results = parse(b'[{"a": 1}, {"a": 2', chunk_size)
+    assert results[0] == (1, {"a": 1}, None)
+    assert results[1][:2] == (2, None) and results[1][2].startswith("Invalid JSON")
+
+    assert parse(b'[{"a": 1},', chunk_size) == [(1, {"a": 1}, None), (2, None, "Unexpected end of JSON array")]
+
+
+def test_invalid_array_element_stops_parsing():
+    results = parse(b'[{"a": 1}, {oops}, {"a": 3}]')
+    assert len(results) == 2
+    assert results[1][:2] == (2, None) and results[1][2].startswith("Invalid JSON")
+
+
+def test_multibyte_characters_split_across_chunks():
+    records = [{"name": "Café ☕"}, {"name": "日本"}]
+    body = json.dumps(records, ensure_ascii=False).encode()
+    assert [record for _, record, _ in parse(body, chunk_size=1)] == records
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_oversized_ndjson_line_is_skipped(chunk_size):
+    body = b'{"a": 1}\n{"big": "' + b"x" * 2000 + b'"}\n{"a": 2}\n'
+    assert parse(body, chunk_size) == [
+        (1, {"a": 1}, None), (2, None, "Record exceeds 1024 bytes"), (3, {"a": 2}, None)
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64 * 1024])
+def test_oversized_array_element_stops_parsing(chunk_size):
+    body = b'[{"a": 1}, {"big": "' + b"x" * 2000 + b'"}, {"a": 2}]'
+    assert parse(body, chunk_size) == [(1, {"a": 1}, None), (2, None, "Record exceeds 1024 bytes")]
+
+
+def ndjson(*records):
+    return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in records).encode()
+
+
+def test_bulk_import_reports_rejected_lines(client, product_body):
+    body = ndjson(
+        product_body(product_name="One"),
+        "{broken",
+        [1, 2],
+        product_body(product_name="x"),
+        product_body(product_name="Two"),
+    )
+    response = client.post("/api/products/bulk", data=body, content_type="application/x-ndjson")
+    assert response.status_code == 200
+    report = response.get_json()
+    assert {k: report[k] for k in ("received", "inserted", "rejected_count", "truncated")} == {
+        "received": 5, "inserted": 2, "rejected_count": 3, "truncated": False
+    }
+    rejected = {entry["line"]: entry["errors"] for entry in report["rejected"]}
+    assert sorted(rejected) == [2, 3, 4]
+    assert rejected[2].startswith("Invalid JSON")
+    assert rejected[3] == "Expected a JSON object"
+    assert "product_name" in rejected[4]
+    assert sorted(doc["product_name"] for doc in mongo.db.products.find()) == ["One", "Two"]
+
+
+def test_bulk_import_array_body(client, product_body):
+    body = json.dumps([product_body(product_name=f"Lamp {i}") for i in range(3)]).encode()
+    report = client.post("/api/products/bulk", data=body, content_type="application/json").get_json()
+    assert (report["received"], report["inserted"], report["rejected_count"]) == (3, 3, 0)
+
+
+def test_bulk_import_truncates_reported_errors(app, client):
+    app.config["BULK_MAX_REPORTED_ERRORS"] = 2
+    report = client.post("/api/products/bulk", data=ndjson(*["{}"] * 5)).get_json()
+    assert report["rejected_count"] == 5
+    assert [entry["line"] for entry in report["rejected"]] == [1, 2]
+    assert report["truncated"] is True
+
+
+def test_bulk_import_flushes_in_batches(app, client, product_body):
+    app.config["BULK_BATCH_SIZE"] = 2
+    body = ndjson(*[product_body(product_name=f"Lamp {i}") for i in range(5)])
+    report = client.post("/api/products/bulk", data=body).get_json()
+    assert (report["inserted"], report["rejected_count"]) == (5, 0)
+    assert mongo.db.products.count_documents({}) == 5
@@ -0,0 +1,116 @@
+import pytest
+
+from app.extensions import mongo
+from app.modules.products.controller import bulk_operations, parse_bulk_deletes, parse_bulk_updates
+
+# Bulk update / delete: request body validation (nothing is written when any
+# operation is invalid) and the writes themselves.
+
+
+@pytest.mark.parametrize("data", [None, [], "x", {}, {"operations": []}, {"operations": {"a": 1}}])
+def test_operations_must_be_a_non_empty_list(data):
+    with pytest.raises(ValueError, match="non-empty list"):
+        bulk_operations(data, 10)
+
+
+def test_operations_limit():
+    assert bulk_operations({"operations": [{}] * 3}, 3) == [{}] * 3
+    with pytest.raises(ValueError, match="At most 3"):
+        bulk_operations({"operations": [{}] * 4}, 3)
+
+
+def test_parse_bulk_updates():
+    parsed, errors = parse_bulk_updates([
+        {"product_id": "p-1", "set": {"stock": 5}},
+        {"filter": {"category": "sports", "min_price": 10}, "multiply": {"price": 0.9}},
+        {"filter": {"product_ids": ["p-2", "p-3"]}, "inc": {"stock": -1}},
+    ])
+    assert not errors
+    assert parsed[0] == ({"product_id": "p-1"}, {"$set": {"stock": 5}}, False)
+    filters, update, many = parsed[1]
+    assert filters["category"] == "Sports" and filters["price"] == {"$gte": 10.0}
+    assert (update, many) == ({"$mul": {"price": 0.9}}, True)
+    assert parsed[2] == ({"product_id": {"$in": ["p-2", "p-3"]}}, {"$inc": {"stock": -1}}, True)
+
+
+@pytest.mark.parametrize("op, message", [
+    ("p-1", "Operation must be an object"),
+    ({"set": {"stock": 1}}, "needs a product_id or a non-empty filter"),
+    ({"filter": {}, "set": {"stock": 1}}, "needs a product_id or a non-empty filter"),
+    ({"filter": {"color": "red"}, "set": {"stock": 1}}, "Unsupported filter keys: color"),
+    ({"filter": {"product_ids": []}, "set": {"stock": 1}}, "product_ids must be a non-empty list"),
+    ({"filter": {"in_stock": None}, "set": {"stock": 1}}, "Filter matches every product"),
+    ({"product_id": "p-1"}, "needs 'set', 'multiply' or 'inc'"),
+    ({"product_id": "p-1", "set": {}}, "needs 'set', 'multiply' or 'inc'"),
+    ({"product_id": "p-1", "inc": {"rating": 1}}, "'inc' only supports price, stock"),
+    ({"product_id": "p-1", "multiply": {"price": "2"}}, "'multiply.price' must be a number"),
+    ({"product_id": "p-1", "inc": {"stock": True}}, "'inc.stock' must be a number"),
+    ({"product_id": "p-1", "set": {"stock": 1}, "inc": {"stock": 1}}, "'stock' is changed twice"),
+    ({"product_id": "p-1", "multiply": {"price": 2}, "inc": {"price": 1}}, "'price' is changed twice"),
+])
+def test_invalid_update_operations(op, message):
+    parsed, errors = parse_bulk_updates([{"product_id": "ok", "set": {"stock": 1}}, op])
+    assert len(parsed) == 1
+    assert list(errors) == [1] and message in errors[1]
+
+
+def test_update_set_uses_the_product_schema():
+    _, errors = parse_bulk_updates([{"product_id": "p-1", "set": {"product_name": "x", "stock": "many"}}])
+    assert set(errors[0]) == {"product_name", "stock"}
+
+
+def test_parse_bulk_deletes():
+    filters_list, errors = parse_bulk_deletes([
+        {"product_id": "p-1"}, {"filter": {"brand_id": "b-1"}}, ["p-2"], {"filter": {"price": 1}}
+    ])
+    assert filters_list == [{"product_id": "p-1"}, {"brand_id": "b-1"}]
+    assert errors == {2: "Operation must be an object", 3: "Unsupported filter keys: price"}
+
+
+def test_bulk_update_endpoint(client, create_product):
+    lamp = create_product(product_name="Lamp", price=100, stock=2)
+    create_product(product_name="Ball", price=20, stock=4, category="Sports")
+    response = client.post("/api/products/bulk/update", json={"operations": [
+        {"product_id": lamp["product_id"], "set": {"stock": 9}},
+        {"filter": {"category": "sports"}, "inc": {"price": -10, "stock": -1}},
+    ]})
+    assert response.status_code == 200
+    assert (response.get_json()["matched"], response.get_json()["modified"]) == (2, 2)
+    stored = {doc["product_name"]: (doc["price"], doc["stock"]) for doc in mongo.db.products.find()}
+    assert stored == {"Lamp": (100, 9), "Ball": (10, 3)}
+
+
+def test_bulk_update_endpoint_rejects_the_whole_batch(client, create_product):
+    lamp = create_product(stock=2)
+    response = client.post("/api/products/bulk/update", json={"operations": [
+        {"product_id": lamp["product_id"], "set": {"stock": 9}},
+        {"product_id": lamp["product_id"], "inc": {"rating": 1}},
+    ]})
+    assert response.status_code == 400
+    assert list(response.get_json()["errors"]) == ["1"]
+    assert mongo.db.products.find_one({"product_id": lamp["product_id"]})["stock"] == 2
+
+
+@pytest.mark.parametrize("path", ["/api/products/bulk/update", "/api/products/bulk/delete"])
+def test_bulk_endpoints_reject_bad_bodies(app, client, path):
+    assert client.post(path, data="not json", content_type="application/json").status_code == 400
+    assert client.post(path, json={"operations": []}).get_json() == {"error": "'operations' must be a non-empty list"}
+    app.config["BULK_MAX_OPERATIONS"] = 1
+    response = client.post(path, json={"operations": [{"product_id": "a"}, {"product_id": "b"}]})
+    assert response.status_code == 400 and "At most 1" in response.get_json()["error"]
+
+
+def test_bulk_delete_endpoint(client, create_product):
+    lamp = create_product(product_name="Lamp")
+    create_product(product_name="Ball", category="Sports")
+    create_product(product_name="Desk")
+    response = client.post("/api/products/bulk/delete", json={"operations": [
+        {"product_id": lamp["product_id"]}, {"filter": {"category": "sports"}}, {"product_id": "missing"}
+    ]})
+    assert response.status_code == 200
+    assert response.get_json()["deleted"] == 2
+    assert [doc["product_name"] for doc in mongo.db.products.find()] == ["Desk"]
+
+    response = client.post("/api/products/bulk/delete", json={"operations": [{"filter": {"min_price": None}}]})
+    assert response.status_code == 400
+    assert response.get_json() == {"errors": {"0": "Filter matches every product"}}
@@ -0,0 +1,162 @@
+import asyncio
+import gzip
+
+import pytest
+from flask import Flask, Response, jsonify
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from app.compression import Compression
+
+# Negotiated response compression (app/compression.py).
+
+BIG = {"products": ["x" * 20] * 100}
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update({"COMPRESS_ALGORITHMS": "gzip", "COMPRESS_MIN_SIZE": 100, **config})
+    Compression().init_app(app)
+
+    @app.route("/big")
+    def big():
+        return jsonify(BIG)
+
+    @app.route("/small")
+    def small():
+        return jsonify(ok=True)
+
+    @app.route("/encoded")
+    def encoded():
+        return Response(gzip.compress(b"{}" * 100), mimetype="application/json", headers={"Content-Encoding": "gzip"})
+
+    @app.route("/no-transform")
+    def no_transform():
+        response = jsonify(BIG)
+        response.headers["Cache-Control"] = "no-transform"
+        return response
+
+    @app.route("/image")
+    def image():
+        return Response(b"\x89PNG" * 100, mimetype="image/png")
+
+    @app.route("/conditional")
+    def conditional():
+        return Response(status=304, mimetype="application/json")
+
+    @app.route("/stream")
+    def stream():
+        return Response((f'{{"n": {i}}}\n' for i in range(50)), mimetype="application/x-ndjson")
+
+    return app
+
+
+@pytest.fixture
+def client():
+    return make_app().test_client()
+
+
+def test_compresses_when_accepted(client):
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, deflate"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["Content-Length"] == str(len(response.data))
+    assert gzip.decompress(response.data) == make_app().test_client().get("/big").data
+
+
+@pytest.mark.parametrize("accept", [None, "identity", "br", "gzip;q=0"])
+def test_identity_when_gzip_is_not_accepted(client, accept):
+    headers = {"Accept-Encoding": accept} if accept else {}
+    response = client.get("/big", headers=headers)
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == BIG
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+
+def test_small_bodies_are_not_compressed(client):
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_already_encoded_bodies_are_not_compressed_again(client):
+    response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert gzip.decompress(response.data) == b"{}" * 100
+
+
+@pytest.mark.parametrize("path", ["/no-transform", "/image", "/conditional"])
+def test_left_alone(client, path):
+    assert "Content-Encoding" not in client.get(path, headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_head_requests_are_not_compressed(client):
+    assert "Content-Encoding" not in client.head("/big", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_streamed_bodies_are_compressed_chunk_by_chunk(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.data) == "".join(f'{{"n": {i}}}\n' for i in range(50)).encode()
+
+
+def test_disabled():
+    client = make_app(COMPRESS_ENABLED=False).test_client()
+    assert "Content-Encoding" not in client.get("/big", headers={"Accept-Encoding": "gzip"}).headers
+
+
+class Named:
+    def __init__(self, name):
+        self.name = name
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br, zstd", "zstd"),
+    ("gzip;q=1, br;q=0.5, zstd;q=0.5", "gzip"),
+    ("br;q=0.8, gzip;q=0.8", "br"),
+    ("*", "zstd"),
+    ("*;q=0.5, gzip", "gzip"),
+    ("zstd;q=0, *", "br"),
+    ("identity", None),
+    ("", None),
+])
+def test_choose_prefers_client_quality_then_server_order(header, expected):
+    compression = Compression()
+    compression.encoders = {name: Named(name) for name in ("zstd", "br", "gzip")}
+    compression.preference = ("zstd", "br", "gzip")
+    chosen = compression.choose(parse_accept_header(header, Accept))
+    assert (chosen.name if chosen else None) == expected
+
+
+def test_unavailable_algorithms_are_skipped():
+    compression = Compression()
+    compression.init_app(make_app(COMPRESS_ALGORITHMS="nope, gzip"))
+    assert "gzip" in compression.preference and "nope" not in compression.preference
+
+
+def test_async_app_compresses_streamed_and_buffered_bodies():
+    quart = pytest.importorskip("quart")
+    app = quart.Quart(__name__)
+    app.config.update(COMPRESS_ALGORITHMS="gzip", COMPRESS_MIN_SIZE=100)
+    Compression().init_async_app(app)
+
+    async def lines():
+        for i in range(50):
+            yield f'{{"n": {i}}}\n'.encode()
+
+    @app.route("/stream")
+    async def stream():
+        return quart.Response(lines(), mimetype="application/x-ndjson")
+
+    @app.route("/small")
+    async def small():
+        return {"ok": True}
+
+    async def run():
+        client = app.test_client()
+        streamed = await client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        small = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+        return streamed.headers, await streamed.get_data(), small.headers
+
+    streamed_headers, body, small_headers = asyncio.run(run())
+    assert streamed_headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body) == "".join(f'{{"n": {i}}}\n' for i in range(50)).encode()
+    assert "Content-Encoding" not in small_headers
@@ -0,0 +1,32 @@
+from app.extensions import mongo
+
+# Faceted search (/api/products/search?facets=true): page, total and facets
+# from one aggregation.
+
+
+def test_facets(client, create_product):
+    for i, price in enumerate((100, 600, 700, 60000)):
+        create_product(product_name=f"Lamp {i}", price=price, stock=i, category="Sports" if i else "Other")
+    body = client.get("/api/products/search?facets=true&limit=2").get_json()
+
+    assert body["total"] == 4 and not body["total_capped"]
+    assert len(body["products"]) == 2
+    facets = body["facets"]
+    assert facets["category"] == [{"value": "Sports", "count": 3}, {"value": "Other", "count": 1}]
+    assert facets["price"] == [
+        {"min": 0, "max": 500, "count": 1},
+        {"min": 500, "max": 1000, "count": 2},
+        {"min": 50000, "max": None, "count": 1},
+    ]
+    assert (facets["in_stock"], facets["out_of_stock"]) == (3, 1)
+
+
+def test_invalid_prices_stay_out_of_the_top_bucket(client, create_product):
+    ids = [create_product(product_name=f"Lamp {i}", price=100)["product_id"] for i in range(4)]
+    mongo.db.products.update_one({"product_id": ids[0]}, {"$unset": {"price": ""}})
+    mongo.db.products.update_one({"product_id": ids[1]}, {"$set": {"price": None}})
+    mongo.db.products.update_one({"product_id": ids[2]}, {"$set": {"price": -5}})
+
+    body = client.get("/api/products/search?facets=true").get_json()
+    assert body["total"] == 4
+    assert body["facets"]["price"] == [{"min": 0, "max": 500, "count": 1}]
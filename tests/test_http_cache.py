@@ -0,0 +1,80 @@
+# Conditional GET (app/http_cache.py): ETag / Last-Modified validators and
+# 304 answers on product, brand and list endpoints.
+
+
+def test_product_etag_round_trip(client, create_product):
+    product = create_product()
+    url = f"/api/products/{product['product_id']}"
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"') and "Last-Modified" in response.headers
+
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+    assert cached.headers["ETag"] == etag
+    assert client.get(url, headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code == 304
+
+    # Another representation of the same product has another ETag
+    assert client.get(f"{url}?fields=product_name", headers={"If-None-Match": etag}).status_code == 200
+
+    assert client.put(url, json={"stock": 7}).status_code == 200
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.get_json()["stock"] == 7
+    assert changed.headers["ETag"] != etag
+
+
+def test_product_if_modified_since(client, create_product):
+    product = create_product()
+    url = f"/api/products/{product['product_id']}"
+    modified = client.get(url).headers["Last-Modified"]
+
+    assert client.get(url, headers={"If-Modified-Since": modified}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}).status_code == 200
+    # If-None-Match wins over If-Modified-Since
+    response = client.get(url, headers={"If-None-Match": '"stale"', "If-Modified-Since": modified})
+    assert response.status_code == 200
+
+
+def test_expanded_brand_is_part_of_the_etag(client, create_product, brand_id):
+    product = create_product()
+    url = f"/api/products/{product['product_id']}?expand=brand"
+    response = client.get(url)
+    assert "Last-Modified" not in response.headers
+    etag = response.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.post(f"/api/brands/{brand_id}/update", json={"brand_name": "Acme Two"}).status_code == 200
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["brand"]["name"] == "Acme Two"
+
+
+def test_brand_etag_round_trip(client, brand_id):
+    url = f"/api/brands/{brand_id}"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.post(f"{url}/update", json={"brand_description": "Lamps"}).status_code == 200
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_lists_use_a_content_etag(client, create_product):
+    create_product(product_name="Lamp")
+    url = "/api/products/category/Other"
+    response = client.get(url)
+    etag = response.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    create_product(product_name="Desk")
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
+
+
+def test_missing_documents_are_not_cached(client):
+    response = client.get("/api/products/missing", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
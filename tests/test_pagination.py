@@ -0,0 +1,113 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from app.pagination import decode_cursor, encode_cursor, keyset_filter, with_tiebreaker
+
+# Keyset pagination (app/pagination.py): cursor tokens, and paging through
+# /api/products with ?cursor= until next_cursor is null.
+
+SPEC = [("price", 1), ("product_id", 1)]
+
+
+def test_cursor_round_trip():
+    doc = {"price": 12.5, "created_at": datetime(2024, 5, 1, 12, 30, 15, 123000), "product_id": "p-1"}
+    spec = [("created_at", -1), ("price", 1), ("product_id", -1)]
+    assert decode_cursor(encode_cursor(doc, spec), spec) == [doc["created_at"], 12.5, "p-1"]
+
+
+def test_cursor_of_missing_key_is_null():
+    assert decode_cursor(encode_cursor({"product_id": "p-1"}, SPEC), SPEC) == [None, "p-1"]
+
+
+@pytest.mark.parametrize("token", ["", "not-base64!", "e30", base64.urlsafe_b64encode(b"[1, 2]").decode()])
+def test_malformed_cursor(token):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(token, SPEC)
+
+
+def test_cursor_for_another_sort():
+    token = encode_cursor({"price": 1, "product_id": "p"}, SPEC)
+    with pytest.raises(ValueError, match="does not match"):
+        decode_cursor(token, [("price", -1), ("product_id", -1)])
+
+
+def test_tiebreaker_follows_last_direction():
+    assert with_tiebreaker([("price", -1)], "product_id") == [("price", -1), ("product_id", -1)]
+    assert with_tiebreaker([("product_id", 1)], "product_id") == [("product_id", 1)]
+
+
+def test_keyset_filter_expands_each_key():
+    assert keyset_filter([("price", 1), ("product_id", -1)], [5, "p"]) == {"$or": [
+        {"price": {"$gt": 5}},
+        {"price": 5, "$or": [{"product_id": {"$lt": "p"}}, {"product_id": None}]},
+    ]}
+
+
+def test_keyset_filter_after_null():
+    # Ascending: every value follows null. Descending: nothing does.
+    assert keyset_filter([("price", 1), ("product_id", 1)], [None, "p"]) == {"$or": [
+        {"price": {"$ne": None}},
+        {"price": None, "product_id": {"$gt": "p"}},
+    ]}
+    assert keyset_filter([("price", -1), ("product_id", -1)], [None, "p"]) == {"$or": [
+        {"price": None, "$or": [{"product_id": {"$lt": "p"}}, {"product_id": None}]},
+    ]}
+
+
+def pages(client, sort, limit):
+    """Product ids of every cursor page, in order."""
+    ids, cursor, seen = [], "", 0
+    while cursor is not None:
+        response = client.get("/api/products", query_string={"sort": sort, "limit": limit, "cursor": cursor})
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        ids += [p["product_id"] for p in body["products"]]
+        cursor = body["next_cursor"]
+        seen += 1
+        assert seen <= 20
+    return ids
+
+
+@pytest.mark.parametrize("sort, key, reverse", [("price_asc", 1, False), ("price_desc", -1, True)])
+def test_pages_cover_ties_once(client, create_product, sort, key, reverse):
+    # Several products share each price, so pages split inside runs of ties
+    for i in range(11):
+        create_product(product_name=f"Lamp {i}", price=[5, 5, 5, 7, 7, 9, 9, 9, 9, 12, 12][i])
+    from app.extensions import mongo
+    expected = [
+        p["product_id"] for p in mongo.db.products.find({}).sort([("price", key), ("product_id", key)])
+    ]
+    assert len(set(expected)) == 11
+    assert pages(client, sort, 3) == expected
+    assert pages(client, sort, 4) == expected
+
+
+def test_pages_include_products_without_the_sort_key(client, create_product):
+    priced = [create_product(price=p)["product_id"] for p in (3, 1)]
+    from app.extensions import mongo
+    mongo.db.products.update_one({"product_id": priced[0]}, {"$unset": {"price": ""}})
+    mongo.db.products.update_one({"product_id": priced[1]}, {"$set": {"price": None}})
+    create_product(price=2)
+    for sort in ("price_asc", "price_desc"):
+        assert sorted(pages(client, sort, 1)) == sorted(p["product_id"] for p in mongo.db.products.find({}))
+
+
+def test_tampered_cursor_is_rejected(client, create_product):
+    for price in (1, 2, 3):
+        create_product(price=price)
+    cursor = client.get("/api/products?sort=price_asc&limit=1&cursor=").get_json()["next_cursor"]
+    payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+    payload["s"][0][1] = -1  # issued for another sort
+    tampered = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+    for token in (tampered, cursor[:-3], "garbage"):
+        response = client.get("/api/products", query_string={"sort": "price_asc", "limit": 1, "cursor": token})
+        assert response.status_code == 400
+        assert "cursor" in response.get_json()["error"].lower()
+
+    # A valid cursor used with a different sort
+    response = client.get("/api/products", query_string={"sort": "price_desc", "cursor": cursor})
+    assert response.status_code == 400
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.modules.products.search_cache import SearchCache
+
+# Search result cache: generation-based invalidation, query normalization and
+# coalescing of concurrent misses.
+
+
+@pytest.fixture
+def cache():
+    cache = SearchCache()
+    cache.init_app(SimpleNamespace(config={"SEARCH_CACHE_TTL": 60, "SEARCH_CACHE_WAIT_TIMEOUT": 5}))
+    return cache
+
+
+def counting(value="result"):
+    def compute():
+        compute.calls += 1
+        return value
+    compute.calls = 0
+    return compute
+
+
+def test_hits_after_a_miss(cache):
+    compute = counting({"products": [1]})
+    assert cache.get_or_compute({"query": "lamp"}, compute) == {"products": [1]}
+    assert cache.get_or_compute({"query": "lamp"}, compute) == {"products": [1]}
+    assert compute.calls == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "coalesced": 0, "hit_ratio": 0.5}
+
+
+def test_disabled_without_ttl():
+    cache = SearchCache()
+    cache.init_app(SimpleNamespace(config={"SEARCH_CACHE_TTL": 0}))
+    compute = counting()
+    cache.get_or_compute({"query": "lamp"}, compute)
+    cache.get_or_compute({"query": "lamp"}, compute)
+    assert compute.calls == 2
+
+
+def test_text_queries_ignore_case_and_spacing(cache):
+    assert cache.key({"query": "Desk  Lamp", "mode": "text"}) == cache.key({"query": "desk lamp", "mode": "text"})
+    assert cache.key({"query": "Desk  Lamp", "mode": "regex"}) != cache.key({"query": "desk lamp", "mode": "regex"})
+    assert cache.key({"query": "lamp", "category": None, "brand_id": ""}) == cache.key({"query": "lamp"})
+
+
+def test_writes_invalidate_their_scopes(cache):
+    sports = {"query": "ball", "category": "Sports"}
+    brand = {"query": "ball", "brand_id": "b-1"}
+    catalog = {"query": "ball"}
+    keys = {name: cache.key(params) for name, params in (("sports", sports), ("brand", brand), ("catalog", catalog))}
+
+    cache.products_changed({"brand_id": "b-2", "category": "Other"}, None)
+    assert cache.key(sports) == keys["sports"]
+    assert cache.key(brand) == keys["brand"]
+    assert cache.key(catalog) != keys["catalog"]
+
+    cache.products_changed({"brand_id": "b-2", "category": "Other"}, {"brand_id": "b-1", "category": "Sports"})
+    assert cache.key(sports) != keys["sports"]
+    assert cache.key(brand) != keys["brand"]
+
+
+def test_bulk_scopes_invalidate(cache):
+    params = {"query": "ball", "brand_id": "b-1", "category": "Sports"}
+    before = cache.key(params)
+    cache.scopes_changed({"brand": ["b-9"], "category": []})
+    assert cache.key(params) == before
+    cache.scopes_changed({"category": ["Sports"]})
+    assert cache.key(params) != before
+
+
+def test_invalidated_entries_are_recomputed(cache):
+    compute = counting()
+    cache.get_or_compute({"query": "lamp"}, compute)
+    cache.products_changed({"brand_id": "b-1", "category": "Other"})
+    cache.get_or_compute({"query": "lamp"}, compute)
+    assert compute.calls == 2
+
+
+def test_concurrent_misses_run_one_query(cache):
+    release = threading.Event()
+    started = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"products": ["shared"]}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute({"query": "lamp"}, compute)))
+               for _ in range(5)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    while cache.stats()["coalesced"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{"products": ["shared"]}] * 5
+    # Waiters get their own copy
+    results[1]["products"].append("mine")
+    assert results[2] == {"products": ["shared"]}
+
+
+def test_waiters_fall_back_when_the_leader_fails(cache):
+    release = threading.Event()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    errors = []
+
+    def lead():
+        try:
+            cache.get_or_compute({"query": "lamp"}, failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    assert started.wait(5)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_compute({"query": "lamp"}, counting("own"))))
+    waiter.start()
+    while cache.stats()["coalesced"] < 1:
+        time.sleep(0.01)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+    assert len(errors) == 1 and results == ["own"]
+
+
+def test_async_concurrent_misses_run_one_query(cache):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"products": ["shared"]}
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute_async({"query": "lamp"}, compute) for _ in range(4)))
+
+    assert asyncio.run(run()) == [{"products": ["shared"]}] * 4
+    assert len(calls) == 1 and cache.stats()["coalesced"] == 3
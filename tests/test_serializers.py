@@ -0,0 +1,135 @@
+from datetime import datetime, timezone, timedelta
+from itertools import combinations
+
+import pytest
+from bson import ObjectId
+
+from app.modules.brands.schema import BrandSchema
+from app.modules.products.schema import ProductSchema
+from app.projection import schema_for
+from app.serializers import check_parity, serializer_for
+
+# The compiled serializers (app/serializers.py) must dump exactly what
+# marshmallow dumps: same keys, same order, same values.
+
+PRODUCT = {
+    "_id": ObjectId(),
+    "product_id": "5f0c8d0e-1b2a-4c3d-9e8f-0a1b2c3d4e5f",
+    "brand_id": "b-1",
+    "product_name": "Trail Runner",
+    "description": "Lightweight shoe",
+    "price": 129.99,
+    "category": "Sports",
+    "images": ["https://cdn.example.com/a.png", "https://cdn.example.com/b.png"],
+    "stock": 12,
+    "featured": True,
+    "rating": 4,
+    "tags": ["running", "outdoor"],
+    "created_at": datetime(2024, 5, 1, 12, 30, 15, 123456),
+    "updated_at": datetime(2024, 5, 2, 8, 0, tzinfo=timezone.utc),
+    "search_language": "english",
+}
+
+BRAND = {
+    "_id": ObjectId(),
+    "brand_id": "b-1",
+    "brand_name": "Acme",
+    "email": "hello@acme.example",
+    "phone_number": "+15550100100",
+    "brand_logo": "https://cdn.example.com/logo.png",
+    "brand_description": "Outdoor gear",
+    "documents": ["https://cdn.example.com/doc.pdf"],
+    "verification_status": "Verified",
+    "created_at": datetime(2023, 1, 1, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+    "updated_at": datetime(2023, 1, 2),
+}
+
+# ProductSchema's timestamps have callable dump defaults, so documents missing
+# them are not compared field by field: each side calls the default at a
+# slightly different time.
+TIMESTAMPS = ("created_at", "updated_at")
+
+
+def all_none(doc):
+    return {k: None for k in doc}
+
+
+def odd_types(doc):
+    """Values of the wrong type for their field, as old documents may hold."""
+    odd = dict(doc)
+    odd["_id"] = ObjectId()  # Str field given an ObjectId
+    for key, value in doc.items():
+        if isinstance(value, str):
+            odd[key] = ObjectId() if key.endswith("_id") else value
+        elif isinstance(value, float):
+            odd[key] = int(value)
+        elif isinstance(value, int) and not isinstance(value, bool):
+            odd[key] = float(value)
+    return odd
+
+
+CASES = [
+    pytest.param(ProductSchema, PRODUCT, id="product"),
+    pytest.param(BrandSchema, BRAND, id="brand"),
+]
+
+
+def assert_parity(schema_cls, docs, fields=None):
+    mismatches = check_parity(schema_cls, docs, fields)
+    assert not mismatches, mismatches
+
+
+@pytest.mark.parametrize("schema_cls, doc", CASES)
+def test_full_document(schema_cls, doc):
+    assert_parity(schema_cls, [doc, odd_types(doc)])
+
+
+@pytest.mark.parametrize("schema_cls, doc", CASES)
+def test_none_values(schema_cls, doc):
+    assert_parity(schema_cls, [all_none(doc)])
+
+
+@pytest.mark.parametrize("schema_cls, doc", CASES)
+def test_missing_fields(schema_cls, doc):
+    docs = [{k: v for k, v in doc.items() if k != name} for name in doc if name not in TIMESTAMPS]
+    docs.append({k: doc[k] for k in TIMESTAMPS})
+    if schema_cls is BrandSchema:
+        docs.append({})
+    assert_parity(schema_cls, docs)
+
+
+def test_missing_timestamps_use_dump_default():
+    dumped = serializer_for(ProductSchema).dump({"product_id": "p-1"})
+    assert list(dumped) == list(ProductSchema().dump({"product_id": "p-1"}))
+    for name in TIMESTAMPS:
+        assert datetime.fromisoformat(dumped[name])
+
+
+@pytest.mark.parametrize("schema_cls, doc", CASES)
+def test_field_subsets(schema_cls, doc):
+    names = sorted(schema_cls().dump_fields)
+    subsets = [(name,) for name in names]
+    subsets += list(combinations(names, 2))
+    subsets += [tuple(names[::2]), tuple(names[1::2]), tuple(reversed(names))]
+    for fields in subsets:
+        for sample in (doc, all_none(doc), odd_types(doc)):
+            assert_parity(schema_cls, [sample], fields)
+
+
+@pytest.mark.parametrize("schema_cls, doc", CASES)
+def test_many(schema_cls, doc):
+    docs = [doc, all_none(doc), odd_types(doc)]
+    serializer = serializer_for(schema_cls)
+    assert serializer.dump(docs, many=True) == schema_cls().dump(docs, many=True)
+    assert serializer.dump([], many=True) == []
+
+
+def test_non_dict_falls_back_to_marshmallow():
+    class Product:
+        product_id = "p-1"
+        product_name = "Lamp"
+        created_at = updated_at = datetime(2024, 1, 1)
+
+    fields = ("product_id", "product_name", "created_at")
+    assert serializer_for(ProductSchema, fields).dump(Product()) == schema_for(ProductSchema, fields).dump(Product())
+    assert serializer_for(BrandSchema).dump(None) == BrandSchema().dump(None)
@@ -0,0 +1,122 @@
+from datetime import datetime
+
+from app.extensions import mongo
+from app.modules.products.stats import (
+    COLLECTION, ProductStats, change_steps, insert_steps, queued_steps, settle, stats_writer
+)
+
+# Incremental catalog stats: the steps single-product writes turn into, and
+# the end result against a full rebuild.
+
+NOW = datetime(2024, 1, 1)
+
+
+def product(brand_id="b-1", category="Other", price=10, stock=1):
+    return {"brand_id": brand_id, "category": category, "price": price, "stock": stock}
+
+
+def by_id(steps):
+    return {step["filter"]["_id"]: step for step in steps}
+
+
+def test_insert_steps_merge_per_stats_document():
+    steps = by_id(insert_steps([product(price=10, stock=2), product(price=30, stock=0, category="Sports")], NOW))
+    assert sorted(steps) == ["brand:b-1", "category:Other", "category:Sports"]
+
+    brand = steps["brand:b-1"]
+    assert brand["upsert"] and brand["check"] is None
+    assert brand["update"]["$inc"] == {"count": 2, "total_stock": 2, "in_stock_count": 1, "price_sum": 40}
+    assert brand["update"]["$min"] == {"min_price": 10} and brand["update"]["$max"] == {"max_price": 30}
+    assert brand["update"]["$setOnInsert"] == {"scope": "brand", "key": "b-1"}
+    assert steps["category:Sports"]["update"]["$inc"] == {"count": 1, "total_stock": 0, "in_stock_count": 0, "price_sum": 30}
+
+
+def test_insert_steps_skip_missing_keys_and_prices():
+    steps = by_id(insert_steps([{"brand_id": "b-1", "stock": None, "price": None}], NOW))
+    assert list(steps) == ["brand:b-1"]
+    update = steps["brand:b-1"]["update"]
+    assert update["$inc"] == {"count": 1, "total_stock": 0, "in_stock_count": 0, "price_sum": 0}
+    assert "$min" not in update and "$max" not in update
+
+
+def test_change_within_the_same_scope_is_one_inc():
+    steps = by_id(change_steps(product(stock=3), product(stock=0), NOW))
+    assert sorted(steps) == ["brand:b-1", "category:Other"]
+    step = steps["brand:b-1"]
+    assert not step["upsert"] and step["check"] is None
+    assert step["update"]["$inc"] == {"count": 0, "total_stock": -3, "in_stock_count": -1, "price_sum": 0}
+
+
+def test_unchanged_tracked_fields_produce_no_steps():
+    assert change_steps(product(), {**product(), "product_name": "Renamed"}, NOW) == []
+
+
+def test_price_change_tightens_bounds_and_checks_the_old_price():
+    step = by_id(change_steps(product(price=10), product(price=25), NOW))["category:Other"]
+    assert step["update"]["$inc"]["price_sum"] == 15
+    assert step["update"]["$min"] == {"min_price": 25} and step["update"]["$max"] == {"max_price": 25}
+    assert step["check"] == ("category", "Other", 10)
+
+
+def test_moving_scope_removes_from_old_and_upserts_into_new():
+    steps = by_id(change_steps(product(category="Other"), product(category="Sports"), NOW))
+    # Same brand, stock and price: nothing to change there
+    assert sorted(steps) == ["category:Other", "category:Sports"]
+    old = steps["category:Other"]
+    assert old["update"]["$inc"] == {"count": -1, "total_stock": -1, "in_stock_count": -1, "price_sum": -10}
+    assert old["check"] == ("category", "Other", 10) and not old["upsert"]
+    assert steps["category:Sports"]["upsert"] and steps["category:Sports"]["update"]["$inc"]["count"] == 1
+
+
+def test_delete_and_insert_through_change_steps():
+    deleted = by_id(change_steps(product(), None, NOW))
+    assert sorted(deleted) == ["brand:b-1", "category:Other"]
+    assert all(step["update"]["$inc"]["count"] == -1 and step["check"] for step in deleted.values())
+    assert change_steps(None, product(), NOW) == insert_steps([product()], NOW)
+
+
+def test_queued_steps_share_insert_upserts():
+    steps = queued_steps([(None, product(price=5)), (product(), product(stock=4)), (None, product(price=50))], NOW)
+    inserts = [step for step in steps if step["upsert"]]
+    assert len(inserts) == 2
+    assert by_id(inserts)["brand:b-1"]["update"]["$inc"]["count"] == 2
+    assert len(steps) == 4
+
+
+def test_settle():
+    check = ("brand_id", "b-1", 10)
+    assert settle(None, check) is None
+    assert settle({"count": 0, "min_price": 10}, check) == "delete"
+    assert settle({"count": 2, "min_price": 10, "max_price": 30}, check) == "bounds"
+    assert settle({"count": 2, "min_price": 5, "max_price": 10}, check) == "bounds"
+    assert settle({"count": 2, "min_price": 5, "max_price": 30}, check) is None
+    assert settle({"count": 2, "min_price": None, "max_price": None}, ("brand_id", "b-1", None)) is None
+
+
+def snapshot():
+    fields = ("count", "total_stock", "in_stock_count", "price_sum", "min_price", "max_price")
+    return {doc["_id"]: {name: doc.get(name) for name in fields} for doc in mongo.db[COLLECTION].find()}
+
+
+def test_single_writes_match_a_full_rebuild(client, create_product):
+    cheap = create_product(price=5, stock=0)
+    dear = create_product(price=90, stock=3)
+    create_product(price=40, stock=2, category="Sports")
+    stats_writer.flush()
+
+    client.put(f"/api/products/{dear['product_id']}", json={"category": "Sports", "stock": 1})
+    client.put(f"/api/products/{cheap['product_id']}", json={"price": 50})
+    stats_writer.flush()
+    client.delete(f"/api/products/{dear['product_id']}")
+    stats_writer.flush()
+
+    incremental = snapshot()
+    mongo.db[COLLECTION].delete_many({})
+    ProductStats.rebuild()
+    assert incremental == snapshot()
+    assert incremental["category:Sports"] == {
+        "count": 1, "total_stock": 2, "in_stock_count": 1, "price_sum": 40, "min_price": 40, "max_price": 40
+    }
+
+    totals = client.get("/api/products/stats").get_json()["totals"]
+    assert totals["product_count"] == 2 and (totals["min_price"], totals["max_price"]) == (40, 50)